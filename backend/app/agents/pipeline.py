@@ -4,15 +4,13 @@ from datetime import datetime, UTC
 from pathlib import Path
 
 from app.agents.types import Failure, FixPlan
+from app.services.repository_index import RepositoryIndex
 
 
 class TestDiscoveryAgent:
-    def discover(self, repo_path: Path) -> list[Path]:
-        patterns = ["test_*.py", "*_test.py", "*.spec.ts", "*.test.ts", "*.test.js", "*Test.java"]
-        tests: list[Path] = []
-        for pattern in patterns:
-            tests.extend(repo_path.rglob(pattern))
-        return sorted(set(tests))
+    def discover(self, repo_path: Path, index: RepositoryIndex | None = None) -> list[Path]:
+        index = index or RepositoryIndex.build(repo_path)
+        return [item.path for item in index.tests()]
 
 
 class FailureClassifierAgent:
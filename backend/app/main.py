@@ -1,13 +1,17 @@
 import asyncio
+import json
 import os
 
 # Load environment variables from .env file FIRST
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
+from app.services.run_events import TERMINAL_EVENT
+from app.services.run_scheduler import QueueFullError, RunScheduler
 from app.services.runner import RunnerService
 from app.services.storage import StorageService
 from app.models.api import RunRequest, RunResponse, RunDetailsResponse
@@ -20,10 +24,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 storage = StorageService()
 runner = RunnerService(storage=storage)
+scheduler = RunScheduler()
+
+QUEUE_FULL_RETRY_AFTER = os.getenv("QUEUE_FULL_RETRY_AFTER", "30")
+
+
+@app.on_event("startup")
+async def startup() -> None:
+    runner.workspaces.start(lambda: [*runner.live_states, *scheduler.running])
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await runner.workspaces.stop()
+    runner.multi_language_analyzer.shutdown()
+    if runner.test_engine.sandbox_pool:
+        runner.test_engine.sandbox_pool.close()
+    runner.execution.shutdown()
+    await runner.github_ops.aclose()
 
 
 @app.get("/health")
@@ -31,33 +54,163 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+def _queue_full(message: str) -> HTTPException:
+    return HTTPException(status_code=429, detail=message, headers={"Retry-After": QUEUE_FULL_RETRY_AFTER})
+
+
+def _schedule(run_id: str, payload: RunRequest) -> int | None:
+    return scheduler.submit(
+        run_id,
+        str(payload.repository_url),
+        lambda: runner.execute_run(run_id=run_id, payload=payload),
+        priority=payload.priority,
+    )
+
+
+@app.get("/api/workspaces/stats")
+async def workspace_stats() -> dict:
+    """Workspace garbage collection counters (runs removed, bytes reclaimed, quota violations)."""
+    return runner.workspaces.snapshot()
+
+
 @app.post("/api/runs", response_model=RunResponse)
 async def create_run(payload: RunRequest) -> RunResponse:
+    if not scheduler.has_capacity(str(payload.repository_url)):
+        raise _queue_full("Run queue is full, retry later.")
+
     run_id = await runner.start_run(payload)
     run = storage.get_run(run_id)
 
+    queue_position = None
     if run["status"] == "QUEUED":
-        asyncio.create_task(runner.execute_run(run_id=run_id, payload=payload))
+        try:
+            queue_position = _schedule(run_id, payload)
+        except QueueFullError as error:
+            run["status"] = "FAILED"
+            run["error_message"] = str(error)
+            storage.upsert_run(run_id, run)
+            raise _queue_full(str(error))
 
     return RunResponse(
         run_id=run_id,
         status=run["status"],
         branch_name=run["branch_name"],
+        queue_position=queue_position,
     )
 
 
 @app.post("/api/runs/{run_id}/resume", response_model=RunResponse)
 async def resume_run(run_id: str, payload: RunRequest) -> RunResponse:
-    asyncio.create_task(runner.execute_run(run_id=run_id, payload=payload))
+    try:
+        queue_position = _schedule(run_id, payload)
+    except QueueFullError as error:
+        raise _queue_full(str(error))
     run = storage.get_run(run_id)
     return RunResponse(
         run_id=run_id,
-        status=run["status"],
+        status="QUEUED" if queue_position else run["status"],
         branch_name=run["branch_name"],
+        queue_position=queue_position,
     )
 
 
+def _run_etag(version: int, queue_position: int | None, since_version: int | None) -> str:
+    # The queue position changes without a storage write, so it is part of the validator
+    tag = f"{version}-{queue_position or 0}"
+    if since_version is not None:
+        tag += f"-{since_version}"
+    return f'"{tag}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 @app.get("/api/runs/{run_id}", response_model=RunDetailsResponse)
-async def get_run(run_id: str) -> RunDetailsResponse:
-    run = storage.get_run(run_id)
-    return RunDetailsResponse(**run)
+async def get_run(
+    run_id: str,
+    request: Request,
+    response: Response,
+    since_version: int | None = None,
+) -> RunDetailsResponse | Response:
+    """Run details, revalidated by ETag.
+
+    With `since_version`, `fixes` and `timeline` hold only the entries added after that version.
+    """
+    try:
+        version = storage.get_run_version(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+
+    queue_position = scheduler.queue_position(run_id)
+    etag = _run_etag(version, queue_position, since_version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    run = storage.get_run(run_id, since_version=since_version)
+    response.headers.update(headers)
+    return RunDetailsResponse(**run, queue_position=queue_position, since_version=since_version)
+
+
+@app.post("/api/webhooks/github", status_code=202)
+async def github_webhook(request: Request) -> dict:
+    """Receives GitHub `workflow_run` deliveries and wakes runs waiting on that branch's CI."""
+    webhooks = runner.ci_poller.webhooks
+    if webhooks is None or not webhooks.enabled:
+        raise HTTPException(status_code=404, detail="GitHub webhooks are not configured")
+
+    body = await request.body()
+    if not webhooks.verify(body, request.headers.get("x-hub-signature-256")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    event = request.headers.get("x-github-event", "")
+    if event == "ping":
+        return {"status": "ok", "woken": False}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body is not JSON")
+    return {"status": "accepted", "woken": webhooks.handle_event(event, payload)}
+
+
+@app.get("/api/runs/{run_id}/events")
+async def stream_run_events(run_id: str, request: Request, last_event_id: int | None = None) -> StreamingResponse:
+    """Server-Sent Events stream of run progress deltas.
+
+    Starts with a `snapshot` of the run unless the client resumes (`Last-Event-ID` header
+    or `last_event_id` query) from an event that is still buffered.
+    """
+    try:
+        storage.get_run(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+
+    header_id = request.headers.get("last-event-id", "")
+    resume_from = last_event_id if last_event_id is not None else int(header_id) if header_id.isdigit() else None
+    events = runner.events
+
+    async def stream():
+        cursor = resume_from
+        if cursor is None or not events.can_resume(run_id, cursor):
+            # Snapshot and cursor are taken together, so no event falls between them
+            run = runner.current_state(run_id)
+            cursor = events.last_event_id(run_id)
+            details = RunDetailsResponse(**run, queue_position=scheduler.queue_position(run_id))
+            yield f"id: {cursor}\nevent: snapshot\ndata: {json.dumps(details.model_dump())}\n\n"
+            finished = run["status"] in {"PASSED", "FAILED"}
+            if finished and run_id not in runner.live_states and run_id not in scheduler.running and not details.queue_position:
+                yield f"id: {cursor}\nevent: {TERMINAL_EVENT}\ndata: {json.dumps(details.model_dump())}\n\n"
+                return
+
+        async for event in events.subscribe(run_id, cursor):
+            if await request.is_disconnected():
+                return
+            yield event.encode() if event else ": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -11,12 +11,14 @@ class RunRequest(BaseModel):
     team_name: str = Field(min_length=1)
     team_leader_name: str = Field(min_length=1)
     retry_limit: int = Field(default=5, ge=1, le=20)
+    priority: int = Field(default=0, ge=0, le=10)
 
 
 class RunResponse(BaseModel):
     run_id: str
     status: RunStatus
     branch_name: str
+    queue_position: int | None = None
 
 
 class FixEntry(BaseModel):
@@ -42,6 +44,23 @@ class ScoreBreakdown(BaseModel):
     final_score: int
 
 
+class AnalysisCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+
+
+class SpeculationStats(BaseModel):
+    reused: int = 0
+    discarded: int = 0
+
+
+class CloneStats(BaseModel):
+    strategy: str
+    seconds: float
+    bytes_received: int
+    sparse_directories: int | None = None
+
+
 class RunDetailsResponse(BaseModel):
     run_id: str
     repository_url: str
@@ -60,3 +79,9 @@ class RunDetailsResponse(BaseModel):
     timeline: List[TimelineEntry]
     error_message: str | None = None
     ci_workflow_url: str | None = None
+    analysis_cache: AnalysisCacheStats | None = None
+    speculation: SpeculationStats | None = None
+    clone: CloneStats | None = None
+    queue_position: int | None = None
+    version: int = 0
+    since_version: int | None = None
@@ -0,0 +1,158 @@
+"""Persistent, content-addressed cache of static analysis findings."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+# Only the application's own modules can hold rules; library upgrades don't invalidate the cache
+RULE_MODULE_PREFIX = "app."
+
+
+def rule_modules(module_name: str) -> tuple[str, ...]:
+    """A module and every application module it imports from, directly or transitively.
+
+    Rules often live outside the analyzer's module (e.g. `static_analyzer` runs the rules of
+    `python_rule_engine`), so all of them make up the rule set.
+    """
+    seen: set[str] = set()
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        module = sys.modules.get(name)
+        if name in seen or module is None:
+            continue
+        seen.add(name)
+        for value in vars(module).values():
+            dependency = value.__name__ if isinstance(value, ModuleType) else getattr(value, "__module__", None)
+            if isinstance(dependency, str) and dependency.startswith(RULE_MODULE_PREFIX) and dependency not in seen:
+                pending.append(dependency)
+    return tuple(sorted(seen))
+
+
+@lru_cache(maxsize=None)
+def _module_digest(module_name: str) -> str:
+    digest = hashlib.sha256()
+    for name in rule_modules(module_name):
+        module_file = getattr(sys.modules[name], "__file__", None)
+        if module_file:
+            digest.update(name.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(Path(module_file).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def ruleset_version(analyzer: object) -> str:
+    """Rule-set version of an analyzer: a digest of its module and the application modules it uses.
+
+    Any edit to an analyzer's rules changes the digest, so stale findings are never served.
+    """
+    return _module_digest(type(analyzer).__module__)
+
+
+class AnalysisCacheService:
+    """Stores findings per file keyed by (content hash, analyzer, rule-set version).
+
+    Findings are stored without their file path so identical files in different
+    repositories (e.g. vendored code) share entries. Eviction is least-recently-used
+    once the table grows past `max_entries`.
+    """
+
+    def __init__(self, db_path: Path | None = None, max_entries: int | None = None) -> None:
+        if db_path is None:
+            data_dir = Path(__file__).resolve().parents[2] / "data"
+            data_dir.mkdir(exist_ok=True)
+            db_path = data_dir / "analysis_cache.db"
+        self.db_path = db_path
+        self.max_entries = max_entries or int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "50000"))
+        self.lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS findings (
+                    cache_key TEXT PRIMARY KEY,
+                    findings TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_findings_last_used ON findings(last_used)")
+            conn.commit()
+
+    @staticmethod
+    def make_key(source: str, analyzer_name: str, version: str) -> str:
+        content_hash = hashlib.sha256(source.encode("utf-8", errors="surrogatepass")).hexdigest()
+        return f"{analyzer_name}:{version}:{content_hash}"
+
+    def get_many(self, keys: list[str]) -> dict[str, list[dict[str, Any]]]:
+        """Look up findings for many keys at once and mark the hits as recently used."""
+        found: dict[str, list[dict[str, Any]]] = {}
+        if not keys:
+            return found
+        with sqlite3.connect(self.db_path) as conn:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT cache_key, findings FROM findings WHERE cache_key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for cache_key, payload in rows:
+                    found[cache_key] = json.loads(payload)
+            if found:
+                with self.lock:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE findings SET last_used = ? WHERE cache_key = ?",
+                        [(now, cache_key) for cache_key in found],
+                    )
+                    conn.commit()
+        return found
+
+    def put_many(self, entries: dict[str, list[dict[str, Any]]]) -> None:
+        """Store findings (without file paths) and evict least-recently-used entries past the bound."""
+        if not entries:
+            return
+        now = time.time()
+        rows = [(cache_key, json.dumps(findings), now) for cache_key, findings in entries.items()]
+        with self.lock:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO findings(cache_key, findings, last_used)
+                    VALUES(?, ?, ?)
+                    ON CONFLICT(cache_key)
+                    DO UPDATE SET findings = excluded.findings, last_used = excluded.last_used
+                    """,
+                    rows,
+                )
+                total = conn.execute("SELECT COUNT(*) FROM findings").fetchone()[0]
+                excess = total - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        """
+                        DELETE FROM findings WHERE cache_key IN (
+                            SELECT cache_key FROM findings ORDER BY last_used ASC LIMIT ?
+                        )
+                        """,
+                        (excess,),
+                    )
+                conn.commit()
+
+    def clear(self) -> None:
+        with self.lock:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("DELETE FROM findings")
+                conn.commit()
@@ -0,0 +1,244 @@
+"""Shared, rate-limit-aware polling of GitHub Actions results."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from app.services.ci_webhooks import CIWebhookRegistry
+from app.services.github_ops import GitHubOpsService, GitHubRateLimitError, WorkflowRunPoll
+
+BACKOFF_FACTOR = 1.5
+
+
+class TokenBucket:
+    """
+    Request budget shared by every poll loop.
+
+    Tokens refill at `rate` per second up to `capacity`. The rate follows the API's
+    rate-limit headers: the remaining quota minus `reserve` is spread evenly until the
+    window resets. When that leaves nothing, polling stops until the reset.
+    """
+
+    def __init__(self, capacity: float, rate: float, reserve: int = 0) -> None:
+        self.capacity = capacity
+        self.tokens = capacity
+        self.rate = rate
+        self.reserve = reserve
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        blocked = max(0.0, self.blocked_until - time.monotonic())
+        if blocked or self.tokens >= 1:
+            return blocked
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self.tokens -= 1
+
+    def refund(self) -> None:
+        """Return a token for a request that did not count against the quota (e.g. a 304)."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def block_until(self, epoch_seconds: float) -> None:
+        self._refill()
+        self.tokens = 0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + max(0.0, epoch_seconds - time.time()))
+
+    def update_from_headers(self, remaining: int, reset_epoch: float) -> None:
+        budget = remaining - self.reserve
+        if budget <= 0:
+            self.block_until(reset_epoch)
+            return
+        self._refill()
+        self.rate = budget / max(1.0, reset_epoch - time.time())
+
+
+@dataclass
+class _BranchPoll:
+    task: asyncio.Task | None = None
+    waiters: int = 0
+    workflow_url: str | None = None
+    last_status: str | None = None
+    polls: int = 0
+
+
+class CIPollScheduler:
+    """
+    Waits for GitHub Actions results on behalf of every run.
+
+    Runs waiting on the same (owner, repo, branch, commit) share one poll loop. Each loop picks
+    its next interval from the workflow status (sooner once a job is running than while
+    it is queued) and stretches it by `BACKOFF_FACTOR` while nothing changes. Errors back
+    off exponentially. Every sleep is jittered, and every request first takes a token
+    from the shared `TokenBucket`.
+
+    With webhooks enabled, a loop polls once and then mostly waits for the branch's
+    `workflow_run` delivery, polling again only every `CI_WEBHOOK_FALLBACK_INTERVAL`
+    seconds in case a delivery is lost.
+    """
+
+    def __init__(
+        self,
+        github_ops: GitHubOpsService,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        burst: int | None = None,
+        reserve: int | None = None,
+        jitter: float = 0.2,
+        webhooks: CIWebhookRegistry | None = None,
+        fallback_interval: float | None = None,
+    ) -> None:
+        self.github_ops = github_ops
+        self.webhooks = webhooks
+        self.fallback_interval = fallback_interval or float(os.getenv("CI_WEBHOOK_FALLBACK_INTERVAL", "60"))
+        self.min_interval = min_interval or float(os.getenv("CI_POLL_MIN_INTERVAL", "5"))
+        self.max_interval = max_interval or float(os.getenv("CI_POLL_MAX_INTERVAL", "20"))
+        self.jitter = jitter
+        # Start at the authenticated limit (5000/hour) until the first response reports the real budget
+        self.bucket = TokenBucket(
+            capacity=burst or int(os.getenv("CI_POLL_BURST", "10")),
+            rate=5000 / 3600,
+            reserve=reserve if reserve is not None else int(os.getenv("CI_POLL_RATE_RESERVE", "500")),
+        )
+        self.polls: dict[tuple[str, str, str, str | None], _BranchPoll] = {}
+        self.stats = {"requests": 0, "coalesced": 0, "rate_limited": 0, "errors": 0}
+
+    async def wait_for_completion(
+        self,
+        owner: str,
+        repo: str,
+        branch_name: str,
+        timeout_seconds: float = 480,
+        head_sha: str | None = None,
+    ) -> tuple[str, str | None]:
+        """Wait for the branch's latest workflow run. Returns ("PASSED" | "FAILED", workflow URL).
+
+        With `head_sha` only workflow runs of that commit count; runs and webhook deliveries
+        for earlier commits of the branch are ignored.
+        """
+        key = (owner, repo, branch_name, head_sha)
+        state = self.polls.get(key)
+        if state is None:
+            state = _BranchPoll()
+            state.task = asyncio.create_task(self._poll_loop(key, state))
+            self.polls[key] = state
+        else:
+            self.stats["coalesced"] += 1
+
+        state.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(state.task), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            return "FAILED", state.workflow_url
+        finally:
+            state.waiters -= 1
+            if state.waiters == 0 and not state.task.done():
+                state.task.cancel()
+                self._forget(key, state)
+
+    def _forget(self, key: tuple[str, str, str, str | None], state: _BranchPoll) -> None:
+        if self.polls.get(key) is state:
+            del self.polls[key]
+
+    def _interval_for(self, status: str | None) -> float:
+        # A running job finishes sooner than a queued one starts; no run yet means the push is still registering
+        if status in (None, "in_progress"):
+            return self.min_interval
+        return min(self.max_interval, self.min_interval * 2)
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _pause(self, seconds: float, webhook: asyncio.Future | None) -> tuple[str, str | None] | None:
+        """Sleep between polls; returns the CI result if a webhook delivers it first."""
+        if webhook is None:
+            await asyncio.sleep(self._jittered(seconds))
+            return None
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(webhook),
+                timeout=self._jittered(max(seconds, self.fallback_interval)),
+            )
+        except asyncio.TimeoutError:
+            return None
+
+    def _record_budget(self, poll: WorkflowRunPoll) -> None:
+        if poll.not_modified:
+            self.bucket.refund()
+        if poll.rate_remaining is not None and poll.rate_reset is not None:
+            self.bucket.update_from_headers(poll.rate_remaining, poll.rate_reset)
+
+    async def _poll_loop(
+        self, key: tuple[str, str, str, str | None], state: _BranchPoll
+    ) -> tuple[str, str | None]:
+        owner, repo, branch_name, head_sha = key
+        interval = self.min_interval
+        errors = 0
+        webhook = self.webhooks.future_for(*key) if self.webhooks and self.webhooks.enabled else None
+        try:
+            while True:
+                await self.bucket.acquire()
+                self.stats["requests"] += 1
+                try:
+                    poll = await self.github_ops.fetch_workflow_run(owner, repo, branch_name)
+                except GitHubRateLimitError as error:
+                    self.stats["rate_limited"] += 1
+                    self.bucket.block_until(error.retry_at)
+                    continue
+                except httpx.HTTPStatusError as error:
+                    if error.response.status_code < 500:
+                        raise
+                    poll = None
+                except httpx.TransportError:
+                    poll = None
+
+                if poll is None:
+                    errors += 1
+                    self.stats["errors"] += 1
+                    result = await self._pause(min(self.max_interval, self.min_interval * 2**errors), webhook)
+                    if result is not None:
+                        return result
+                    continue
+
+                errors = 0
+                state.polls += 1
+                self._record_budget(poll)
+                run = poll.run
+                if run is not None and head_sha is not None and run.get("head_sha") != head_sha:
+                    # The push hasn't registered a workflow run yet; this one is for an earlier commit
+                    run = None
+                status = run.get("status") if run else None
+                if run is not None:
+                    state.workflow_url = run.get("html_url")
+                    if status == "completed":
+                        return ("PASSED" if run.get("conclusion") == "success" else "FAILED"), state.workflow_url
+
+                if status != state.last_status or state.polls == 1:
+                    interval = self._interval_for(status)
+                    state.last_status = status
+                else:
+                    interval = min(self.max_interval, interval * BACKOFF_FACTOR)
+                result = await self._pause(interval, webhook)
+                if result is not None:
+                    state.workflow_url = result[1] or state.workflow_url
+                    return result
+        finally:
+            self._forget(key, state)
+            if webhook is not None:
+                self.webhooks.discard(*key)
@@ -0,0 +1,87 @@
+"""GitHub `workflow_run` webhooks: signature checks and wake-ups for runs waiting on CI."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import os
+from typing import Any
+
+# (owner, repo, branch, head sha or None for any commit)
+CommitKey = tuple[str, str, str, str | None]
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """Value of the `X-Hub-Signature-256` header GitHub sends for `body`."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class CIWebhookRegistry:
+    """
+    Futures for runs waiting on CI, keyed by (owner, repo, branch, head sha).
+
+    A verified `workflow_run` event with action `completed` resolves the future of the
+    commit it ran on with ("PASSED" | "FAILED", workflow URL); deliveries for other commits
+    of the branch (e.g. a late one for a previous push) are ignored. Waiters that don't know
+    their commit accept any sha. Owner and repository are matched case-insensitively, as
+    GitHub does. Webhooks are enabled when `GITHUB_WEBHOOK_SECRET` is set; unsigned
+    deliveries are never accepted.
+    """
+
+    def __init__(self, secret: str | None = None) -> None:
+        self.secret = secret if secret is not None else os.getenv("GITHUB_WEBHOOK_SECRET", "").strip()
+        self.futures: dict[CommitKey, asyncio.Future] = {}
+        self.stats = {"deliveries": 0, "woken": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.secret)
+
+    @staticmethod
+    def key(owner: str, repo: str, branch_name: str, head_sha: str | None = None) -> CommitKey:
+        return owner.lower(), repo.lower(), branch_name, head_sha
+
+    def verify(self, body: bytes, signature: str | None) -> bool:
+        if not self.enabled or not signature:
+            return False
+        return hmac.compare_digest(sign_payload(self.secret, body), signature)
+
+    def future_for(self, owner: str, repo: str, branch_name: str, head_sha: str | None = None) -> asyncio.Future:
+        """The pending future for a commit of a branch, created on first use."""
+        key = self.key(owner, repo, branch_name, head_sha)
+        future = self.futures.get(key)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self.futures[key] = future
+        return future
+
+    def discard(self, owner: str, repo: str, branch_name: str, head_sha: str | None = None) -> None:
+        future = self.futures.pop(self.key(owner, repo, branch_name, head_sha), None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    def handle_event(self, event: str, payload: dict[str, Any]) -> bool:
+        """Apply a verified delivery. Returns True if it woke a waiting run."""
+        self.stats["deliveries"] += 1
+        if event != "workflow_run" or payload.get("action") != "completed":
+            return False
+        workflow_run = payload.get("workflow_run") or {}
+        full_name = (payload.get("repository") or {}).get("full_name", "")
+        owner, _, repo = full_name.partition("/")
+        branch_name = workflow_run.get("head_branch")
+        if not owner or not repo or not branch_name:
+            return False
+
+        future = None
+        for head_sha in (workflow_run.get("head_sha"), None):
+            key = self.key(owner, repo, branch_name, head_sha)
+            if key in self.futures and not self.futures[key].done():
+                future = self.futures.pop(key)
+                break
+        if future is None:
+            return False
+        status = "PASSED" if workflow_run.get("conclusion") == "success" else "FAILED"
+        future.set_result((status, workflow_run.get("html_url")))
+        self.stats["woken"] += 1
+        return True
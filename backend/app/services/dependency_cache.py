@@ -0,0 +1,170 @@
+"""Persistent dependency caches mounted into test sandboxes, keyed by lockfile content."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shlex
+import threading
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+@dataclass(frozen=True)
+class CacheMount:
+    name: str
+    target: str
+
+
+NPM_CACHE = "/root/.npm"
+
+# Ecosystem -> (manifest globs at the repository root, container paths to persist)
+ECOSYSTEMS: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "pip": (
+        ("requirements*.txt", "pyproject.toml", "setup.cfg", "setup.py", "Pipfile.lock", "poetry.lock"),
+        ("/root/.cache/pip", "/opt/deps/python"),
+    ),
+    "npm": (("package.json", "package-lock.json"), (NPM_CACHE, "/workspace/node_modules")),
+    "maven": (("pom.xml",), ("/root/.m2",)),
+    "gradle": (("build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts"), ("/root/.gradle",)),
+}
+
+# Ecosystems only mounted when one of their manifests is present (pip is always needed for pytest)
+OPTIONAL_ECOSYSTEMS = {"npm", "maven", "gradle"}
+
+REGISTRY_MOUNT = "/registry"
+
+
+class DependencyCacheService:
+    """
+    Computes the cache volumes and environment for a sandbox.
+
+    Each ecosystem gets volumes named after a hash of its manifests, so a run with an
+    unchanged lockfile mounts an environment that is already populated. Python packages
+    are installed into `PYTHONUSERBASE` on a volume, npm's `node_modules` is a volume.
+
+    With `DEPENDENCY_CACHE_DIR` set, volumes are host directories under it instead of
+    named Docker volumes. `DEPENDENCY_REGISTRY_URL` points pip/npm at a local registry;
+    `DEPENDENCY_REGISTRY_DIR` mounts a directory of packages read-only and installs offline
+    from it: pip reads `pip/` as find-links, and `npm/` (an npm cache) is copied into the
+    writable npm cache volume before installing, since npm writes to its cache even offline.
+
+    Volumes are mounted read-write into every sandbox with the same digest (all Python
+    repositories without manifests share the "default" pip volumes), so installs take
+    `install_lock`; with `DEPENDENCY_CACHE_DIR` the lock is also a file lock, which covers
+    several backend processes sharing the cache directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        registry_url: str | None = None,
+        registry_dir: Path | None = None,
+    ) -> None:
+        cache_dir_env = os.getenv("DEPENDENCY_CACHE_DIR", "")
+        registry_dir_env = os.getenv("DEPENDENCY_REGISTRY_DIR", "")
+        self.cache_dir = cache_dir or (Path(cache_dir_env) if cache_dir_env else None)
+        self.registry_url = registry_url or os.getenv("DEPENDENCY_REGISTRY_URL", "")
+        self.registry_dir = registry_dir or (Path(registry_dir_env) if registry_dir_env else None)
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def lockfile_digest(self, repo_path: Path, ecosystem: str) -> str | None:
+        """Hash of the ecosystem's manifests, or None if it has none at the repository root."""
+        patterns, _targets = ECOSYSTEMS[ecosystem]
+        manifests = sorted({path for pattern in patterns for path in repo_path.glob(pattern) if path.is_file()})
+        if not manifests:
+            return None
+        digest = hashlib.sha256()
+        for manifest in manifests:
+            digest.update(manifest.name.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(manifest.read_bytes())
+        return digest.hexdigest()[:12]
+
+    def mounts(self, repo_path: Path) -> list[CacheMount]:
+        mounts: list[CacheMount] = []
+        for ecosystem, (_patterns, targets) in ECOSYSTEMS.items():
+            digest = self.lockfile_digest(repo_path, ecosystem)
+            if digest is None:
+                if ecosystem in OPTIONAL_ECOSYSTEMS:
+                    continue
+                digest = "default"
+            for target in targets:
+                suffix = target.strip("/").replace("/", "-").replace(".", "")
+                mounts.append(CacheMount(name=f"healing-{ecosystem}-{suffix}-{digest}", target=target))
+        return mounts
+
+    @contextmanager
+    def install_lock(self, repo_path: Path) -> Iterator[None]:
+        """Hold while installing into a sandbox of `repo_path`: serializes writers of its volumes."""
+        with ExitStack() as stack:
+            # Sorted, so two installs sharing several volumes can't deadlock
+            for name in sorted({mount.name for mount in self.mounts(repo_path)}):
+                stack.enter_context(self._volume_lock(name))
+            yield
+
+    @contextmanager
+    def _volume_lock(self, name: str) -> Iterator[None]:
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(name, threading.Lock())
+        with thread_lock:
+            if fcntl is None or self.cache_dir is None:
+                yield
+                return
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_dir / f"{name}.lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def environment(self) -> dict[str, str]:
+        env = {
+            # Installs go to the persistent user base instead of the container's site-packages
+            "PYTHONUSERBASE": "/opt/deps/python",
+            "PIP_USER": "1",
+            "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+        }
+        if self.registry_url:
+            env["PIP_INDEX_URL"] = self.registry_url
+            env["NPM_CONFIG_REGISTRY"] = self.registry_url
+        if self.registry_dir:
+            env["PIP_NO_INDEX"] = "1"
+            env["PIP_FIND_LINKS"] = f"{REGISTRY_MOUNT}/pip"
+            env["NPM_CONFIG_CACHE"] = NPM_CACHE
+            env["NPM_CONFIG_OFFLINE"] = "true"
+        return env
+
+    def install_command(self, command: list[str]) -> list[str]:
+        """`command`, preceded for npm by seeding its cache from the registry directory."""
+        if not self.registry_dir or command[:1] != ["npm"]:
+            return command
+        source = f"{REGISTRY_MOUNT}/npm"
+        # Existing cache entries are kept; a failed copy leaves npm to report what is missing
+        seed = f"if [ -d {source} ]; then cp -Rn {source}/. {NPM_CACHE}/; fi"
+        return ["sh", "-c", f"{seed}; exec {shlex.join(command)}"]
+
+    def docker_args(self, repo_path: Path) -> tuple[str, ...]:
+        """`docker create` arguments mounting the caches and setting the environment."""
+        args: list[str] = []
+        for mount in self.mounts(repo_path):
+            source = mount.name
+            if self.cache_dir:
+                host_dir = self.cache_dir / mount.name
+                host_dir.mkdir(parents=True, exist_ok=True)
+                source = str(host_dir)
+            args += ["-v", f"{source}:{mount.target}"]
+        if self.registry_dir:
+            args += ["-v", f"{self.registry_dir}:{REGISTRY_MOUNT}:ro"]
+        for key, value in self.environment().items():
+            args += ["-e", f"{key}={value}"]
+        return tuple(args)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
 
+from app.services.output_stream import LineCallback, run_streaming
+
 
 @dataclass
 class ContainerExecResult:
@@ -12,6 +15,8 @@ class ContainerExecResult:
     return_code: int
     stdout: str
     stderr: str
+    # The `on_line` callback asked to stop before the command finished
+    stopped_early: bool = False
 
     @property
     def output(self) -> str:
@@ -28,8 +33,17 @@ class DockerExecutor:
         self.image = image
         self.containers: list[str] = []
 
-    def create_container(self, work_dir: Path, name: str | None = None) -> str:
-        """Create and start a Docker container for sandboxed execution."""
+    def create_container(
+        self,
+        work_dir: Path,
+        name: str | None = None,
+        image: str | None = None,
+        extra_args: tuple[str, ...] = (),
+    ) -> str:
+        """Create and start a Docker container for sandboxed execution.
+
+        `extra_args` are passed to `docker create` (e.g. cache volume mounts and environment).
+        """
         cmd = [
             "docker",
             "create",
@@ -38,7 +52,8 @@ class DockerExecutor:
             "-v", f"{work_dir}:/workspace",
             "-w", "/workspace",
             "--name", name or f"sandbox-{id(work_dir)}",
-            self.image,
+            *extra_args,
+            image or self.image,
             "sleep", "infinity",
         ]
         try:
@@ -84,6 +99,48 @@ class DockerExecutor:
                 stderr=e.stderr or str(e),
             )
 
+    async def execute_in_container_async(
+        self,
+        container_id: str,
+        command: list[str],
+        timeout: int = 240,
+        on_line: LineCallback | None = None,
+    ) -> ContainerExecResult:
+        """Execute a command inside a Docker container without blocking the event loop.
+
+        Output lines are handed to `on_line` while the command runs; if it returns True the
+        command is stopped and the output so far is returned.
+        """
+        result = await run_streaming(["docker", "exec", container_id, *command], timeout, on_line)
+        if result.timed_out:
+            return ContainerExecResult(
+                container_id=container_id,
+                return_code=124,
+                stdout=result.stdout,
+                stderr=f"{result.stderr}\nCommand timed out after {timeout} seconds".lstrip(),
+            )
+        return ContainerExecResult(
+            container_id=container_id,
+            return_code=result.return_code,
+            stdout=result.stdout,
+            stderr=result.stderr,
+            stopped_early=result.stopped_early,
+        )
+
+    def is_running(self, container_id: str) -> bool:
+        """Check that a container exists and is running (`docker inspect`)."""
+        try:
+            result = subprocess.run(
+                ["docker", "inspect", "-f", "{{.State.Running}}", container_id],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                check=False,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0 and result.stdout.strip() == "true"
+
     def copy_to_container(self, container_id: str, src: Path, dest: str) -> None:
         """Copy a file or directory into the container."""
         cmd = ["docker", "cp", str(src), f"{container_id}:{dest}"]
@@ -116,3 +173,19 @@ class DockerExecutor:
             return result.returncode == 0
         except Exception:
             return False
+
+    async def healthcheck_async(self) -> bool:
+        """Non-blocking variant of `healthcheck`."""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "docker", "version",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+        try:
+            return await asyncio.wait_for(process.wait(), timeout=5) == 0
+        except asyncio.TimeoutError:
+            process.kill()
+            return False
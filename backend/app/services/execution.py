@@ -0,0 +1,44 @@
+"""Bounded executors that keep blocking pipeline stages off the asyncio event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class ExecutionLayer:
+    """
+    Dispatches blocking work from async code to dedicated thread pools.
+
+    - `run_io`: git, filesystem and other short blocking calls (`BLOCKING_IO_WORKERS`).
+    - `run_cpu`: analysis, fix generation and patching (`CPU_STAGE_WORKERS`); kept small so
+      concurrent runs don't starve the event loop of the GIL. Heavy analysis is further
+      sharded to the analyzer's process pool.
+    """
+
+    def __init__(self, io_workers: int | None = None, cpu_workers: int | None = None) -> None:
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=io_workers or int(os.getenv("BLOCKING_IO_WORKERS", "8")),
+            thread_name_prefix="healing-io",
+        )
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=cpu_workers or int(os.getenv("CPU_STAGE_WORKERS", "2")),
+            thread_name_prefix="healing-cpu",
+        )
+
+    async def run_io(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_executor, partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.cpu_executor, partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+        self.cpu_executor.shutdown(wait=False, cancel_futures=True)
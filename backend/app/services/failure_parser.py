@@ -1,135 +1,419 @@
 from __future__ import annotations
 
+import importlib.util
+import io
+import json
 import re
-from typing import Any
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from app.services.repository_index import RepositoryIndex
+    from app.services.test_engine import TestRunResult
+
+# Jest reports are read incrementally with the optional `ijson` package; without it the file is loaded whole
+IJSON_AVAILABLE = importlib.util.find_spec("ijson") is not None
 
 BUG_TYPES = ["LINTING", "SYNTAX", "LOGIC", "TYPE_ERROR", "IMPORT", "INDENTATION"]
 
+# Lines longer than this are truncated; keeps memory bounded on logs with huge single lines
+MAX_LINE_CHARS = 64 * 1024
+# An error line with no traceback frame before it takes the first frame within this many lines after it
+LOOKAHEAD_LINES = 2
+
+FILE_LINE_PATTERN = re.compile(r'File "([^"]+)", line (\d+)')
+LINT_PATTERN = re.compile(r'^([^:\s]+):(\d+):\d+:\s*([A-Z]\d+)\s+(.+)$')
+LOGIC_PREFIX_PATTERN = re.compile(r'^(FAILED|assert|AssertionError)', re.IGNORECASE)
+# One pass finds every error marker on a line; the highest-priority one decides the bug type
+ERROR_MARKER_PATTERN = re.compile(
+    r"SyntaxError|IndentationError|(?i:unexpected indent)|ModuleNotFoundError|ImportError"
+    r"|(?i:cannot import name)|TypeError|AssertionError"
+)
+# Where the sandbox mounts the workspace; report paths under it are made repository-relative
+CONTAINER_WORKSPACE = "/workspace/"
+MAX_MESSAGE_CHARS = 500
+
+# Frames in report stack traces: pytest crash lines, Java stack frames, JavaScript stack frames
+PYTEST_CRASH_PATTERN = re.compile(r"^(\S+?):(\d+): (?:in \S+|[\w.]+)$")
+JAVA_FRAME_PATTERN = re.compile(r"at ([\w$.]+)\.[\w$<>]+\(([\w$]+\.(?:java|kt|groovy)):(\d+)\)")
+# pytest's `E   ModuleNotFoundError: ...` lines and JVM exception headers
+EXCEPTION_LINE_PATTERN = re.compile(r"^(?:E\s+)?([\w.]+(?:Error|Exception)\b.*)$")
+JS_FRAME_PATTERN = re.compile(r"\(?((?:[A-Za-z]:)?[^\s():]+\.[cm]?[jt]sx?):(\d+)(?::\d+)?\)?")
+
+MARKER_BUG_TYPES = {
+    "syntaxerror": (0, "SYNTAX"),
+    "indentationerror": (1, "INDENTATION"),
+    "unexpected indent": (1, "INDENTATION"),
+    "modulenotfounderror": (2, "IMPORT"),
+    "importerror": (2, "IMPORT"),
+    "cannot import name": (2, "IMPORT"),
+    "typeerror": (3, "TYPE_ERROR"),
+    "assertionerror": (4, "LOGIC"),
+}
+
+
+class FailureStream:
+    """
+    Incremental parser state for one test output.
+
+    `feed` accepts chunks of any size; complete lines are parsed as they arrive. Only the
+    most recent traceback frame, the unfinished last line and error lines still waiting
+    for a following frame are kept, so memory does not grow with the length of the log.
+    """
+
+    def __init__(self) -> None:
+        self.current_file: str | None = None
+        self.current_line: int | None = None
+        # Error lines seen before any traceback frame: [bug_type, message, lines left, needs a known file]
+        self._pending: list[list[Any]] = []
+        self._partial: list[str] = []
+        self._partial_chars = 0
+        self._failures: dict[tuple[str, int, str], dict[str, Any]] = {}
+
+    def feed(self, chunk: str) -> None:
+        start = 0
+        while (end := chunk.find("\n", start)) >= 0:
+            self._buffer(chunk[start:end])
+            line = "".join(self._partial)
+            self._partial.clear()
+            self._partial_chars = 0
+            self.feed_line(line)
+            start = end + 1
+        self._buffer(chunk[start:])
+
+    def _buffer(self, text: str) -> None:
+        room = MAX_LINE_CHARS - self._partial_chars
+        if text and room > 0:
+            self._partial.append(text[:room])
+            self._partial_chars += min(len(text), room)
+
+    def feed_line(self, line: str) -> None:
+        """Parse one complete line (without its line terminator)."""
+        line = line.rstrip("\r")
+        file_line_match = FILE_LINE_PATTERN.search(line)
+        if file_line_match:
+            self.current_file = file_line_match.group(1)
+            self.current_line = int(file_line_match.group(2))
+            for bug_type, message, _, needs_known_file in self._pending:
+                self._record(bug_type, message, needs_known_file)
+            self._pending.clear()
+        elif self._pending:
+            for entry in self._pending:
+                entry[2] -= 1
+            self._pending = [entry for entry in self._pending if entry[2] > 0]
+
+        stripped = line.strip()
+        # LINTING: Flake8/pylint format
+        lint_match = LINT_PATTERN.match(stripped)
+        if lint_match:
+            self._add(lint_match.group(1), int(lint_match.group(2)), "LINTING", lint_match.group(4))
+            return
+
+        markers = ERROR_MARKER_PATTERN.findall(line)
+        if markers:
+            _, bug_type = min(MARKER_BUG_TYPES[marker.lower()] for marker in markers)
+            # A TypeError without a real source location can't be fixed
+            self._locate(bug_type, stripped, needs_known_file=bug_type == "TYPE_ERROR")
+            return
+
+        # LOGIC: Failed test with assertion context
+        if LOGIC_PREFIX_PATTERN.match(stripped):
+            self._locate("LOGIC", stripped, needs_known_file=False)
+
+    def _locate(self, bug_type: str, message: str, needs_known_file: bool) -> None:
+        if self.current_file is not None:
+            self._record(bug_type, message, needs_known_file)
+        else:
+            self._pending.append([bug_type, message, LOOKAHEAD_LINES, needs_known_file])
+
+    def _record(self, bug_type: str, message: str, needs_known_file: bool) -> None:
+        if needs_known_file and self.current_file == "unknown":
+            return
+        self._add(self.current_file, self.current_line, bug_type, message)
+
+    def _add(self, file: str, line_number: int, bug_type: str, message: str) -> None:
+        # Deduplicate by (file, line_number, bug_type); the latest message wins
+        self._failures[(file, line_number, bug_type)] = {
+            "file": file,
+            "line_number": line_number,
+            "bug_type": bug_type,
+            "message": message,
+        }
+
+    @property
+    def failure_count(self) -> int:
+        return len(self._failures)
+
+    @property
+    def failure_keys(self) -> set[tuple[str, int, str]]:
+        """(file, line_number, bug_type) of the failures found so far."""
+        return set(self._failures)
+
+    def close(self) -> list[dict[str, Any]]:
+        """Parse the unterminated last line and return the failures found."""
+        if self._partial:
+            line = "".join(self._partial)
+            self._partial.clear()
+            self._partial_chars = 0
+            self.feed_line(line)
+        self._pending.clear()
+        return list(self._failures.values())
+
+
+class LiveFailureParser:
+    """
+    Parses a running test command's output line by line, one `FailureStream` per output
+    stream so stderr lines don't interleave with stdout tracebacks.
+
+    Shards of a sharded execution name their streams `shard<N>:stdout`, so each shard gets
+    its own streams and concurrent shards never pair one's frames with another's errors.
+
+    Used as the test engine's `on_line` callback: with `stop_after` set it returns True once
+    that many distinct failures were seen across all streams, which stops the test command early.
+    """
+
+    def __init__(self, stop_after: int = 0) -> None:
+        self.stop_after = stop_after
+        self.streams: dict[str, FailureStream] = {}
+
+    def on_line(self, stream: str, line: str) -> bool:
+        parsed = self.streams.get(stream)
+        if parsed is None:
+            parsed = self.streams[stream] = FailureStream()
+        parsed.feed_line(line)
+        if not self.stop_after:
+            return False
+        # Cheap upper bound first; the union only when it could reach the limit
+        streams = self.streams.values()
+        if sum(other.failure_count for other in streams) < self.stop_after:
+            return False
+        return len(set().union(*(other.failure_keys for other in streams))) >= self.stop_after
+
+    def close(self) -> list[dict[str, Any]]:
+        failures: dict[tuple[str, int, str], dict[str, Any]] = {}
+        for parsed in self.streams.values():
+            for item in parsed.close():
+                failures[(item["file"], item["line_number"], item["bug_type"])] = item
+        return list(failures.values())
+
+
+def _failure(file: str, line_number: int, bug_type: str, message: str) -> dict[str, Any]:
+    return {"file": file, "line_number": line_number, "bug_type": bug_type, "message": message}
+
+
+def _bug_type(*texts: str) -> str:
+    """Bug type of the highest-priority error marker in the first text that has one."""
+    for text in texts:
+        markers = ERROR_MARKER_PATTERN.findall(text)
+        if markers:
+            return min(MARKER_BUG_TYPES[marker.lower()] for marker in markers)[1]
+    return "LOGIC"
+
+
+def _first_line(text: str) -> str:
+    for line in text.splitlines():
+        if line.strip():
+            return line.strip()[:MAX_MESSAGE_CHARS]
+    return ""
+
+
+class ReportPaths:
+    """Maps file references in test reports to repository-relative paths."""
+
+    def __init__(self, index: RepositoryIndex | None = None) -> None:
+        self.index = index
+        self.known = {item.relative_path for item in index.files} if index else None
+        self._by_name: dict[str, list[str]] | None = None
+
+    def relative(self, path: str) -> str | None:
+        """Repository-relative form of `path`, or None if it is outside the repository."""
+        path = path.replace("\\", "/")
+        if path.startswith(CONTAINER_WORKSPACE):
+            path = path[len(CONTAINER_WORKSPACE):]
+        elif Path(path).is_absolute():
+            if self.index is None:
+                return None
+            try:
+                path = Path(path).resolve().relative_to(self.index.root.resolve()).as_posix()
+            except ValueError:
+                return None
+        path = path.removeprefix("./")
+        if self.known is not None:
+            return path if path in self.known else None
+        return None if "node_modules/" in path else path
+
+    def for_class(self, class_name: str, file_name: str) -> str | None:
+        """Source file of a JVM stack frame (`com.acme.Calc`, `Calc.java`)."""
+        if self.index is None:
+            return None
+        if self._by_name is None:
+            self._by_name = {}
+            for item in self.index.files:
+                self._by_name.setdefault(item.path.name, []).append(item.relative_path)
+        package = class_name.rpartition(".")[0].replace(".", "/")
+        suffix = f"{package}/{file_name}" if package else file_name
+        for candidate in self._by_name.get(file_name, []):
+            if candidate == suffix or candidate.endswith("/" + suffix):
+                return candidate
+        return None
+
+
+def _python_location(text: str, paths: ReportPaths) -> tuple[str, int] | None:
+    # Python tracebacks list the innermost frame last
+    location = None
+    for line in text.splitlines():
+        line = line.strip()
+        match = FILE_LINE_PATTERN.search(line) or PYTEST_CRASH_PATTERN.match(line)
+        if match and (file := paths.relative(match.group(1))):
+            location = (file, int(match.group(2)))
+    return location
+
+
+def _java_location(text: str, paths: ReportPaths) -> tuple[str, int] | None:
+    # JVM traces list the innermost frame first; library frames don't resolve
+    for match in JAVA_FRAME_PATTERN.finditer(text):
+        file = paths.for_class(match.group(1), match.group(2))
+        if file:
+            return file, int(match.group(3))
+    return None
+
+
+def _js_location(text: str, paths: ReportPaths) -> tuple[str, int] | None:
+    for match in JS_FRAME_PATTERN.finditer(text):
+        file = paths.relative(match.group(1))
+        if file:
+            return file, int(match.group(2))
+    return None
+
+
+def junit_failures(report: Path, paths: ReportPaths) -> Iterator[dict[str, Any]]:
+    """Failed and errored test cases of a JUnit XML report (pytest, Surefire, Gradle).
+
+    The report is read with `iterparse` and each test case is cleared once handled, so
+    memory stays flat however many tests passed.
+    """
+    for _, element in ElementTree.iterparse(report, events=("end",)):
+        if element.tag == "testcase":
+            problem = element.find("failure")
+            if problem is None:
+                problem = element.find("error")
+            if problem is not None:
+                text = problem.text or ""
+                message = _junit_message(problem, text)
+                location = (
+                    _python_location(text, paths)
+                    or _java_location(text, paths)
+                    or _attribute_location(element, paths)
+                )
+                if location:
+                    yield _failure(*location, _bug_type(f"{problem.get('type', '')} {message}", text), message)
+            element.clear()
+        elif element.tag == "testsuite":
+            element.clear()
+
+
+def _junit_message(problem: ElementTree.Element, text: str) -> str:
+    # The patchers match on the exception line (e.g. "ModuleNotFoundError: No module named 'x'");
+    # pytest only puts it in the body, where the last one is the one that was raised
+    exception_line = None
+    for line in text.splitlines():
+        if line.startswith("E ") and (match := EXCEPTION_LINE_PATTERN.match(line)):
+            exception_line = match.group(1)
+    if exception_line:
+        return exception_line[:MAX_MESSAGE_CHARS]
+    message = _first_line(problem.get("message") or "")
+    exception_type = problem.get("type") or ""
+    if exception_type and message and not message.startswith(exception_type):
+        message = f"{exception_type}: {message}"
+    return (message or _first_line(text))[:MAX_MESSAGE_CHARS]
+
+
+def _attribute_location(testcase: ElementTree.Element, paths: ReportPaths) -> tuple[str, int] | None:
+    # pytest's xunit1 family records where the test function is defined
+    file = paths.relative(testcase.get("file") or "")
+    line = testcase.get("line") or ""
+    return (file, int(line)) if file and line.isdigit() else None
+
+
+def jest_failures(report: Path, paths: ReportPaths) -> Iterator[dict[str, Any]]:
+    """Failed assertions and suites that failed to run from a Jest `--json` report."""
+    with open(report, "rb") as file:
+        if IJSON_AVAILABLE:
+            import ijson
+
+            suites = ijson.items(file, "testResults.item")
+        else:
+            suites = json.load(file).get("testResults") or []
+        for suite in suites:
+            suite_file = paths.relative(suite.get("name") or "")
+            failed = [item for item in suite.get("assertionResults") or [] if item.get("status") == "failed"]
+            texts = ["\n".join(item.get("failureMessages") or []) for item in failed]
+            if not failed and suite.get("status") == "failed":
+                texts = [suite.get("message") or ""]
+            for text in texts:
+                location = _js_location(text, paths) or ((suite_file, 1) if suite_file else None)
+                if location:
+                    message = _first_line(text)
+                    yield _failure(*location, _bug_type(message, text), message)
+
 
 class FailureParserService:
     """Parse pytest/linter output to extract structured failure information."""
-    
+
     def parse(self, output: str) -> list[dict[str, Any]]:
         """Parse test output and extract failures with file/line/type info."""
-        failures: list[dict[str, Any]] = []
-        lines = output.splitlines()
-        
-        # Track the current file/line from traceback context
-        current_file = None
-        current_line = None
-        
-        for i, line in enumerate(lines):
-            # Extract file/line from traceback "File xxx, line YYY" format
-            file_line_match = re.search(r'File "([^"]+)", line (\d+)', line)
-            if file_line_match:
-                current_file = file_line_match.group(1)
-                current_line = int(file_line_match.group(2))
-            
-            # LINTING: Flake8/pylint format
-            lint_match = re.match(r'^([^:\s]+):(\d+):\d+:\s*([A-Z]\d+)\s+(.+)$', line.strip())
-            if lint_match:
-                failures.append({
-                    "file": lint_match.group(1),
-                    "line_number": int(lint_match.group(2)),
-                    "bug_type": "LINTING",
-                    "message": lint_match.group(4),
-                })
-                continue
-            
-            # SYNTAX: Parse SyntaxError properly
-            if "SyntaxError" in line:
-                file_info = self._extract_pytest_file_line(lines, i)
-                if file_info:
-                    failures.append({
-                        "file": file_info[0],
-                        "line_number": file_info[1],
-                        "bug_type": "SYNTAX",
-                        "message": line.strip(),
-                    })
-                continue
-            
-            # INDENTATION: Parse IndentationError
-            if "IndentationError" in line or "unexpected indent" in line.lower():
-                file_info = self._extract_pytest_file_line(lines, i)
-                if file_info:
-                    failures.append({
-                        "file": file_info[0],
-                        "line_number": file_info[1],
-                        "bug_type": "INDENTATION",
-                        "message": line.strip(),
-                    })
-                continue
-            
-            # IMPORT: Parse ImportError/ModuleNotFoundError with context
-            if "ModuleNotFoundError" in line or "ImportError" in line or "cannot import name" in line.lower():
-                file_info = self._extract_pytest_file_line(lines, i)
-                if file_info:
-                    failures.append({
-                        "file": file_info[0],
-                        "line_number": file_info[1],
-                        "bug_type": "IMPORT",
-                        "message": line.strip(),
-                    })
-                continue
-            
-            # TYPE_ERROR: Parse TypeError with proper file/line extraction
-            if "TypeError" in line:
-                file_info = self._extract_pytest_file_line(lines, i)
-                if file_info and file_info[0] != "unknown":
-                    failures.append({
-                        "file": file_info[0],
-                        "line_number": file_info[1],
-                        "bug_type": "TYPE_ERROR",
-                        "message": line.strip(),
-                    })
-                continue
-            
-            # LOGIC/ASSERTION: AssertionError or test failure
-            if "AssertionError" in line:
-                file_info = self._extract_pytest_file_line(lines, i)
-                if file_info:
-                    failures.append({
-                        "file": file_info[0],
-                        "line_number": file_info[1],
-                        "bug_type": "LOGIC",
-                        "message": line.strip(),
-                    })
-                continue
-            
-            # LOGIC: Failed test with assertion context
-            if re.search(r'^(FAILED|assert|AssertionError)', line.strip(), re.IGNORECASE):
-                file_info = self._extract_pytest_file_line(lines, i)
-                if file_info:
-                    failures.append({
-                        "file": file_info[0],
-                        "line_number": file_info[1],
-                        "bug_type": "LOGIC",
-                        "message": line.strip(),
-                    })
-                    continue
-        
-        # Deduplicate by (file, line_number, bug_type) tuple
-        deduped: dict[tuple[str, int, str], dict[str, Any]] = {}
-        for item in failures:
-            if item["bug_type"] not in BUG_TYPES:
+        return self.parse_stream(io.StringIO(output))
+
+    def parse_stream(self, chunks: Iterable[str]) -> list[dict[str, Any]]:
+        """Parse output arriving as lines or arbitrary chunks, in one pass."""
+        stream = self.stream()
+        for chunk in chunks:
+            stream.feed(chunk)
+        return stream.close()
+
+    @staticmethod
+    def stream() -> FailureStream:
+        """Incremental parser to feed while output is still being produced."""
+        return FailureStream()
+
+    def parse_reports(
+        self,
+        reports: Iterable[Path],
+        index: RepositoryIndex | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """Failures from JUnit XML and Jest JSON reports; None if no report could be read."""
+        paths = ReportPaths(index)
+        failures: dict[tuple[str, int, str], dict[str, Any]] = {}
+        read_any = False
+        for report in reports:
+            parse_report = jest_failures if report.suffix == ".json" else junit_failures
+            try:
+                for item in parse_report(report, paths):
+                    failures[(item["file"], item["line_number"], item["bug_type"])] = item
+            except Exception:
+                # Unreadable, truncated or malformed (e.g. the run timed out while writing it)
                 continue
-            key = (item["file"], item["line_number"], item["bug_type"])
-            deduped[key] = item
-        
-        return list(deduped.values())
-    
-    def _extract_pytest_file_line(self, lines: list[str], error_line_idx: int) -> tuple[str, int] | None:
-        """Extract file and line number from pytest traceback context."""
-        # Search backwards from error line for "File xxx, line YYY" pattern
-        for i in range(error_line_idx, -1, -1):
-            match = re.search(r'File "([^"]+)", line (\d+)', lines[i])
-            if match:
-                return (match.group(1), int(match.group(2)))
-        
-        # Also search forward a bit in case next few lines have context
-        for i in range(error_line_idx, min(error_line_idx + 3, len(lines))):
-            match = re.search(r'File "([^"]+)", line (\d+)', lines[i])
-            if match:
-                return (match.group(1), int(match.group(2)))
-        
-        return None
+            read_any = True
+        return list(failures.values()) if read_any else None
+
+    def parse_result(
+        self,
+        result: TestRunResult,
+        index: RepositoryIndex | None = None,
+        live: LiveFailureParser | None = None,
+    ) -> list[dict[str, Any]]:
+        """Failures of a test execution: from its reports, else scraped from its output.
+
+        Scraping also takes over when the reports show no failure although the run failed
+        (e.g. a crash before any test ran). `live` is a parser that already consumed the
+        output while the tests ran, so the output isn't scanned twice.
+        """
+        failures = self.parse_reports(result.reports, index) if result.reports else None
+        if failures or (failures is not None and result.return_code == 0):
+            return failures
+        return live.close() if live is not None else self.parse(result.output)
+
+    @staticmethod
+    def live(stop_after: int = 0) -> LiveFailureParser:
+        return LiveFailureParser(stop_after)
@@ -1,19 +1,96 @@
 from __future__ import annotations
 
 import asyncio
+import importlib.util
 import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import urlparse
 
 import httpx
-from git import Repo
+from git import Actor, Repo
 
 from app.core.policy import ensure_commit_prefix
+from app.services.repo_mirror import RepositoryMirrorCache, directory_bytes
+from app.services.repository_index import IGNORED_DIRS, classify_path
+
+# HTTP/2 needs `h2` (installed through httpx[http2] in requirements.txt); without it, HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+CLONE_STRATEGIES = ("mirror", "full", "shallow", "partial")
+
+
+class GitHubRateLimitError(RuntimeError):
+    """The API refused a request because the rate limit is exhausted."""
+
+    def __init__(self, message: str, retry_at: float) -> None:
+        super().__init__(message)
+        self.retry_at = retry_at  # epoch seconds
+
+
+@dataclass
+class WorkflowRunPoll:
+    run: dict | None
+    not_modified: bool
+    rate_remaining: int | None = None
+    rate_reset: float | None = None  # epoch seconds
+
+
+@dataclass
+class CloneReport:
+    strategy: str
+    seconds: float
+    bytes_received: int
+    sparse_directories: int | None = None
 
 
 class GitHubOpsService:
-    def __init__(self) -> None:
+    """
+    Git operations on the cloned workspace plus GitHub Actions polling.
+
+    All API calls share one pooled `httpx.AsyncClient`, so polling reuses a warm
+    connection instead of paying a TCP+TLS handshake each time. The last workflow-runs
+    response per (owner, repo, branch) is kept with its ETag and revalidated with
+    `If-None-Match`; GitHub does not count 304 responses against the rate limit.
+
+    `GIT_CLONE_STRATEGY` selects how workspaces are cloned: `mirror` (default) clones
+    from a local bare mirror that is fetched incrementally, `full` clones from the
+    remote every time, `shallow` fetches only the tip of the default branch
+    (`--depth 1`) and `partial` fetches history without file contents
+    (`--filter=blob:none`), downloading blobs on checkout. With `GIT_SPARSE_CHECKOUT`
+    only directories holding analyzable sources, tests or manifests are checked out.
+    """
+
+    def __init__(
+        self,
+        api_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_cached_branches: int = 256,
+        mirrors: RepositoryMirrorCache | None = None,
+        clone_strategy: str | None = None,
+        sparse_checkout: bool | None = None,
+    ) -> None:
         self.github_token = os.getenv("GITHUB_TOKEN", "").strip()
+        self.clone_strategy = (clone_strategy or os.getenv("GIT_CLONE_STRATEGY", "mirror")).strip().lower()
+        if self.clone_strategy not in CLONE_STRATEGIES:
+            raise ValueError(f"Unknown GIT_CLONE_STRATEGY {self.clone_strategy!r}; expected one of {CLONE_STRATEGIES}")
+        if sparse_checkout is None:
+            sparse_checkout = os.getenv("GIT_SPARSE_CHECKOUT", "false").strip().lower() in ("1", "true", "yes")
+        self.sparse_checkout = sparse_checkout
+        # Clone time and transfer size per workspace, collected by the runner
+        self._clone_reports: dict[Path, CloneReport] = {}
+        self.mirrors = mirrors or RepositoryMirrorCache()
+        # Workspaces cloned from a just-fetched mirror; their origin refs are already current
+        self._fresh_workspaces: set[Path] = set()
+        self.api_url = (api_url or os.getenv("GITHUB_API_URL", "https://api.github.com")).rstrip("/")
+        self.transport = transport
+        self.max_cached_branches = max_cached_branches
+        self._client: httpx.AsyncClient | None = None
+        # (owner, repo, branch) -> (etag, latest workflow run)
+        self._workflow_runs: OrderedDict[tuple[str, str, str], tuple[str, dict | None]] = OrderedDict()
+        self.api_stats = {"requests": 0, "not_modified": 0}
 
     def _inject_token(self, repo_url: str) -> str:
         if not self.github_token:
@@ -36,13 +113,74 @@ class GitHubOpsService:
         if target_path.exists():
             return target_path
         auth_url = self._inject_token(repo_url)
-        Repo.clone_from(auth_url, target_path)
+        started = time.perf_counter()
+        if self.clone_strategy == "mirror":
+            repo, bytes_received = self.mirrors.clone_workspace(
+                repo_url, target_path, fetch_url=auth_url, no_checkout=self.sparse_checkout
+            )
+            self._fresh_workspaces.add(target_path.resolve())
+        else:
+            options: dict[str, object] = {"no_checkout": self.sparse_checkout}
+            if self.clone_strategy == "shallow":
+                options["depth"] = 1
+            elif self.clone_strategy == "partial":
+                options["filter"] = "blob:none"
+            repo = Repo.clone_from(auth_url, target_path, **options)
+            if self.clone_strategy != "full":
+                # Shallow and partial workspaces must not re-fetch whole history in create_branch
+                self._fresh_workspaces.add(target_path.resolve())
+
+        sparse_directories = None
+        if self.sparse_checkout:
+            sparse_directories = self._sparse_checkout(repo)
+
+        if self.clone_strategy != "mirror":
+            # Packs are stored as received, so their size is what came over the network
+            # (including blobs a partial clone fetched during checkout)
+            bytes_received = directory_bytes(target_path / ".git" / "objects")
+        self._clone_reports[target_path.resolve()] = CloneReport(
+            strategy=self.clone_strategy,
+            seconds=round(time.perf_counter() - started, 3),
+            bytes_received=bytes_received,
+            sparse_directories=sparse_directories,
+        )
         return target_path
 
+    def take_clone_report(self, repo_path: Path) -> CloneReport | None:
+        """Clone time and transfer size of a workspace cloned by this service, once."""
+        return self._clone_reports.pop(repo_path.resolve(), None)
+
+    @staticmethod
+    def _sparse_checkout(repo: Repo) -> int:
+        """Check out only directories with analyzable files; returns how many were selected.
+
+        Cone mode always includes files at the repository root, so root manifests and
+        CI configuration stay available.
+        """
+        directories: set[str] = set()
+        for relative_path in repo.git.ls_tree("-r", "--name-only", "HEAD").splitlines():
+            directory, _, _ = relative_path.rpartition("/")
+            if not directory or any(part in IGNORED_DIRS for part in directory.split("/")):
+                continue
+            language, role = classify_path(relative_path)
+            if language is not None or role in ("test", "manifest"):
+                directories.add(directory)
+        # A directory in the cone includes its subtree, so nested entries are redundant
+        selected = sorted(
+            directory
+            for directory in directories
+            if not any(directory.startswith(other + "/") for other in directories)
+        )
+        repo.git.sparse_checkout("set", "--cone", *selected)
+        repo.git.checkout(repo.head.reference.name)
+        return len(selected)
+
     def create_branch(self, repo_path: Path, branch_name: str, base_branch: str = "main") -> str:
         repo = Repo(repo_path)
-        remote = repo.remote("origin")
-        remote.fetch()
+        if repo_path.resolve() in self._fresh_workspaces:
+            self._fresh_workspaces.discard(repo_path.resolve())
+        else:
+            repo.remote("origin").fetch()
 
         base_ref = None
         for candidate in [f"origin/{base_branch}", "origin/main", "origin/master"]:
@@ -73,41 +211,128 @@ class GitHubOpsService:
         repo.git.add(A=True)
         if not repo.is_dirty(untracked_files=True):
             return False, final_message
-        repo.index.commit(final_message)
+        if (Path(repo.git_dir) / "info" / "sparse-checkout").exists():
+            # GitPython cannot read the index version sparse checkouts write; commit
+            # through git with the same identity GitPython would use
+            author = Actor.author(repo.config_reader())
+            committer = Actor.committer(repo.config_reader())
+            repo.git.commit(
+                "--no-verify",
+                "-m",
+                final_message,
+                env={
+                    "GIT_AUTHOR_NAME": author.name,
+                    "GIT_AUTHOR_EMAIL": author.email,
+                    "GIT_COMMITTER_NAME": committer.name,
+                    "GIT_COMMITTER_EMAIL": committer.email,
+                },
+            )
+        else:
+            repo.index.commit(final_message)
         return True, final_message
 
+    def workspace_revision(self, repo_path: Path) -> str | None:
+        """HEAD commit of the workspace, or None if tracked files have uncommitted changes."""
+        repo = Repo(repo_path)
+        if not repo.head.is_valid() or repo.is_dirty(untracked_files=False):
+            return None
+        return repo.head.commit.hexsha
+
     def push_branch(self, repo_path: Path, branch_name: str) -> None:
         repo = Repo(repo_path)
         if repo.active_branch.name.lower() == "main":
             raise RuntimeError("Refusing to push directly to main branch.")
-        repo.remote("origin").push(refspec=f"{branch_name}:{branch_name}", set_upstream=True)
+        origin = repo.remote("origin")
+        refspec = f"{branch_name}:{branch_name}"
+        push_infos = origin.push(refspec=refspec, set_upstream=True)
+        # A shallow push only works if the remote has the commits at the shallow boundary;
+        # if it doesn't (e.g. the base was force-pushed away), fetch the missing history
+        # once and retry.
+        if (Path(repo.git_dir) / "shallow").exists() and any(
+            "shallow update not allowed" in info.summary for info in push_infos
+        ):
+            origin.fetch(unshallow=True)
+            origin.push(refspec=refspec, set_upstream=True)
+
+    def _api_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+            if self.github_token:
+                headers["Authorization"] = f"token {self.github_token}"
+                print(f"[GitHub API] Using authenticated token (last 10 chars: ...{self.github_token[-10:]})")
+            else:
+                print("[GitHub API] WARNING: No GITHUB_TOKEN found - API requests may be rate-limited!")
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                headers=headers,
+                timeout=20,
+                http2=HTTP2_AVAILABLE and self.transport is None,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled API client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def forget_ci_cache(self, repo_url: str, branch_name: str) -> None:
+        """Drop the cached workflow-runs response of a finished run's branch."""
+        try:
+            owner, repo = self.parse_owner_repo(repo_url)
+        except ValueError:
+            return
+        self._workflow_runs.pop((owner, repo, branch_name), None)
 
     async def _latest_workflow_run(self, owner: str, repo: str, branch_name: str) -> dict | None:
-        url = f"https://api.github.com/repos/{owner}/{repo}/actions/runs"
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
-        if self.github_token:
-            headers["Authorization"] = f"token {self.github_token}"
-            print(f"[GitHub API] Using authenticated token (last 10 chars: ...{self.github_token[-10:]})")
-        else:
-            print("[GitHub API] WARNING: No GITHUB_TOKEN found - API requests may be rate-limited!")
-
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.get(url, headers=headers, params={"branch": branch_name, "per_page": 10})
-            if response.status_code == 403:
-                limit_remaining = response.headers.get("X-RateLimit-Remaining", "?")
-                limit_total = response.headers.get("X-RateLimit-Limit", "?")
-                print(f"[GitHub API] 403 Rate limit - Remaining: {limit_remaining}/{limit_total}")
-                print(f"[GitHub API] Response: {response.text[:200]}")
-            response.raise_for_status()
-            payload = response.json()
-
-        runs = payload.get("workflow_runs", [])
-        if not runs:
-            return None
-        return runs[0]
+        return (await self.fetch_workflow_run(owner, repo, branch_name)).run
+
+    async def fetch_workflow_run(self, owner: str, repo: str, branch_name: str) -> WorkflowRunPoll:
+        """Latest workflow run on a branch plus the rate-limit state reported with it."""
+        key = (owner, repo, branch_name)
+        cached = self._workflow_runs.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        response = await self._api_client().get(
+            f"/repos/{owner}/{repo}/actions/runs",
+            headers=headers,
+            params={"branch": branch_name, "per_page": 10},
+        )
+        self.api_stats["requests"] += 1
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        rate_remaining = int(remaining) if remaining and remaining.isdigit() else None
+        rate_reset = float(reset) if reset and reset.isdigit() else None
+
+        if response.status_code == 304 and cached:
+            self.api_stats["not_modified"] += 1
+            self._workflow_runs.move_to_end(key)
+            return WorkflowRunPoll(cached[1], True, rate_remaining, rate_reset)
+        if response.status_code in (403, 429):
+            limit_total = response.headers.get("X-RateLimit-Limit", "?")
+            print(f"[GitHub API] {response.status_code} Rate limit - Remaining: {remaining or '?'}/{limit_total}")
+            print(f"[GitHub API] Response: {response.text[:200]}")
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                raise GitHubRateLimitError("GitHub API rate limit exceeded", time.time() + int(retry_after))
+            if rate_remaining == 0:
+                raise GitHubRateLimitError("GitHub API rate limit exceeded", rate_reset or time.time() + 60)
+        response.raise_for_status()
+
+        runs = response.json().get("workflow_runs", [])
+        latest = runs[0] if runs else None
+        etag = response.headers.get("ETag")
+        if etag:
+            self._workflow_runs[key] = (etag, latest)
+            self._workflow_runs.move_to_end(key)
+            while len(self._workflow_runs) > self.max_cached_branches:
+                self._workflow_runs.popitem(last=False)
+        return WorkflowRunPoll(latest, False, rate_remaining, rate_reset)
 
     async def poll_ci_status(
         self,
@@ -115,8 +340,9 @@ class GitHubOpsService:
         repo: str,
         branch_name: str,
         timeout_seconds: int = 480,
+        poll_interval: float = 8,
     ) -> tuple[str, str | None]:
-        elapsed = 0
+        elapsed = 0.0
         workflow_url = None
         while elapsed < timeout_seconds:
             run = await self._latest_workflow_run(owner, repo, branch_name)
@@ -130,7 +356,7 @@ class GitHubOpsService:
                         return "PASSED", workflow_url
                     return "FAILED", workflow_url
 
-            await asyncio.sleep(8)
-            elapsed += 8
+            await asyncio.sleep(poll_interval)
+            elapsed += poll_interval
 
         return "FAILED", workflow_url
@@ -6,33 +6,38 @@ import re
 from pathlib import Path
 from typing import Any
 
+from app.services.repository_index import RepositoryIndex
+
 
 class JavaAnalyzerService:
     """Analyze Java files for SYNTAX, LINTING, LOGIC, TYPE_ERROR, IMPORT, INDENTATION errors."""
 
-    def analyze(self, repo_path: Path) -> list[dict[str, Any]]:
+    def analyze(self, repo_path: Path, index: RepositoryIndex | None = None) -> list[dict[str, Any]]:
         """Analyze all Java files in the repository."""
         failures: list[dict[str, Any]] = []
-        for file_path in self._iter_java_files(repo_path):
+        for file_path in self._iter_java_files(repo_path, index):
             relative_path = file_path.relative_to(repo_path).as_posix()
             source = file_path.read_text(encoding="utf-8", errors="ignore")
-            
-            failures.extend(self._find_syntax_errors(source, relative_path))
-            failures.extend(self._find_linting_errors(source, relative_path))
-            failures.extend(self._find_import_errors(source, relative_path))
-            failures.extend(self._find_logic_errors(source, relative_path))
-            failures.extend(self._find_type_errors(source, relative_path))
-            failures.extend(self._find_indentation_errors(source, relative_path))
+            failures.extend(self.analyze_source(source, relative_path))
         
         return failures
 
-    def _iter_java_files(self, repo_path: Path):
-        """Iterate through Java files, skipping ignored directories."""
-        ignored_dirs = {".git", "target", "node_modules", ".gradle", "build", "__pycache__"}
-        for file_path in repo_path.rglob("*.java"):
-            if any(part in ignored_dirs for part in file_path.parts):
-                continue
-            yield file_path
+    def analyze_source(self, source: str, relative_path: str) -> list[dict[str, Any]]:
+        """Analyze a single Java file."""
+        failures: list[dict[str, Any]] = []
+        failures.extend(self._find_syntax_errors(source, relative_path))
+        failures.extend(self._find_linting_errors(source, relative_path))
+        failures.extend(self._find_import_errors(source, relative_path))
+        failures.extend(self._find_logic_errors(source, relative_path))
+        failures.extend(self._find_type_errors(source, relative_path))
+        failures.extend(self._find_indentation_errors(source, relative_path))
+        return failures
+
+    def _iter_java_files(self, repo_path: Path, index: RepositoryIndex | None = None):
+        """Iterate through Java files from the shared repository index."""
+        index = index or RepositoryIndex.build(repo_path)
+        for item in index.files_for_language("java"):
+            yield item.path
 
     def _find_syntax_errors(self, source: str, file_path: str) -> list[dict[str, Any]]:
         """Detect SYNTAX errors: missing semicolons, braces, parentheses."""
@@ -6,33 +6,38 @@ import re
 from pathlib import Path
 from typing import Any
 
+from app.services.repository_index import RepositoryIndex
+
 
 class JavaScriptAnalyzerService:
     """Analyze JavaScript files for SYNTAX, LINTING, LOGIC, TYPE_ERROR, IMPORT, INDENTATION errors."""
 
-    def analyze(self, repo_path: Path) -> list[dict[str, Any]]:
+    def analyze(self, repo_path: Path, index: RepositoryIndex | None = None) -> list[dict[str, Any]]:
         """Analyze all JavaScript files in the repository."""
         failures: list[dict[str, Any]] = []
-        for file_path in self._iter_js_files(repo_path):
+        for file_path in self._iter_js_files(repo_path, index):
             relative_path = file_path.relative_to(repo_path).as_posix()
             source = file_path.read_text(encoding="utf-8", errors="ignore")
-            
-            failures.extend(self._find_syntax_errors(source, relative_path))
-            failures.extend(self._find_linting_errors(source, relative_path))
-            failures.extend(self._find_import_errors(source, relative_path))
-            failures.extend(self._find_logic_errors(source, relative_path))
-            failures.extend(self._find_type_errors(source, relative_path))
-            failures.extend(self._find_indentation_errors(source, relative_path))
+            failures.extend(self.analyze_source(source, relative_path))
         
         return failures
 
-    def _iter_js_files(self, repo_path: Path):
-        """Iterate through JavaScript files, skipping ignored directories."""
-        ignored_dirs = {".git", "node_modules", "dist", "build", "__pycache__", ".next"}
-        for file_path in repo_path.rglob("*.js"):
-            if any(part in ignored_dirs for part in file_path.parts):
-                continue
-            yield file_path
+    def analyze_source(self, source: str, relative_path: str) -> list[dict[str, Any]]:
+        """Analyze a single JavaScript file."""
+        failures: list[dict[str, Any]] = []
+        failures.extend(self._find_syntax_errors(source, relative_path))
+        failures.extend(self._find_linting_errors(source, relative_path))
+        failures.extend(self._find_import_errors(source, relative_path))
+        failures.extend(self._find_logic_errors(source, relative_path))
+        failures.extend(self._find_type_errors(source, relative_path))
+        failures.extend(self._find_indentation_errors(source, relative_path))
+        return failures
+
+    def _iter_js_files(self, repo_path: Path, index: RepositoryIndex | None = None):
+        """Iterate through JavaScript files from the shared repository index."""
+        index = index or RepositoryIndex.build(repo_path)
+        for item in index.files_for_language("javascript"):
+            yield item.path
 
     def _find_syntax_errors(self, source: str, file_path: str) -> list[dict[str, Any]]:
         """Detect SYNTAX errors: missing semicolons, braces, parentheses."""
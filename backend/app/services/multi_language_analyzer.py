@@ -2,38 +2,205 @@
 
 from __future__ import annotations
 
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
+from app.services.analysis_cache import AnalysisCacheService, ruleset_version
+from app.services.repository_index import RepositoryIndex
 from app.services.static_analyzer import StaticAnalyzerService
 from app.services.java_analyzer import JavaAnalyzerService
 from app.services.javascript_analyzer import JavaScriptAnalyzerService
 from app.services.typescript_analyzer import TypeScriptAnalyzerService
 
 
+# (language, relative_path, source)
+AnalysisJob = tuple[str, str, str]
+
+_worker_analyzers: dict[str, Any] | None = None
+
+
+def _analyze_chunk(jobs: list[AnalysisJob]) -> list[list[dict[str, Any]]]:
+    """Process-pool worker: analyze a chunk of files, returning path-free findings per file."""
+    global _worker_analyzers
+    if _worker_analyzers is None:
+        _worker_analyzers = {
+            "python": StaticAnalyzerService(),
+            "java": JavaAnalyzerService(),
+            "javascript": JavaScriptAnalyzerService(),
+            "typescript": TypeScriptAnalyzerService(),
+        }
+    return [
+        _strip_file(_worker_analyzers[language].analyze_source(source, relative_path))
+        for language, relative_path, source in jobs
+    ]
+
+
+def _strip_file(findings: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # Findings are kept without the path so identical files elsewhere can reuse them
+    return [{key: value for key, value in finding.items() if key != "file"} for finding in findings]
+
+
+def _chunk_by_size(jobs: list[AnalysisJob], chunk_count: int) -> list[list[int]]:
+    """Split job indexes into `chunk_count` chunks of roughly equal source size (largest first)."""
+    chunks: list[list[int]] = [[] for _ in range(chunk_count)]
+    loads = [0] * chunk_count
+    for job_index in sorted(range(len(jobs)), key=lambda i: len(jobs[i][2]), reverse=True):
+        target = loads.index(min(loads))
+        chunks[target].append(job_index)
+        loads[target] += len(jobs[job_index][2])
+    return [chunk for chunk in chunks if chunk]
+
+
 class MultiLanguageAnalyzerService:
     """Analyze source code in multiple languages (Python, Java, JavaScript, TypeScript)."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache: AnalysisCacheService | None = None,
+        workers: int | None = None,
+        parallel_min_bytes: int | None = None,
+    ) -> None:
         self.python_analyzer = StaticAnalyzerService()
         self.java_analyzer = JavaAnalyzerService()
         self.javascript_analyzer = JavaScriptAnalyzerService()
         self.typescript_analyzer = TypeScriptAnalyzerService()
+        self.cache = cache
+        # Per-repository findings of the last analysis, by relative path
+        self._snapshots: dict[str, dict[str, list[dict[str, Any]]]] = {}
+        # Parallel analysis: worker processes and the source size below which analysis stays in-process
+        self.workers = workers or int(os.getenv("ANALYZER_WORKERS", "0")) or os.cpu_count() or 1
+        self.parallel_min_bytes = (
+            parallel_min_bytes
+            if parallel_min_bytes is not None
+            else int(os.getenv("ANALYZER_PARALLEL_MIN_BYTES", "2000000"))
+        )
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+        # Analysis order: Python, Java, JavaScript, TypeScript
+        self.analyzers = {
+            "python": self.python_analyzer,
+            "java": self.java_analyzer,
+            "javascript": self.javascript_analyzer,
+            "typescript": self.typescript_analyzer,
+        }
+
+    def analyze(
+        self,
+        repo_path: Path,
+        index: RepositoryIndex | None = None,
+        cache_stats: dict[str, int] | None = None,
+        changed_files: set[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Analyze all supported language files in the repository.
+
+        With a cache configured, files whose content was already analyzed by the same
+        analyzer rule-set are served from the cache; `cache_stats` accumulates hits/misses.
+
+        When `changed_files` (repository-relative paths) is given and this repository was
+        analyzed before, only changed or newly added files are re-analyzed; findings for
+        every other file are reused from the previous call.
+        """
+        index = index or RepositoryIndex.build(repo_path)
+        repo_key = str(repo_path.resolve())
+        previous = self._snapshots.get(repo_key) if changed_files is not None else None
+
+        file_findings: dict[str, list[dict[str, Any]]] = {}
+        jobs: list[tuple[str, str, str, str | None]] = []  # (language, relative_path, source, cache_key)
+        for language, analyzer in self.analyzers.items():
+            version = ruleset_version(analyzer)
+            for item in index.files_for_language(language):
+                relative_path = item.relative_path
+                if previous is not None and relative_path in previous and relative_path not in changed_files:
+                    file_findings[relative_path] = previous[relative_path]
+                    continue
+                file_findings[relative_path] = []
+                source = item.path.read_text(encoding="utf-8", errors="ignore")
+                cache_key = AnalysisCacheService.make_key(source, language, version) if self.cache else None
+                jobs.append((language, relative_path, source, cache_key))
+
+        cached: dict[str, list[dict[str, Any]]] = {}
+        if self.cache:
+            cached = self.cache.get_many([job[3] for job in jobs])
+
+        hits = 0
+        misses: list[AnalysisJob] = []
+        miss_index: dict[str, int] = {}
+        duplicates: list[tuple[str, int]] = []  # (relative_path, index into misses)
+        for language, relative_path, source, cache_key in jobs:
+            if cache_key in cached:
+                hits += 1
+                file_findings[relative_path] = cached[cache_key]
+            elif cache_key in miss_index:
+                # Identical content earlier in this call
+                hits += 1
+                duplicates.append((relative_path, miss_index[cache_key]))
+            else:
+                if cache_key:
+                    miss_index[cache_key] = len(misses)
+                misses.append((language, relative_path, source))
+
+        results = self._analyze_jobs(misses)
+        for (_language, relative_path, _source), findings in zip(misses, results):
+            file_findings[relative_path] = findings
+        for relative_path, job_index in duplicates:
+            file_findings[relative_path] = results[job_index]
+        fresh = {cache_key: results[job_index] for cache_key, job_index in miss_index.items()}
+
+        if self.cache:
+            self.cache.put_many(fresh)
+            if cache_stats is not None:
+                cache_stats["hits"] = cache_stats.get("hits", 0) + hits
+                cache_stats["misses"] = cache_stats.get("misses", 0) + len(jobs) - hits
+
+        self._snapshots[repo_key] = file_findings
+        return [
+            {"file": relative_path, **finding}
+            for relative_path, findings in file_findings.items()
+            for finding in findings
+        ]
+
+    def _analyze_jobs(self, jobs: list[AnalysisJob]) -> list[list[dict[str, Any]]]:
+        """Analyze files, sharded across the process pool unless the batch is small."""
+        total_bytes = sum(len(source) for _language, _path, source in jobs)
+        if self.workers <= 1 or len(jobs) < 2 or total_bytes < self.parallel_min_bytes:
+            return [
+                _strip_file(self.analyzers[language].analyze_source(source, relative_path))
+                for language, relative_path, source in jobs
+            ]
+
+        # Several chunks per worker so one large chunk does not leave the other cores idle
+        chunks = _chunk_by_size(jobs, min(len(jobs), self.workers * 4))
+        pool = self._get_pool()
+        futures = [pool.submit(_analyze_chunk, [jobs[job_index] for job_index in chunk]) for chunk in chunks]
+
+        results: list[list[dict[str, Any]]] = [[] for _ in jobs]
+        for chunk, future in zip(chunks, futures):
+            for job_index, findings in zip(chunk, future.result()):
+                results[job_index] = findings
+        return results
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Long-lived so worker start-up is paid once; "spawn" is safe alongside threads and the event loop
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the analysis worker processes, if started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
 
-    def analyze(self, repo_path: Path) -> list[dict[str, Any]]:
-        """Analyze all supported language files in the repository."""
-        failures: list[dict[str, Any]] = []
-        
-        # Analyze Python files
-        failures.extend(self.python_analyzer.analyze(repo_path))
-        
-        # Analyze Java files
-        failures.extend(self.java_analyzer.analyze(repo_path))
-        
-        # Analyze JavaScript files
-        failures.extend(self.javascript_analyzer.analyze(repo_path))
-        
-        # Analyze TypeScript files
-        failures.extend(self.typescript_analyzer.analyze(repo_path))
-        
-        return failures
+    def forget(self, repo_path: Path) -> None:
+        """Drop the findings kept for incremental re-analysis of a repository."""
+        self._snapshots.pop(str(repo_path.resolve()), None)
@@ -0,0 +1,133 @@
+"""Line-by-line streaming of subprocess output while the process is still running."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+# Longest line read whole; longer lines are dropped rather than buffered without bound
+LINE_LIMIT = 1024 * 1024
+
+# Receives (stream name, line without terminator); returning True stops the process.
+# Stream names are "stdout"/"stderr", prefixed with `shard<N>:` for sharded test executions
+LineCallback = Callable[[str, str], bool | None]
+
+
+@dataclass
+class OutputLine:
+    stream: str  # "stdout" or "stderr"
+    text: str
+
+
+@dataclass
+class StreamedResult:
+    return_code: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    stopped_early: bool = False
+
+
+class StreamingProcess:
+    """A subprocess whose stdout and stderr lines are yielded as they are produced."""
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        self.process = process
+        self._queue: asyncio.Queue[OutputLine | None] = asyncio.Queue()
+        self._readers = [
+            asyncio.create_task(self._read(process.stdout, "stdout")),
+            asyncio.create_task(self._read(process.stderr, "stderr")),
+        ]
+
+    @classmethod
+    async def start(cls, command: list[str], cwd: Path | None = None) -> StreamingProcess:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=LINE_LIMIT,
+        )
+        return cls(process)
+
+    async def _read(self, reader: asyncio.StreamReader, stream: str) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    continue  # over LINE_LIMIT; asyncio has already discarded it
+                if not line:
+                    break
+                text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+                await self._queue.put(OutputLine(stream, text))
+        finally:
+            await self._queue.put(None)
+
+    async def lines(self) -> AsyncIterator[OutputLine]:
+        """Lines of both streams in arrival order, until both are closed."""
+        open_streams = len(self._readers)
+        while open_streams:
+            item = await self._queue.get()
+            if item is None:
+                open_streams -= 1
+            else:
+                yield item
+
+    def kill(self) -> None:
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def wait(self) -> int:
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        return await self.process.wait()
+
+    async def close(self) -> None:
+        """Kill the process if it is still running and stop reading its output."""
+        self.kill()
+        for reader in self._readers:
+            reader.cancel()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        await self.process.wait()
+
+
+async def run_streaming(
+    command: list[str],
+    timeout: float,
+    on_line: LineCallback | None = None,
+    cwd: Path | None = None,
+) -> StreamedResult:
+    """Run a command, passing each output line to `on_line` as soon as it is written.
+
+    The process is killed when `timeout` expires, when `on_line` returns True, or when the
+    caller is cancelled.
+    """
+    streaming = await StreamingProcess.start(command, cwd=cwd)
+    captured: dict[str, list[str]] = {"stdout": [], "stderr": []}
+    timed_out = stopped_early = False
+    try:
+        async with asyncio.timeout(timeout):
+            async for line in streaming.lines():
+                captured[line.stream].append(line.text)
+                if on_line is not None and on_line(line.stream, line.text):
+                    stopped_early = True
+                    break
+            if not stopped_early:
+                await streaming.wait()
+    except TimeoutError:
+        timed_out = True
+    finally:
+        # Kills the process unless it already exited (early stop, timeout, cancellation)
+        await streaming.close()
+    return StreamedResult(
+        return_code=streaming.process.returncode,
+        stdout="\n".join(captured["stdout"]),
+        stderr="\n".join(captured["stderr"]),
+        timed_out=timed_out,
+        stopped_early=stopped_early,
+    )
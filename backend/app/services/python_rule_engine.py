@@ -0,0 +1,119 @@
+"""Single-pass AST rule engine - one parse and one traversal per Python file."""
+
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass, field
+from typing import Any
+
+# Traversal position of a node: (depth, pre-order index). Sorting by it reproduces
+# the breadth-first order of ast.walk, which several rules depend on.
+NodeKey = tuple[int, int]
+
+
+@dataclass
+class FileContext:
+    source: str
+    lines: list[str]
+    relative_path: str
+    tree: ast.AST | None
+    depth: int = 0
+    seq: int = 0
+    function_stack: list[ast.FunctionDef] = field(default_factory=list)
+
+    @property
+    def key(self) -> NodeKey:
+        """Walk-order key of the node currently being visited."""
+        return (self.depth, self.seq)
+
+
+class PythonRule:
+    """Base class for rules run by RuleEngine.
+
+    A rule lists the node types it handles in `node_types`; the engine calls `visit`
+    for each of them during the shared traversal and `leave` once the node's subtree
+    has been visited. `finish` runs after the traversal and returns the findings.
+    """
+
+    node_types: tuple[type[ast.AST], ...] = ()
+    requires_tree = False
+
+    def start(self, ctx: FileContext) -> None:
+        pass
+
+    def visit(self, node: ast.AST, ctx: FileContext) -> None:
+        pass
+
+    def leave(self, node: ast.AST, ctx: FileContext) -> None:
+        pass
+
+    def finish(self, ctx: FileContext) -> list[dict[str, Any]]:
+        return []
+
+
+class RuleEngine(ast.NodeVisitor):
+    """Dispatch every AST node to the rules registered for its type in a single pass."""
+
+    def __init__(self, rule_types: list[type[PythonRule]]) -> None:
+        self.rule_types = rule_types
+        self._ctx: FileContext | None = None
+        self._handlers: dict[type[ast.AST], list[PythonRule]] = {}
+
+    def run(self, ctx: FileContext) -> list[dict[str, Any]]:
+        rules = [
+            rule_type()
+            for rule_type in self.rule_types
+            if ctx.tree is not None or not rule_type.requires_tree
+        ]
+        self._ctx = ctx
+        self._handlers = {}
+        for rule in rules:
+            rule.start(ctx)
+            for node_type in rule.node_types:
+                self._handlers.setdefault(node_type, []).append(rule)
+
+        if ctx.tree is not None:
+            self.visit(ctx.tree)
+
+        failures: list[dict[str, Any]] = []
+        for rule in rules:
+            failures.extend(rule.finish(ctx))
+        self._ctx = None
+        return failures
+
+    def visit(self, node: ast.AST) -> None:
+        # Iterative pre-order walk: deeply nested expressions must not hit the recursion limit
+        ctx = self._ctx
+        handlers = self._handlers
+        stack: list[tuple[ast.AST, int, bool]] = [(node, 0, False)]
+        while stack:
+            current, depth, leaving = stack.pop()
+            node_handlers = handlers.get(type(current))
+
+            if leaving:
+                if isinstance(current, ast.FunctionDef):
+                    ctx.function_stack.pop()
+                for rule in node_handlers or ():
+                    rule.leave(current, ctx)
+                continue
+
+            ctx.depth = depth
+            ctx.seq += 1
+            for rule in node_handlers or ():
+                rule.visit(current, ctx)
+
+            is_function = isinstance(current, ast.FunctionDef)
+            if is_function or node_handlers:
+                stack.append((current, depth, True))
+            if is_function:
+                ctx.function_stack.append(current)
+
+            child_depth = depth + 1
+            for field_name in reversed(current._fields):
+                value = getattr(current, field_name, None)
+                if isinstance(value, list):
+                    for item in reversed(value):
+                        if isinstance(item, ast.AST):
+                            stack.append((item, child_depth, False))
+                elif isinstance(value, ast.AST):
+                    stack.append((value, child_depth, False))
@@ -0,0 +1,118 @@
+"""Local bare mirrors of target repositories, shared by every run's workspace."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlparse
+
+from git import Repo
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+def directory_bytes(path: Path) -> int:
+    """Total size of the files under `path` (0 if it doesn't exist)."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class RepositoryMirrorCache:
+    """
+    One bare mirror per repository URL under `GIT_MIRROR_DIR`.
+
+    The first run of a repository clones the mirror; later runs only fetch what changed.
+    Workspaces are cloned from the mirror with `--shared`, so they borrow its objects
+    instead of copying them. Clones and fetches of one mirror are serialized with a file
+    lock, which also covers several backend processes sharing the cache directory.
+
+    Automatic `git gc` is disabled in mirrors so objects that live workspaces borrow are
+    never pruned underneath them.
+    """
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        cache_dir_env = os.getenv("GIT_MIRROR_DIR", "")
+        default_dir = Path(__file__).resolve().parents[2] / "data" / "git-mirrors"
+        self.cache_dir = cache_dir or (Path(cache_dir_env) if cache_dir_env else default_dir)
+        self._locks: dict[Path, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {"clones": 0, "fetches": 0}
+
+    def mirror_path(self, repo_url: str) -> Path:
+        normalized = repo_url.strip().rstrip("/").lower().removesuffix(".git")
+        name = "-".join(part for part in urlparse(normalized).path.split("/") if part)[-80:] or "repo"
+        digest = hashlib.sha256(normalized.encode()).hexdigest()[:12]
+        return self.cache_dir / f"{name}-{digest}.git"
+
+    @contextmanager
+    def _lock(self, mirror: Path) -> Iterator[None]:
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(mirror, threading.Lock())
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(mirror.with_suffix(".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def ensure(self, repo_url: str, fetch_url: str | None = None) -> tuple[Path, int]:
+        """Create or update the mirror of `repo_url`.
+
+        Returns the mirror path and how many bytes of objects the clone or fetch added.
+        `fetch_url` is the URL to transfer from (e.g. with a token injected); it is never
+        stored in the mirror's config.
+        """
+        fetch_url = fetch_url or repo_url
+        mirror = self.mirror_path(repo_url)
+        with self._lock(mirror):
+            if (mirror / "HEAD").exists():
+                before = directory_bytes(mirror / "objects")
+                Repo(mirror).git.fetch(
+                    "--prune", "--quiet", fetch_url, "+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"
+                )
+                self.stats["fetches"] += 1
+                return mirror, max(directory_bytes(mirror / "objects") - before, 0)
+
+            staging = mirror.with_name(mirror.name + ".tmp")
+            shutil.rmtree(staging, ignore_errors=True)
+            repo = Repo.clone_from(fetch_url, staging, mirror=True)
+            repo.git.config("gc.auto", "0")
+            repo.git.remote("set-url", "origin", repo_url)
+            staging.rename(mirror)
+            self.stats["clones"] += 1
+            return mirror, directory_bytes(mirror / "objects")
+
+    def clone_workspace(
+        self,
+        repo_url: str,
+        target_path: Path,
+        fetch_url: str | None = None,
+        no_checkout: bool = False,
+    ) -> tuple[Repo, int]:
+        """Refresh the mirror, then clone a workspace that borrows its objects.
+
+        Returns the workspace and the bytes the mirror refresh transferred.
+        """
+        mirror, bytes_received = self.ensure(repo_url, fetch_url)
+        repo = Repo.clone_from(str(mirror), target_path, shared=True, no_checkout=no_checkout)
+        repo.remote("origin").set_url(fetch_url or repo_url)
+        return repo, bytes_received
@@ -0,0 +1,120 @@
+"""Single-walk repository index shared by analyzers, test discovery and command detection."""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+IGNORED_DIRS = {
+    ".git", ".venv", "venv", "node_modules", "__pycache__",
+    ".pytest_cache", ".mypy_cache", "dist", "build", "target",
+    ".gradle", ".next",
+}
+
+LANGUAGE_EXTENSIONS = {
+    ".py": "python",
+    ".java": "java",
+    ".js": "javascript",
+    ".ts": "typescript",
+}
+
+TEST_PATTERNS = ["test_*.py", "*_test.py", "*.spec.ts", "*.test.ts", "*.test.js", "*Test.java"]
+
+MANIFEST_PATTERNS = [
+    "pytest.ini", "pyproject.toml", "setup.py", "setup.cfg", "requirements*.txt",
+    "package.json", "package-lock.json", "pom.xml", "build.gradle", "build.gradle.kts",
+    "*.sln", "*.csproj",
+]
+
+
+def classify_path(relative_path: str) -> tuple[str | None, str]:
+    """Return (language, role) for a repository-relative path."""
+    name = relative_path.rsplit("/", 1)[-1]
+    language = LANGUAGE_EXTENSIONS.get(os.path.splitext(name)[1])
+    # Type definition files carry no executable code worth analyzing
+    if language == "typescript" and name.endswith(".d.ts"):
+        language = None
+
+    # Manifests written in a language (setup.py) are still analyzed as that language
+    if any(fnmatch.fnmatchcase(name, pattern) for pattern in MANIFEST_PATTERNS):
+        return language, "manifest"
+    if any(fnmatch.fnmatchcase(name, pattern) for pattern in TEST_PATTERNS):
+        return language, "test"
+    return language, "source"
+
+
+@dataclass(frozen=True)
+class IndexedFile:
+    path: Path
+    relative_path: str
+    language: str | None
+    role: str
+
+
+@dataclass
+class RepositoryIndex:
+    """Files of a workspace bucketed by language and role (source, test, manifest)."""
+
+    root: Path
+    files: list[IndexedFile] = field(default_factory=list)
+    by_language: dict[str, list[IndexedFile]] = field(default_factory=dict)
+    by_role: dict[str, list[IndexedFile]] = field(default_factory=dict)
+    root_names: set[str] = field(default_factory=set)
+
+    @classmethod
+    def build(cls, repo_path: Path, ignored_dirs: set[str] | None = None) -> RepositoryIndex:
+        """Walk the workspace once with os.scandir, pruning ignored directories."""
+        ignored = IGNORED_DIRS if ignored_dirs is None else ignored_dirs
+        index = cls(root=repo_path)
+        pending = [(str(repo_path), "")]
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in ignored:
+                                pending.append((entry.path, f"{prefix}{entry.name}/"))
+                        elif entry.is_file():
+                            index._add(Path(entry.path), f"{prefix}{entry.name}")
+            except OSError:
+                continue
+
+        index.files.sort(key=lambda item: item.relative_path)
+        for bucket in (*index.by_language.values(), *index.by_role.values()):
+            bucket.sort(key=lambda item: item.relative_path)
+        return index
+
+    def _add(self, path: Path, relative_path: str) -> None:
+        language, role = classify_path(relative_path)
+        item = IndexedFile(path=path, relative_path=relative_path, language=language, role=role)
+        self.files.append(item)
+        if "/" not in relative_path:
+            self.root_names.add(relative_path)
+        if language:
+            self.by_language.setdefault(language, []).append(item)
+        self.by_role.setdefault(role, []).append(item)
+
+    def files_for_language(self, language: str) -> list[IndexedFile]:
+        """All source and test files of a language."""
+        return self.by_language.get(language, [])
+
+    def tests(self) -> list[IndexedFile]:
+        return self.by_role.get("test", [])
+
+    def manifests(self) -> list[IndexedFile]:
+        return self.by_role.get("manifest", [])
+
+    def has_root_file(self, *names: str) -> bool:
+        """Check whether any of the given files exists at the repository root."""
+        return any(name in self.root_names for name in names)
+
+    def has_file_matching(self, pattern: str, root_only: bool = False) -> bool:
+        for item in self.files:
+            if root_only and "/" in item.relative_path:
+                continue
+            if fnmatch.fnmatchcase(item.path.name, pattern):
+                return True
+        return False
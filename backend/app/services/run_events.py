@@ -0,0 +1,122 @@
+"""In-process event bus for live run progress (served as Server-Sent Events)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+TERMINAL_EVENT = "run_completed"
+
+
+@dataclass
+class RunEvent:
+    id: int
+    type: str
+    data: dict[str, Any]
+
+    def encode(self) -> str:
+        """Server-Sent Events wire format."""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+@dataclass
+class _RunChannel:
+    events: deque[RunEvent]
+    next_id: int = 1
+    waiters: set[asyncio.Future] = field(default_factory=set)
+    completed: bool = False
+
+
+class RunEventBus:
+    """
+    Keeps a bounded buffer of recent events per run and fans them out to subscribers.
+
+    Event ids increase per run, so a client reconnecting with `Last-Event-ID` receives
+    only what it missed. If the missed events have already left the buffer the caller
+    is told to resynchronize from a snapshot. Must be used from the event loop thread.
+    """
+
+    def __init__(self, buffer_size: int | None = None, retention_seconds: float | None = None) -> None:
+        self.buffer_size = buffer_size or int(os.getenv("RUN_EVENT_BUFFER_SIZE", "1000"))
+        self.retention_seconds = (
+            retention_seconds
+            if retention_seconds is not None
+            else float(os.getenv("RUN_EVENT_RETENTION_SECONDS", "300"))
+        )
+        self.channels: dict[str, _RunChannel] = {}
+
+    def _channel(self, run_id: str) -> _RunChannel:
+        channel = self.channels.get(run_id)
+        if channel is None:
+            channel = _RunChannel(events=deque(maxlen=self.buffer_size))
+            self.channels[run_id] = channel
+        return channel
+
+    def publish(self, run_id: str, event_type: str, data: dict[str, Any]) -> RunEvent:
+        channel = self._channel(run_id)
+        event = RunEvent(id=channel.next_id, type=event_type, data=data)
+        channel.next_id += 1
+        channel.events.append(event)
+
+        # A resumed run reopens its channel
+        channel.completed = event_type == TERMINAL_EVENT
+        if channel.completed:
+            # Keep the buffer around briefly so reconnecting clients can still catch up
+            asyncio.get_running_loop().call_later(self.retention_seconds, self._expire, run_id, channel)
+
+        for waiter in channel.waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        channel.waiters.clear()
+        return event
+
+    def last_event_id(self, run_id: str) -> int:
+        channel = self.channels.get(run_id)
+        return channel.next_id - 1 if channel else 0
+
+    def can_resume(self, run_id: str, last_event_id: int) -> bool:
+        """True if every event after `last_event_id` is still buffered."""
+        channel = self.channels.get(run_id)
+        if channel is None:
+            return False
+        oldest = channel.events[0].id if channel.events else channel.next_id
+        return last_event_id >= oldest - 1
+
+    def is_completed(self, run_id: str) -> bool:
+        channel = self.channels.get(run_id)
+        return bool(channel and channel.completed)
+
+    async def subscribe(
+        self,
+        run_id: str,
+        last_event_id: int = 0,
+        heartbeat_seconds: float = 15.0,
+    ) -> AsyncIterator[RunEvent | None]:
+        """Yield events after `last_event_id` until the run completes; None is a heartbeat tick."""
+        channel = self._channel(run_id)
+        while True:
+            pending = [event for event in channel.events if event.id > last_event_id]
+            for event in pending:
+                last_event_id = event.id
+                yield event
+                if event.type == TERMINAL_EVENT:
+                    return
+            if channel.completed:
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            channel.waiters.add(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield None
+            finally:
+                channel.waiters.discard(waiter)
+
+    def _expire(self, run_id: str, channel: _RunChannel) -> None:
+        if self.channels.get(run_id) is channel and channel.completed:
+            del self.channels[run_id]
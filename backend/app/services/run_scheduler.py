@@ -0,0 +1,120 @@
+"""Admission control and queueing for healing runs."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the run backlog is at its limit."""
+
+
+@dataclass(order=True)
+class QueuedRun:
+    # Higher priority first, then submission order
+    sort_key: tuple[int, int]
+    run_id: str = field(compare=False)
+    repo_key: str = field(compare=False)
+    job: Callable[[], Awaitable[None]] = field(compare=False)
+
+
+class RunScheduler:
+    """
+    Starts queued runs while respecting a global limit (`MAX_CONCURRENT_RUNS`) and a
+    per-repository limit (`MAX_RUNS_PER_REPO`). Waiting runs are ordered by priority,
+    then FIFO; submissions beyond `MAX_QUEUED_RUNS` waiting runs are rejected.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int | None = None,
+        max_per_repo: int | None = None,
+        max_queued: int | None = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent or int(os.getenv("MAX_CONCURRENT_RUNS", "4"))
+        self.max_per_repo = max_per_repo or int(os.getenv("MAX_RUNS_PER_REPO", "1"))
+        self.max_queued = max_queued if max_queued is not None else int(os.getenv("MAX_QUEUED_RUNS", "50"))
+        self.queue: list[QueuedRun] = []
+        self.running: dict[str, str] = {}  # run_id -> repo_key
+        self.tasks: set[asyncio.Task] = set()
+        self._sequence = itertools.count()
+
+    @staticmethod
+    def repo_key(repository_url: str) -> str:
+        key = repository_url.strip().rstrip("/").lower()
+        return key[:-4] if key.endswith(".git") else key
+
+    def has_capacity(self, repository_url: str | None = None) -> bool:
+        """True if a new submission would be accepted (started or queued).
+
+        Without a repository only the backlog is checked, so a full backlog is reported full
+        even if a run of some idle repository could still start right away.
+        """
+        if len(self.queue) < self.max_queued:
+            return True
+        return repository_url is not None and self._can_start(self.repo_key(repository_url))
+
+    def submit(
+        self,
+        run_id: str,
+        repository_url: str,
+        job: Callable[[], Awaitable[None]],
+        priority: int = 0,
+    ) -> int | None:
+        """Queue a run and start whatever is eligible. Returns its queue position (None once started)."""
+        if run_id in self.running or any(item.run_id == run_id for item in self.queue):
+            return self.queue_position(run_id)
+        repo_key = self.repo_key(repository_url)
+        # Only a run that starts immediately may bypass a full backlog
+        if len(self.queue) >= self.max_queued and not self._can_start(repo_key):
+            raise QueueFullError(f"Run queue is full ({self.max_queued} waiting)")
+        self.queue.append(
+            QueuedRun(
+                sort_key=(-priority, next(self._sequence)),
+                run_id=run_id,
+                repo_key=repo_key,
+                job=job,
+            )
+        )
+        self._dispatch()
+        return self.queue_position(run_id)
+
+    def queue_position(self, run_id: str) -> int | None:
+        """1-based position among waiting runs, or None if the run is not waiting."""
+        for position, item in enumerate(sorted(self.queue), start=1):
+            if item.run_id == run_id:
+                return position
+        return None
+
+    def _can_start_any(self) -> bool:
+        return len(self.running) < self.max_concurrent
+
+    def _can_start(self, repo_key: str) -> bool:
+        return self._can_start_any() and self._repo_running(repo_key) < self.max_per_repo
+
+    def _repo_running(self, repo_key: str) -> int:
+        return sum(1 for running_repo in self.running.values() if running_repo == repo_key)
+
+    def _dispatch(self) -> None:
+        # Skip runs whose repository is at its limit so they don't block other repositories
+        for item in sorted(self.queue):
+            if not self._can_start_any():
+                break
+            if self._repo_running(item.repo_key) >= self.max_per_repo:
+                continue
+            self.queue.remove(item)
+            self.running[item.run_id] = item.repo_key
+            task = asyncio.create_task(self._run(item))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, item: QueuedRun) -> None:
+        try:
+            await item.job()
+        finally:
+            self.running.pop(item.run_id, None)
+            self._dispatch()
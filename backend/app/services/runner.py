@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import uuid
+from dataclasses import asdict, dataclass
 from datetime import datetime, UTC
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from app.agents.pipeline import (
     TestDiscoveryAgent,
@@ -13,14 +16,30 @@ from app.agents.langgraph_flow import LangGraphOrchestrator
 from app.core.policy import build_branch_name
 from app.core.scoring import calculate_score
 from app.models.api import RunRequest
+from app.services.analysis_cache import AnalysisCacheService
+from app.services.ci_poll_scheduler import CIPollScheduler
+from app.services.ci_webhooks import CIWebhookRegistry
+from app.services.execution import ExecutionLayer
 from app.services.failure_parser import FailureParserService
 from app.services.github_ops import GitHubOpsService
 from app.services.patch_applier import PatchApplierService
+from app.services.repository_index import RepositoryIndex
+from app.services.run_events import RunEventBus
 from app.services.static_analyzer import StaticAnalyzerService
 from app.services.multi_language_analyzer import MultiLanguageAnalyzerService
 from app.services.multi_language_patch_applier import MultiLanguagePatchApplierService
 from app.services.storage import StorageService
 from app.services.test_engine import TestEngineService
+from app.services.workspace_manager import WorkspaceManager
+
+
+@dataclass
+class _Speculation:
+    """Tests and analysis of the pushed commit, started while its CI result is pending."""
+
+    revision: str | None
+    task: asyncio.Task
+    cache_stats: dict[str, int]
 
 
 class RunnerService:
@@ -29,17 +48,29 @@ class RunnerService:
         self.repo_root = Path(__file__).resolve().parents[2]
         self.work_dir = self.repo_root / "workspaces"
         self.work_dir.mkdir(exist_ok=True)
+        # Retention and per-run disk quotas for workspaces and results files
+        self.workspaces = WorkspaceManager(self.work_dir, storage.data_dir)
 
         self.test_discovery_agent = TestDiscoveryAgent()
         self.graph_orchestrator = LangGraphOrchestrator()
         self.timeline_agent = TimelineAgent()
         self.github_ops = GitHubOpsService()
+        self.ci_poller = CIPollScheduler(self.github_ops, webhooks=CIWebhookRegistry())
         self.test_engine = TestEngineService(use_docker=True)  # ✅ SANDBOXED DOCKER EXECUTION
         self.failure_parser = FailureParserService()
         self.patch_applier = PatchApplierService()  # Keep for backward compatibility
         self.static_analyzer = StaticAnalyzerService()  # Keep for backward compatibility
-        self.multi_language_analyzer = MultiLanguageAnalyzerService()  # 🌐 MULTI-LANGUAGE SUPPORT
+        self.multi_language_analyzer = MultiLanguageAnalyzerService(cache=AnalysisCacheService())  # 🌐 MULTI-LANGUAGE SUPPORT
         self.multi_language_patcher = MultiLanguagePatchApplierService()  # 🌐 MULTI-LANGUAGE PATCHING
+        # Blocking stages (git, filesystem, analysis, patching) run here so the API stays responsive
+        self.execution = ExecutionLayer()
+        # Live progress for GET /api/runs/{run_id}/events; in-memory state of executing runs
+        self.events = RunEventBus()
+        self.live_states: dict[str, dict[str, Any]] = {}
+        # Start the next iteration's tests and analysis while CI runs on the pushed commit
+        self.pipelined = os.getenv("PIPELINED_ITERATIONS", "true").lower() in ("1", "true", "yes")
+        # Stop a test run once this many distinct failures were parsed from its live output (0: never)
+        self.fail_fast_failures = int(os.getenv("TEST_FAIL_FAST_FAILURES", "0"))
 
     def build_initial_state(self, run_id: str, payload: RunRequest, branch_name: str) -> dict[str, Any]:
         return {
@@ -65,6 +96,8 @@ class RunnerService:
             "timeline": [],
             "error_message": None,
             "ci_workflow_url": None,
+            "analysis_cache": {"hits": 0, "misses": 0},
+            "speculation": {"reused": 0, "discarded": 0},
         }
 
     async def start_run(self, payload: RunRequest) -> str:
@@ -80,6 +113,8 @@ class RunnerService:
         run_state["status"] = "RUNNING"
         run_state["started_at"] = started_at.isoformat()
         self.storage.upsert_run(run_id, run_state)
+        self.live_states[run_id] = run_state
+        self._publish_update(run_id, run_state, "status", "started_at", "queue_position")
 
         branch_name = run_state["branch_name"]
         repo_dir = self.work_dir / run_id
@@ -87,20 +122,30 @@ class RunnerService:
         iteration = 0
         
         # Track unique failures and successful fixes across iterations
-        unique_failures: set[tuple] = set()
-        successfully_fixed: set[tuple] = set()  # Fixed failures to avoid retrying
-        failed_attempts: dict[tuple, int] = {}  # Track retry attempts per failure
-        max_attempts_per_failure = 3
         unique_failures: set[tuple[str, int, str]] = set()
+        successfully_fixed: set[tuple] = set()  # Fixed failures to avoid retrying
         # Track failed attempts per unique failure to prevent infinite retry
         failed_attempts: dict[tuple[str, int, str], int] = {}
         max_attempts_per_failure = 3
+        # Files written by the patchers since the last analysis; None forces a full analysis
+        changed_files: set[str] | None = None
+        speculation: _Speculation | None = None
+        # Pipelined attempts whose results were reused or thrown away
+        speculation_stats = run_state.setdefault("speculation", {"reused": 0, "discarded": 0})
 
         try:
             owner, repo = self.github_ops.parse_owner_repo(str(payload.repository_url))
-            self.github_ops.clone_repository(str(payload.repository_url), repo_dir)
-            self.github_ops.create_branch(repo_dir, branch_name)
-            self.test_discovery_agent.discover(repo_dir)
+            self._publish_stage(run_id, "clone")
+            await self.execution.run_io(self.github_ops.clone_repository, str(payload.repository_url), repo_dir)
+            await self.execution.run_io(self.workspaces.enforce_quota, repo_dir)
+            clone_report = self.github_ops.take_clone_report(repo_dir)
+            if clone_report is not None:
+                run_state["clone"] = asdict(clone_report)
+                self.storage.upsert_run(run_id, run_state)
+                self._publish_update(run_id, run_state, "clone")
+            await self.execution.run_io(self.github_ops.create_branch, repo_dir, branch_name)
+            discovery_index = await self.execution.run_io(RepositoryIndex.build, repo_dir)
+            self.test_discovery_agent.discover(repo_dir, discovery_index)
 
             while iteration < payload.retry_limit and not passed:
                 iteration += 1
@@ -114,9 +159,31 @@ class RunnerService:
                 while local_attempts < max_local_attempts:
                     local_attempts += 1
 
-                    test_result = self.test_engine.run_tests(repo_dir)
-                    parsed_failures = self.failure_parser.parse(test_result.output)
-                    static_failures = self.multi_language_analyzer.analyze(repo_dir)  # 🌐 MULTI-LANGUAGE ANALYSIS
+                    self._publish_stage(run_id, "tests", iteration=iteration, attempt=local_attempts)
+                    cache_stats = run_state.setdefault("analysis_cache", {"hits": 0, "misses": 0})
+                    outcome = None
+                    if speculation is not None:
+                        outcome = await self._take_speculation(speculation, repo_dir, speculation_stats)
+                        if outcome is None:
+                            changed_files = None  # the workspace moved on; analyze everything again
+                        else:
+                            for key, count in speculation.cache_stats.items():
+                                cache_stats[key] = cache_stats.get(key, 0) + count
+                        speculation = None
+                    # After a patch pass only the tests affected by the patched files run
+                    affected_only = local_attempts > 1 and bool(changed_files)
+                    if outcome is None:
+                        outcome = await self._test_and_analyze(
+                            repo_dir,
+                            changed_files,
+                            cache_stats,
+                            on_analysis=lambda: self._publish_stage(
+                                run_id, "analysis", iteration=iteration, attempt=local_attempts
+                            ),
+                            affected_only=affected_only,
+                        )
+                    parsed_failures, static_failures = outcome
+                    changed_files = set()
 
                     parsed_failures = self._normalize_failure_paths(parsed_failures, repo_dir)
                     static_failures = self._normalize_failure_paths(static_failures, repo_dir)
@@ -139,10 +206,17 @@ class RunnerService:
                     
                     # If no failures left to fix, we're done
                     if not raw_failures_to_fix:
+                        if affected_only:
+                            # Only affected tests ran; verify with the full suite before pushing,
+                            # without spending a local attempt on it
+                            local_attempts -= 1
+                            continue
                         local_solved = True
                         break
 
-                    graph_state = self.graph_orchestrator.run(raw_failures_to_fix)
+                    self._publish_update(run_id, run_state, "total_failures_detected")
+                    self._publish_stage(run_id, "fixing", iteration=iteration, attempt=local_attempts)
+                    graph_state = await self.execution.run_cpu(self.graph_orchestrator.run, raw_failures_to_fix)
                     
                     # Deduplicate fix results by (file, line, bug_type)
                     # This handles cases where multiple failures on same line (e.g., multi-part imports)
@@ -189,13 +263,15 @@ class RunnerService:
                             {"message": ""},
                         )
 
-                        applied = self.multi_language_patcher.apply_fix(  # 🌐 MULTI-LANGUAGE PATCHING
+                        applied = await self.execution.run_cpu(
+                            self.multi_language_patcher.apply_fix,  # 🌐 MULTI-LANGUAGE PATCHING
                             repo_path=repo_dir,
                             file_path=fix_plan.file,
                             line_number=fix_plan.line_number,
                             bug_type=fix_plan.bug_type,
                             message=source_failure.get("message", ""),
                         )
+                        changed_files.add(fix_plan.file)
 
                         failure_key = (fix_plan.file, fix_plan.line_number, fix_plan.bug_type)
                         
@@ -246,7 +322,8 @@ class RunnerService:
                         unique_iteration_rows.append(row)
 
                 if applied_in_iteration > 0:
-                    committed, final_commit_message = self.github_ops.commit_changes(
+                    committed, final_commit_message = await self.execution.run_io(
+                        self.github_ops.commit_changes,
                         repo_path=repo_dir,
                         commit_message=f"Iteration {iteration}: apply {applied_in_iteration} autonomous fixes",
                     )
@@ -257,10 +334,14 @@ class RunnerService:
                                 row["commit_message"] = final_commit_message
 
                 run_state["fixes"].extend(unique_iteration_rows)
+                for row in unique_iteration_rows:
+                    self.events.publish(run_id, "fix", row)
+                self._publish_update(run_id, run_state, "total_fixes_applied", "commit_count")
 
                 # Push changes with error handling (fail fast if push is rejected)
+                self._publish_stage(run_id, "push", iteration=iteration)
                 try:
-                    self.github_ops.push_branch(repo_dir, branch_name)
+                    await self.execution.run_io(self.github_ops.push_branch, repo_dir, branch_name)
                 except Exception as push_error:
                     run_state["status"] = "FAILED"
                     run_state["error_message"] = f"Push failed: {str(push_error)}"
@@ -274,14 +355,23 @@ class RunnerService:
                     self.storage.upsert_run(run_id, run_state)
                     break
 
-                ci_status, workflow_url = await self.github_ops.poll_ci_status(
+                self._publish_stage(run_id, "ci", iteration=iteration)
+                # Only CI results for the commit just pushed count
+                head_sha = await self.execution.run_io(self.github_ops.workspace_revision, repo_dir)
+                if self.pipelined and iteration < payload.retry_limit:
+                    speculation = await self._start_speculation(repo_dir, changed_files)
+                ci_status, workflow_url = await self.ci_poller.wait_for_completion(
                     owner,
                     repo,
                     branch_name,
                     timeout_seconds=120,
+                    head_sha=head_sha,
                 )
                 run_state["ci_workflow_url"] = workflow_url
                 passed = ci_status == "PASSED" and local_solved
+                if passed:
+                    await self._discard_speculation(speculation, speculation_stats)
+                    speculation = None
                 run_state["timeline"].append(
                     self.timeline_agent.event(
                         iteration=iteration,
@@ -289,6 +379,8 @@ class RunnerService:
                         passed=passed,
                     )
                 )
+                self._publish_update(run_id, run_state, "ci_workflow_url")
+                self.events.publish(run_id, "timeline", run_state["timeline"][-1])
 
                 self.storage.upsert_run(run_id, run_state)
 
@@ -306,6 +398,7 @@ class RunnerService:
                     )
                 )
 
+        await self._discard_speculation(speculation, speculation_stats)
         completed_at = datetime.now(UTC)
         run_state["completed_at"] = completed_at.isoformat()
         run_state["duration_seconds"] = (completed_at - started_at).total_seconds()
@@ -315,11 +408,102 @@ class RunnerService:
         ).model_dump()
 
         self.storage.upsert_run(run_id, run_state)
-        self.storage.write_results_file(run_id, run_state)
+        self.live_states.pop(run_id, None)
+        self.events.publish(run_id, "run_completed", run_state)
+        await self.execution.run_io(self.storage.write_results_file, run_id, run_state)
+        self.multi_language_analyzer.forget(repo_dir)
+        self.github_ops.forget_ci_cache(str(payload.repository_url), branch_name)
         
         # ✅ Cleanup Docker containers (sandboxed execution)
-        if self.test_engine.executor:
-            self.test_engine.executor.cleanup_all()
+        await self.execution.run_io(self.test_engine.release_workspace, repo_dir)
+
+    async def _test_and_analyze(
+        self,
+        repo_dir: Path,
+        changed_files: set[str] | None,
+        cache_stats: dict[str, int],
+        on_analysis: Callable[[], None] | None = None,
+        affected_only: bool = False,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Run the tests and static analysis of one attempt; returns (parsed, static) failures.
+
+        With `affected_only` only the tests that import one of `changed_files` run.
+        """
+        # One workspace walk per attempt, shared by the test engine and all analyzers
+        repo_index = await self.execution.run_io(RepositoryIndex.build, repo_dir)
+        live_failures = self.failure_parser.live(stop_after=self.fail_fast_failures)
+        test_result = await self.test_engine.run_tests_async(
+            repo_dir,
+            index=repo_index,
+            on_line=live_failures.on_line,
+            max_failures=self.fail_fast_failures,
+            changed_files=changed_files if affected_only else None,
+        )
+        # Dependency installs and build outputs land in the workspace
+        await self.execution.run_io(self.workspaces.enforce_quota, repo_dir)
+        parsed_failures = self.failure_parser.parse_result(test_result, repo_index, live=live_failures)
+        if on_analysis:
+            on_analysis()
+        analysis = asyncio.ensure_future(
+            self.execution.run_cpu(
+                self.multi_language_analyzer.analyze,  # 🌐 MULTI-LANGUAGE ANALYSIS
+                repo_dir,
+                index=repo_index,
+                cache_stats=cache_stats,
+                changed_files=changed_files,
+            )
+        )
+        try:
+            static_failures = await asyncio.shield(analysis)
+        except asyncio.CancelledError:
+            # The analyzer thread can't be interrupted and stores the repository's findings
+            # snapshot when it finishes; wait for it so a discarded speculation doesn't write
+            # after `forget()` or race the next attempt's analysis.
+            await asyncio.gather(analysis, return_exceptions=True)
+            raise
+        return parsed_failures, static_failures
+
+    async def _start_speculation(self, repo_dir: Path, changed_files: set[str] | None) -> _Speculation:
+        revision = await self.execution.run_io(self.github_ops.workspace_revision, repo_dir)
+        cache_stats = {"hits": 0, "misses": 0}
+        task = asyncio.create_task(self._test_and_analyze(repo_dir, changed_files, cache_stats))
+        return _Speculation(revision=revision, task=task, cache_stats=cache_stats)
+
+    async def _take_speculation(
+        self, speculation: _Speculation, repo_dir: Path, stats: dict[str, int]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]] | None:
+        """The speculative outcome if the workspace is still at the commit it ran on, else None."""
+        try:
+            outcome = await speculation.task
+        except Exception:
+            outcome = None
+        if outcome is not None:
+            revision = await self.execution.run_io(self.github_ops.workspace_revision, repo_dir)
+            if speculation.revision is None or revision != speculation.revision:
+                outcome = None
+        stats["reused" if outcome is not None else "discarded"] += 1
+        return outcome
+
+    async def _discard_speculation(self, speculation: _Speculation | None, stats: dict[str, int]) -> None:
+        if speculation is None:
+            return
+        stats["discarded"] += 1
+        speculation.task.cancel()
+        await asyncio.gather(speculation.task, return_exceptions=True)
+
+    def current_state(self, run_id: str) -> dict[str, Any]:
+        """Latest run state: in-memory while executing (ahead of storage), else stored."""
+        live = self.live_states.get(run_id)
+        if live is None:
+            return self.storage.get_run(run_id)
+        # The live copy carries whatever version it was loaded at; report the stored one
+        return {**live, "version": self.storage.get_run_version(run_id)}
+
+    def _publish_stage(self, run_id: str, stage: str, **details: Any) -> None:
+        self.events.publish(run_id, "stage", {"stage": stage, **details})
+
+    def _publish_update(self, run_id: str, run_state: dict[str, Any], *fields: str) -> None:
+        self.events.publish(run_id, "run_updated", {field: run_state.get(field) for field in fields})
 
     @staticmethod
     def _normalize_failure_paths(failures: list[dict[str, Any]], repo_dir: Path) -> list[dict[str, Any]]:
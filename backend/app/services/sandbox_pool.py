@@ -0,0 +1,169 @@
+"""Pool of warm Docker sandboxes reused across test executions."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.services.docker_executor import DockerExecutor
+
+
+@dataclass
+class PooledSandbox:
+    container_id: str
+    image: str
+    workspace: str
+    last_used: float
+    # Extra `docker create` arguments (cache mounts); part of the pool key
+    create_args: tuple[str, ...] = ()
+    # Setup steps (e.g. dependency installs) already run in this container
+    prepared: set[str] = field(default_factory=set)
+    in_use: bool = False
+
+
+class SandboxPool:
+    """
+    Keeps started containers per (image, workspace, create arguments) so later test executions skip
+    container creation and dependency installs.
+
+    Between executions a sandbox is reset by clearing `/tmp`; installed packages are kept.
+    Containers are health-checked before reuse, evicted after `idle_seconds` without use,
+    and the pool never holds more than `max_size` containers.
+    """
+
+    def __init__(
+        self,
+        executor: DockerExecutor,
+        max_size: int | None = None,
+        idle_seconds: float | None = None,
+    ) -> None:
+        self.executor = executor
+        self.max_size = max_size or int(os.getenv("SANDBOX_POOL_MAX_SIZE", "4"))
+        self.idle_seconds = idle_seconds or float(os.getenv("SANDBOX_POOL_IDLE_SECONDS", "600"))
+        self.sandboxes: list[PooledSandbox] = []
+        self.lock = threading.Lock()
+
+    def acquire(
+        self,
+        workspace: Path,
+        image: str | None = None,
+        create_args: tuple[str, ...] = (),
+    ) -> PooledSandbox:
+        """Get a ready sandbox for the workspace, reusing an idle one when possible."""
+        image = image or self.executor.image
+        workspace_key = str(workspace.resolve())
+        self.evict_idle()
+
+        with self.lock:
+            sandbox = next(
+                (
+                    sandbox
+                    for sandbox in self.sandboxes
+                    if not sandbox.in_use
+                    and sandbox.image == image
+                    and sandbox.workspace == workspace_key
+                    and sandbox.create_args == create_args
+                ),
+                None,
+            )
+            if sandbox is not None:
+                sandbox.in_use = True
+
+        if sandbox is not None:
+            if self.executor.is_running(sandbox.container_id) and self._reset(sandbox):
+                return sandbox
+            self._discard(sandbox)
+
+        container_id = self.executor.create_container(
+            Path(workspace_key),
+            name=f"sandbox-{uuid.uuid4().hex[:12]}",
+            image=image,
+            extra_args=create_args,
+        )
+        sandbox = PooledSandbox(
+            container_id=container_id,
+            image=image,
+            workspace=workspace_key,
+            last_used=time.monotonic(),
+            create_args=create_args,
+            in_use=True,
+        )
+        with self.lock:
+            self.sandboxes.append(sandbox)
+            overflow = self._over_capacity()
+        for idle in overflow:
+            self._discard(idle)
+        return sandbox
+
+    def prepare(self, sandbox: PooledSandbox, step: str, command: list[str], timeout: int = 600) -> None:
+        """Run a setup command once per sandbox; `step` identifies it (e.g. includes a manifest hash)."""
+        if step in sandbox.prepared:
+            return
+        result = self.executor.execute_in_container(sandbox.container_id, command, timeout=timeout)
+        if result.return_code == 0:
+            sandbox.prepared.add(step)
+
+    def release(self, sandbox: PooledSandbox, reusable: bool = True) -> None:
+        """Return a sandbox to the pool, or discard it if it must not be reused."""
+        if not reusable:
+            self._discard(sandbox)
+            return
+        with self.lock:
+            sandbox.in_use = False
+            sandbox.last_used = time.monotonic()
+            overflow = self._over_capacity()
+        for idle in overflow:
+            self._discard(idle)
+
+    def release_workspace(self, workspace: Path) -> None:
+        """Discard every sandbox bound to a workspace (e.g. when its run finishes)."""
+        workspace_key = str(workspace.resolve())
+        with self.lock:
+            doomed = [sandbox for sandbox in self.sandboxes if sandbox.workspace == workspace_key]
+        for sandbox in doomed:
+            self._discard(sandbox)
+
+    def evict_idle(self) -> None:
+        """Discard sandboxes unused for longer than the idle timeout."""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self.lock:
+            doomed = [sandbox for sandbox in self.sandboxes if not sandbox.in_use and sandbox.last_used < cutoff]
+        for sandbox in doomed:
+            self._discard(sandbox)
+
+    def close(self) -> None:
+        """Discard all pooled sandboxes."""
+        with self.lock:
+            doomed = list(self.sandboxes)
+        for sandbox in doomed:
+            self._discard(sandbox)
+
+    def _over_capacity(self) -> list[PooledSandbox]:
+        # Caller holds the lock; least recently used idle sandboxes go first
+        excess = len(self.sandboxes) - self.max_size
+        if excess <= 0:
+            return []
+        idle = sorted((sandbox for sandbox in self.sandboxes if not sandbox.in_use), key=lambda s: s.last_used)
+        doomed = idle[:excess]
+        for sandbox in doomed:
+            self.sandboxes.remove(sandbox)
+        return doomed
+
+    def _discard(self, sandbox: PooledSandbox) -> None:
+        with self.lock:
+            if sandbox in self.sandboxes:
+                self.sandboxes.remove(sandbox)
+        self.executor.stop_container(sandbox.container_id)
+
+    def _reset(self, sandbox: PooledSandbox) -> bool:
+        # Scratch state lives in /tmp; the workspace itself is the host-side repository
+        result = self.executor.execute_in_container(
+            sandbox.container_id,
+            ["sh", "-c", "rm -rf /tmp/* /tmp/.[!.]* 2>/dev/null; true"],
+            timeout=30,
+        )
+        return result.return_code == 0
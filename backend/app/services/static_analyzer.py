@@ -5,113 +5,322 @@ import re
 from pathlib import Path
 from typing import Any
 
+from app.services.python_rule_engine import FileContext, NodeKey, PythonRule, RuleEngine
+from app.services.repository_index import RepositoryIndex
+
 
 class StaticAnalyzerService:
-    def analyze(self, repo_path: Path) -> list[dict[str, Any]]:
+    def __init__(self) -> None:
+        self.rule_engine = RuleEngine([
+            UnusedImportRule,
+            UnusedVariableRule,
+            NamingStyleRule,
+            LogicRule,
+            TypeErrorRule,
+        ])
+
+    def analyze(self, repo_path: Path, index: RepositoryIndex | None = None) -> list[dict[str, Any]]:
         """Analyze Python files for all 6 bug types: SYNTAX, LINTING, LOGIC, TYPE_ERROR, IMPORT, INDENTATION."""
         failures: list[dict[str, Any]] = []
-        for file_path in self._iter_python_files(repo_path):
+        for file_path in self._iter_python_files(repo_path, index):
             relative_path = file_path.relative_to(repo_path).as_posix()
             source = file_path.read_text(encoding="utf-8", errors="ignore")
+            failures.extend(self.analyze_source(source, relative_path))
+
+        return failures
+
+    def analyze_source(self, source: str, relative_path: str) -> list[dict[str, Any]]:
+        """Analyze one Python file: a single parse shared by one traversal of all AST rules."""
+        failures: list[dict[str, Any]] = []
+        lines = source.splitlines()
+
+        tree = None
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as error:
+            failures.append({
+                "file": relative_path,
+                "line_number": error.lineno or 1,
+                "bug_type": "SYNTAX",
+                "message": error.msg or "SyntaxError",
+            })
+            failures.extend(self._find_unused_imports_in_source(lines, relative_path))
+
+        # Continue analyzing even if there's a SYNTAX error; rules that need the AST are skipped
+        ctx = FileContext(source=source, lines=lines, relative_path=relative_path, tree=tree)
+        failures.extend(self.rule_engine.run(ctx))
+        failures.extend(self._find_indentation_errors(lines, relative_path))
+        failures.extend(self._find_import_errors(lines, relative_path))
+
+        return failures
+
+    def _iter_python_files(self, repo_path: Path, index: RepositoryIndex | None = None):
+        """Iterate through Python files from the shared repository index."""
+        index = index or RepositoryIndex.build(repo_path)
+        for item in index.files_for_language("python"):
+            yield item.path
+
+    @staticmethod
+    def _to_snake_case(name: str) -> str:
+        first_pass = re.sub(r"(.)([A-Z][a-z]+)", r"\1_\2", name)
+        return re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", first_pass).lower()
+
+
+    @staticmethod
+    def _find_unused_imports_in_source(lines: list[str], relative_path: str) -> list[dict[str, Any]]:
+        """Find unused imports when AST parsing fails (syntax errors)."""
+        import_bindings: list[tuple[str, int]] = []
+
+        for line_no, raw_line in enumerate(lines, start=1):
+            stripped = raw_line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            if not stripped.startswith(("import ", "from ")):
+                continue
+            if stripped.endswith("(") or stripped.endswith("\\"):
+                continue
 
-            tree = None
             try:
-                tree = ast.parse(source)
-            except SyntaxError as error:
+                import_tree = ast.parse(stripped)
+            except SyntaxError:
+                continue
+
+            for node in ast.walk(import_tree):
+                if isinstance(node, ast.Import):
+                    for alias in node.names:
+                        bound_name = alias.asname or alias.name.split(".")[0]
+                        if bound_name and not bound_name.startswith("_"):
+                            import_bindings.append((bound_name, line_no))
+                elif isinstance(node, ast.ImportFrom):
+                    if node.module == "__future__":
+                        continue
+                    for alias in node.names:
+                        if alias.name == "*":
+                            continue
+                        bound_name = alias.asname or alias.name
+                        if bound_name and not bound_name.startswith("_"):
+                            import_bindings.append((bound_name, line_no))
+
+        if not import_bindings:
+            return []
+
+        source_without_comments = "\n".join(line.split("#", 1)[0] for line in lines)
+
+        failures: list[dict[str, Any]] = []
+        seen: set[tuple[str, int]] = set()
+        for name, line_no in import_bindings:
+            occurrences = len(re.findall(rf"\b{re.escape(name)}\b", source_without_comments))
+            if occurrences <= 1 and (name, line_no) not in seen:
                 failures.append({
                     "file": relative_path,
-                    "line_number": error.lineno or 1,
-                    "bug_type": "SYNTAX",
-                    "message": error.msg or "SyntaxError",
+                    "line_number": line_no,
+                    "bug_type": "LINTING",
+                    "message": "unused import",
                 })
-                failures.extend(self._find_unused_imports_in_source(source, relative_path))
+                seen.add((name, line_no))
+
+        return failures
 
-            # Continue analyzing even if there's a SYNTAX error
-            if tree:
-                failures.extend(self._find_unused_imports(tree, relative_path))
-                failures.extend(self._find_unused_variables(tree, source, relative_path))
-                failures.extend(self._find_naming_style_issues(tree, relative_path))
+    @staticmethod
+    def _find_indentation_errors(lines: list[str], relative_path: str) -> list[dict[str, Any]]:
+        """Find indentation errors: inconsistent indentation, missing indentation after colons, mixed tabs/spaces."""
+        failures: list[dict[str, Any]] = []
+        
+        # Track which blocks expect indentation
+        expects_indent = False
+        expect_indent_after_line = -1
+        
+        for line_no, line in enumerate(lines, start=1):
+            # Empty lines and comments don't affect indentation
+            if not line.strip() or line.strip().startswith("#"):
+                continue
+            
+            code = line.split("#", 1)[0].rstrip()  # Remove comments for analysis
+            current_indent = len(line) - len(line.lstrip())
+            current_indent_char = '\t' if line and line[0] == '\t' else ' '
+            
+            # Check for mixed tabs and spaces (bad indentation)
+            if '\t' in line[:current_indent] and ' ' in line[:current_indent]:
+                failures.append({
+                    "file": relative_path,
+                    "line_number": line_no,
+                    "bug_type": "INDENTATION",
+                    "message": "mixed tabs and spaces in indentation",
+                })
             
-            # Always check for logic and type errors via regex/pattern matching (doesn't need AST)
-            failures.extend(self._find_logic_errors(source, relative_path))
-            failures.extend(self._find_type_errors(source, relative_path))
-            failures.extend(self._find_indentation_errors(source, relative_path))
-            failures.extend(self._find_import_errors(source, relative_path))
+            # Check for lines that should be indented
+            if line_no > 1:
+                prev_line = lines[line_no - 2].split("#", 1)[0].rstrip()
+                prev_stripped = prev_line.strip()
+                prev_indent = len(prev_line) - len(prev_line.lstrip())
+                
+                # If previous line ends with colon, this line should be more indented
+                if prev_stripped.endswith(":"):
+                    expected_indent = prev_indent + 4
+                    
+                    # If this is not an empty line or a dedent, it should be indented
+                    # Allow dedenting (return, pass, elif, else, except, finally)
+                    is_dedent = any(
+                        code.strip().startswith(kw)
+                        for kw in ['return', 'pass', 'break', 'continue', 'elif', 'else', 'except', 'finally', 'def', 'class']
+                    )
+                    
+                    if not is_dedent and current_indent < expected_indent and code:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": line_no,
+                            "bug_type": "INDENTATION",
+                            "message": f"expected indentation of {expected_indent} spaces, got {current_indent}",
+                        })
 
         return failures
 
-    def _iter_python_files(self, repo_path: Path):
-        """Iterate through Python files, skipping common ignored directories."""
-        ignored_dirs = {
-            ".git", ".venv", "venv", "node_modules", "__pycache__",
-            ".pytest_cache", ".mypy_cache", "dist", "build",
-        }
-        for file_path in repo_path.rglob("*.py"):
-            if any(part in ignored_dirs for part in file_path.parts):
+    @staticmethod
+    def _find_import_errors(lines: list[str], relative_path: str) -> list[dict[str, Any]]:
+        """Find import-related errors: invalid imports, imports after code, circular imports."""
+        failures: list[dict[str, Any]] = []
+        
+        import_ended = False
+        
+        for line_no, line in enumerate(lines, start=1):
+            stripped = line.strip()
+            
+            # Skip empty lines and comments
+            if not stripped or stripped.startswith("#"):
                 continue
-            yield file_path
+            
+            # Check if this is an import line
+            is_import = stripped.startswith(("import ", "from "))
+            
+            # Track if we've seen non-import code
+            if not is_import and not stripped.startswith("#"):
+                import_ended = True
+            
+            # Imports should come before other code (except docstrings and __future__)
+            if is_import and import_ended and line_no > 1:
+                prev_non_comment = None
+                for prev_line_no in range(line_no - 1, 0, -1):
+                    prev_stripped = lines[prev_line_no - 1].strip()
+                    if prev_stripped and not prev_stripped.startswith("#"):
+                        prev_non_comment = prev_stripped
+                        break
+                
+                # Only report if not following __future__ imports
+                if prev_non_comment and not prev_non_comment.startswith("from __future__"):
+                    failures.append({
+                        "file": relative_path,
+                        "line_number": line_no,
+                        "bug_type": "IMPORT",
+                        "message": "import statement should appear at the top of the file",
+                    })
+            
+            # Check for invalid import patterns
+            if is_import:
+                # Check for empty imports or syntax errors
+                if stripped == "import" or stripped == "from":
+                    failures.append({
+                        "file": relative_path,
+                        "line_number": line_no,
+                        "bug_type": "IMPORT",
+                        "message": "incomplete import statement",
+                    })
+                
+                # Check for 'from X import' with empty import list
+                if stripped.startswith("from ") and " import " in stripped:
+                    import_part = stripped.split(" import ", 1)[1].strip()
+                    if not import_part:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": line_no,
+                            "bug_type": "IMPORT",
+                            "message": "empty import list",
+                        })
 
+        return failures
 
-    @staticmethod
-    def _find_unused_imports(tree: ast.AST, relative_path: str) -> list[dict[str, Any]]:
-        """Find imported names that are never used."""
-        imported: dict[str, int] = {}
-        used_names: set[str] = set()
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    bound_name = alias.asname or alias.name.split(".")[0]
-                    if bound_name and not bound_name.startswith("_"):
-                        imported[bound_name] = node.lineno
-            elif isinstance(node, ast.ImportFrom):
-                if node.module == "__future__":
+
+def _numeric_literal_value(node: ast.AST) -> float | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        if isinstance(node.operand, ast.Constant) and isinstance(node.operand.value, (int, float)):
+            value = float(node.operand.value)
+            return -value if isinstance(node.op, ast.USub) else value
+    return None
+
+
+def _in_walk_order(items: list[tuple[NodeKey, Any]]) -> list[Any]:
+    return [node for _, node in sorted(items, key=lambda item: item[0])]
+
+
+class UnusedImportRule(PythonRule):
+    """Imported names that are never used."""
+
+    node_types = (ast.Import, ast.ImportFrom, ast.Name)
+    requires_tree = True
+
+    def start(self, ctx: FileContext) -> None:
+        self.bindings: list[tuple[NodeKey, tuple[str, int]]] = []
+        self.used_names: set[str] = set()
+
+    def visit(self, node: ast.AST, ctx: FileContext) -> None:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                bound_name = alias.asname or alias.name.split(".")[0]
+                if bound_name and not bound_name.startswith("_"):
+                    self.bindings.append((ctx.key, (bound_name, node.lineno)))
+        elif isinstance(node, ast.ImportFrom):
+            if node.module == "__future__":
+                return
+            for alias in node.names:
+                if alias.name == "*":
                     continue
-                for alias in node.names:
-                    if alias.name == "*":
-                        continue
-                    bound_name = alias.asname or alias.name
-                    if bound_name and not bound_name.startswith("_"):
-                        imported[bound_name] = node.lineno
-            elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
-                used_names.add(node.id)
+                bound_name = alias.asname or alias.name
+                if bound_name and not bound_name.startswith("_"):
+                    self.bindings.append((ctx.key, (bound_name, node.lineno)))
+        elif isinstance(node.ctx, ast.Load):
+            self.used_names.add(node.id)
+
+    def finish(self, ctx: FileContext) -> list[dict[str, Any]]:
+        imported: dict[str, int] = {}
+        for name, line in _in_walk_order(self.bindings):
+            imported[name] = line
 
         failures: list[dict[str, Any]] = []
         for name, line in imported.items():
-            if name not in used_names:
+            if name not in self.used_names:
                 failures.append({
-                    "file": relative_path,
+                    "file": ctx.relative_path,
                     "line_number": line,
                     "bug_type": "LINTING",
                     "message": "unused import",
                 })
         return failures
 
-    @staticmethod
-    def _find_unused_variables(tree: ast.AST, source: str, relative_path: str) -> list[dict[str, Any]]:
-        """Find variables assigned but never used (module-level and function-level)."""
+
+class UnusedVariableRule(PythonRule):
+    """Variables assigned but never used (module-level and function-level)."""
+
+    node_types = (ast.Name, ast.arg)
+    requires_tree = True
+
+    def start(self, ctx: FileContext) -> None:
+        self.used_names: set[str] = set()
+
+    def visit(self, node: ast.AST, ctx: FileContext) -> None:
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                self.used_names.add(node.id)
+        else:
+            # Names used as function parameters are implicitly used
+            self.used_names.add(node.arg)
+
+    def finish(self, ctx: FileContext) -> list[dict[str, Any]]:
         failures: list[dict[str, Any]] = []
-        lines = source.splitlines()
-        
-        # Track module-level assignments and their line numbers
-        assigned_at_module_level: dict[str, int] = {}  # name -> line_number
-        used_names: set[str] = set()
-        
-        # Use AST to find all assignments and uses
-        for node in ast.walk(tree):
-            # Track assignments (only direct assignments, not in function defs)
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        if not target.id.startswith("_"):
-                            assigned_at_module_level[target.id] = node.lineno
-            # Track loads (uses)
-            elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
-                used_names.add(node.id)
-            # Also track names used in function parameters (they're implicitly used)
-            elif isinstance(node, ast.arg):
-                used_names.add(node.arg)
-        
+        relative_path = ctx.relative_path
+        lines = ctx.lines
+        used_names = self.used_names
+
         # Check line-by-line for clearer assignment tracking
         for line_no, line in enumerate(lines, start=1):
             code = line.split("#", 1)[0].strip()  # Remove comments
@@ -146,17 +355,25 @@ class StaticAnalyzerService:
         
         return failures
 
-    @staticmethod
-    def _to_snake_case(name: str) -> str:
-        first_pass = re.sub(r"(.)([A-Z][a-z]+)", r"\1_\2", name)
-        return re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", first_pass).lower()
 
-    @staticmethod
-    def _find_naming_style_issues(tree: ast.AST, relative_path: str) -> list[dict[str, Any]]:
+class NamingStyleRule(PythonRule):
+    """PascalCase class names and snake_case parameter names."""
+
+    node_types = (ast.ClassDef, ast.FunctionDef)
+    requires_tree = True
+
+    def start(self, ctx: FileContext) -> None:
+        self.definitions: list[tuple[NodeKey, ast.AST]] = []
+
+    def visit(self, node: ast.AST, ctx: FileContext) -> None:
+        self.definitions.append((ctx.key, node))
+
+    def finish(self, ctx: FileContext) -> list[dict[str, Any]]:
         failures: list[dict[str, Any]] = []
         seen: set[tuple[int, str]] = set()
+        relative_path = ctx.relative_path
 
-        for node in ast.walk(tree):
+        for node in _in_walk_order(self.definitions):
             if isinstance(node, ast.ClassDef):
                 class_name = node.name
                 is_pascal = bool(re.match(r"^[A-Z][A-Za-z0-9]*$", class_name)) and "_" not in class_name
@@ -197,22 +414,31 @@ class StaticAnalyzerService:
 
         return failures
 
-    @staticmethod
-    def _find_logic_errors(source: str, relative_path: str) -> list[dict[str, Any]]:
-        """Find common logic errors: XOR, string literal vs variable, wrong operators."""
+
+class LogicRule(PythonRule):
+    """Common logic errors: XOR, string literal vs variable, wrong operators, tracker and accumulator bugs."""
+
+    node_types = (ast.FunctionDef, ast.Return, ast.If, ast.For, ast.AugAssign)
+
+    def start(self, ctx: FileContext) -> None:
+        self.functions: list[tuple[NodeKey, ast.FunctionDef]] = []
+        # Per function: the nodes of each handled type found anywhere in its body
+        self.function_nodes: dict[ast.FunctionDef, dict[type[ast.AST], list[tuple[NodeKey, ast.AST]]]] = {}
+
+    def visit(self, node: ast.AST, ctx: FileContext) -> None:
+        if isinstance(node, ast.FunctionDef):
+            self.functions.append((ctx.key, node))
+            self.function_nodes[node] = {ast.Return: [], ast.If: [], ast.For: [], ast.AugAssign: []}
+            return
+        for function in ctx.function_stack:
+            self.function_nodes[function][type(node)].append((ctx.key, node))
+
+    def finish(self, ctx: FileContext) -> list[dict[str, Any]]:
         failures: list[dict[str, Any]] = []
-        lines = source.splitlines()
+        relative_path = ctx.relative_path
+        lines = ctx.lines
         seen_logic: set[tuple[int, str]] = set()
 
-        def numeric_literal_value(node: ast.AST) -> float | None:
-            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
-                return float(node.value)
-            if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
-                if isinstance(node.operand, ast.Constant) and isinstance(node.operand.value, (int, float)):
-                    value = float(node.operand.value)
-                    return -value if isinstance(node.op, ast.USub) else value
-            return None
-        
         for line_no, line in enumerate(lines, start=1):
             # Skip comments and empty lines
             code = line.split("#", 1)[0].strip()
@@ -274,399 +500,426 @@ class StaticAnalyzerService:
                             "message": "comparison for min uses '>', did you mean '<'?",
                         })
                         seen_logic.add(key)
-
         # AST-assisted logic detection for harder cases
-        try:
-            tree = ast.parse(source)
-            for node in ast.walk(tree):
-                if not isinstance(node, ast.FunctionDef):
+        for node in _in_walk_order(self.functions):
+            walk = {
+                node_type: _in_walk_order(items)
+                for node_type, items in self.function_nodes[node].items()
+            }
+            self._check_function(node, walk, ctx, failures, seen_logic)
+
+        return failures
+
+    @staticmethod
+    def _check_function(
+        node: ast.FunctionDef,
+        walk: dict[type[ast.AST], list[Any]],
+        ctx: FileContext,
+        failures: list[dict[str, Any]],
+        seen_logic: set[tuple[int, str]],
+    ) -> None:
+        relative_path = ctx.relative_path
+        source = ctx.source
+        func_name = node.name.lower()
+        param_names = {arg.arg for arg in node.args.args}
+
+        # Case 1: area-named function likely computing circumference (2*pi*r)
+        if "area" in func_name and param_names:
+            primary_param = node.args.args[0].arg
+            for child in walk[ast.Return]:
+                expr = ast.get_source_segment(source, child.value) or ""
+                expr_lower = expr.lower()
+                has_pi = "pi" in expr_lower or "3.14" in expr_lower
+                if (
+                    has_pi
+                    and "*" in expr
+                    and "**" not in expr
+                    and re.search(rf"\b{re.escape(primary_param)}\b\s*\*\s*2\b", expr)
+                ):
+                    msg = "area function appears to compute circumference (2πr), expected πr²"
+                    key = (child.lineno, msg)
+                    if key not in seen_logic:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": child.lineno,
+                            "bug_type": "LOGIC",
+                            "message": msg,
+                        })
+                        seen_logic.add(key)
+
+        # Case 2: min/max tracker initialized to a constant then compared in loop
+        init_candidates: dict[str, int] = {}
+        for stmt in node.body:
+            numeric_value = _numeric_literal_value(stmt.value) if isinstance(stmt, ast.Assign) else None
+            if (
+                isinstance(stmt, ast.Assign)
+                and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)
+                and numeric_value is not None
+            ):
+                target_name = stmt.targets[0].id
+                lower_target = target_name.lower()
+                if "min" in lower_target or "max" in lower_target:
+                    init_candidates[target_name] = stmt.lineno
+
+        if init_candidates:
+            for child in walk[ast.If]:
+                if not isinstance(child.test, ast.Compare):
+                    continue
+                if len(child.test.ops) != 1 or len(child.test.comparators) != 1:
+                    continue
+                if not isinstance(child.test.left, ast.Name):
+                    continue
+                comparator = child.test.comparators[0]
+                if not isinstance(comparator, ast.Name):
                     continue
 
-                func_name = node.name.lower()
-                param_names = {arg.arg for arg in node.args.args}
-
-                # Case 1: area-named function likely computing circumference (2*pi*r)
-                if "area" in func_name and param_names:
-                    primary_param = node.args.args[0].arg
-                    for child in ast.walk(node):
-                        if isinstance(child, ast.Return):
-                            expr = ast.get_source_segment(source, child.value) or ""
-                            expr_lower = expr.lower()
-                            has_pi = "pi" in expr_lower or "3.14" in expr_lower
-                            if (
-                                has_pi
-                                and "*" in expr
-                                and "**" not in expr
-                                and re.search(rf"\b{re.escape(primary_param)}\b\s*\*\s*2\b", expr)
-                            ):
-                                msg = "area function appears to compute circumference (2πr), expected πr²"
-                                key = (child.lineno, msg)
-                                if key not in seen_logic:
-                                    failures.append({
-                                        "file": relative_path,
-                                        "line_number": child.lineno,
-                                        "bug_type": "LOGIC",
-                                        "message": msg,
-                                    })
-                                    seen_logic.add(key)
+                tracker_name = comparator.id
+                if tracker_name not in init_candidates:
+                    continue
 
-                # Case 2: min/max tracker initialized to a constant then compared in loop
-                init_candidates: dict[str, int] = {}
-                for stmt in node.body:
-                    numeric_value = numeric_literal_value(stmt.value) if isinstance(stmt, ast.Assign) else None
-                    if (
-                        isinstance(stmt, ast.Assign)
-                        and len(stmt.targets) == 1
-                        and isinstance(stmt.targets[0], ast.Name)
-                        and numeric_value is not None
-                    ):
-                        target_name = stmt.targets[0].id
-                        lower_target = target_name.lower()
-                        if "min" in lower_target or "max" in lower_target:
-                            init_candidates[target_name] = stmt.lineno
-
-                if init_candidates:
-                    for child in ast.walk(node):
-                        if not isinstance(child, ast.If):
-                            continue
-                        if not isinstance(child.test, ast.Compare):
-                            continue
-                        if len(child.test.ops) != 1 or len(child.test.comparators) != 1:
-                            continue
-                        if not isinstance(child.test.left, ast.Name):
-                            continue
-                        comparator = child.test.comparators[0]
-                        if not isinstance(comparator, ast.Name):
-                            continue
+                lower_tracker = tracker_name.lower()
+                op = child.test.ops[0]
+                is_suspicious_min = "min" in lower_tracker and isinstance(op, ast.Lt)
+                is_suspicious_max = "max" in lower_tracker and isinstance(op, ast.Gt)
+                if not (is_suspicious_min or is_suspicious_max):
+                    continue
 
-                        tracker_name = comparator.id
-                        if tracker_name not in init_candidates:
-                            continue
+                msg = "min/max tracker initialized to constant; use first iterable element instead"
+                key = (init_candidates[tracker_name], msg)
+                if key not in seen_logic:
+                    failures.append({
+                        "file": relative_path,
+                        "line_number": init_candidates[tracker_name],
+                        "bug_type": "LOGIC",
+                        "message": msg,
+                    })
+                    seen_logic.add(key)
+
+        # Case 3: high/low threshold tracker initialized to restrictive constant
+        threshold_candidates: dict[str, tuple[int, float]] = {}
+        for stmt in node.body:
+            numeric_value = _numeric_literal_value(stmt.value) if isinstance(stmt, ast.Assign) else None
+            if (
+                isinstance(stmt, ast.Assign)
+                and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)
+                and numeric_value is not None
+            ):
+                name = stmt.targets[0].id
+                value = float(numeric_value)
+                threshold_candidates[name] = (stmt.lineno, value)
+
+        if threshold_candidates:
+            high_hints = {"high", "highest", "top", "best", "max", "greatest"}
+            low_hints = {"low", "lowest", "bottom", "worst", "min", "smallest"}
+
+            for child in walk[ast.If]:
+                if not isinstance(child.test, ast.Compare):
+                    continue
+                if len(child.test.ops) != 1 or len(child.test.comparators) != 1:
+                    continue
+                comparator = child.test.comparators[0]
+                if not isinstance(comparator, ast.Name):
+                    continue
 
-                        lower_tracker = tracker_name.lower()
-                        op = child.test.ops[0]
-                        is_suspicious_min = "min" in lower_tracker and isinstance(op, ast.Lt)
-                        is_suspicious_max = "max" in lower_tracker and isinstance(op, ast.Gt)
-                        if not (is_suspicious_min or is_suspicious_max):
-                            continue
+                tracker = comparator.id
+                if tracker not in threshold_candidates:
+                    continue
 
-                        msg = "min/max tracker initialized to constant; use first iterable element instead"
-                        key = (init_candidates[tracker_name], msg)
-                        if key not in seen_logic:
-                            failures.append({
-                                "file": relative_path,
-                                "line_number": init_candidates[tracker_name],
-                                "bug_type": "LOGIC",
-                                "message": msg,
-                            })
-                            seen_logic.add(key)
+                tracker_lower = tracker.lower()
+                op = child.test.ops[0]
+                init_line, init_value = threshold_candidates[tracker]
 
-                # Case 3: high/low threshold tracker initialized to restrictive constant
-                threshold_candidates: dict[str, tuple[int, float]] = {}
-                for stmt in node.body:
-                    numeric_value = numeric_literal_value(stmt.value) if isinstance(stmt, ast.Assign) else None
+                # Ensure this if-body updates the same tracker
+                updates_tracker = False
+                for body_stmt in child.body:
                     if (
-                        isinstance(stmt, ast.Assign)
-                        and len(stmt.targets) == 1
-                        and isinstance(stmt.targets[0], ast.Name)
-                        and numeric_value is not None
+                        isinstance(body_stmt, ast.Assign)
+                        and len(body_stmt.targets) == 1
+                        and isinstance(body_stmt.targets[0], ast.Name)
+                        and body_stmt.targets[0].id == tracker
                     ):
-                        name = stmt.targets[0].id
-                        value = float(numeric_value)
-                        threshold_candidates[name] = (stmt.lineno, value)
-
-                if threshold_candidates:
-                    high_hints = {"high", "highest", "top", "best", "max", "greatest"}
-                    low_hints = {"low", "lowest", "bottom", "worst", "min", "smallest"}
-
-                    for child in ast.walk(node):
-                        if not isinstance(child, ast.If) or not isinstance(child.test, ast.Compare):
-                            continue
-                        if len(child.test.ops) != 1 or len(child.test.comparators) != 1:
-                            continue
-                        comparator = child.test.comparators[0]
-                        if not isinstance(comparator, ast.Name):
-                            continue
+                        updates_tracker = True
+                        break
+                if not updates_tracker:
+                    continue
 
-                        tracker = comparator.id
-                        if tracker not in threshold_candidates:
-                            continue
+                is_high_tracker = any(h in tracker_lower for h in high_hints)
+                is_low_tracker = any(h in tracker_lower for h in low_hints)
 
-                        tracker_lower = tracker.lower()
-                        op = child.test.ops[0]
-                        init_line, init_value = threshold_candidates[tracker]
-
-                        # Ensure this if-body updates the same tracker
-                        updates_tracker = False
-                        for body_stmt in child.body:
-                            if (
-                                isinstance(body_stmt, ast.Assign)
-                                and len(body_stmt.targets) == 1
-                                and isinstance(body_stmt.targets[0], ast.Name)
-                                and body_stmt.targets[0].id == tracker
-                            ):
-                                updates_tracker = True
-                                break
-                        if not updates_tracker:
-                            continue
+                if is_high_tracker and isinstance(op, ast.Gt) and init_value > 0:
+                    msg = "threshold tracker initialized too high for '>' selection"
+                    key = (init_line, msg)
+                    if key not in seen_logic:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": init_line,
+                            "bug_type": "LOGIC",
+                            "message": msg,
+                        })
+                        seen_logic.add(key)
+                elif is_low_tracker and isinstance(op, ast.Lt) and init_value < 0:
+                    msg = "threshold tracker initialized too low for '<' selection"
+                    key = (init_line, msg)
+                    if key not in seen_logic:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": init_line,
+                            "bug_type": "LOGIC",
+                            "message": msg,
+                        })
+                        seen_logic.add(key)
 
-                        is_high_tracker = any(h in tracker_lower for h in high_hints)
-                        is_low_tracker = any(h in tracker_lower for h in low_hints)
-
-                        if is_high_tracker and isinstance(op, ast.Gt) and init_value > 0:
-                            msg = "threshold tracker initialized too high for '>' selection"
-                            key = (init_line, msg)
-                            if key not in seen_logic:
-                                failures.append({
-                                    "file": relative_path,
-                                    "line_number": init_line,
-                                    "bug_type": "LOGIC",
-                                    "message": msg,
-                                })
-                                seen_logic.add(key)
-                        elif is_low_tracker and isinstance(op, ast.Lt) and init_value < 0:
-                            msg = "threshold tracker initialized too low for '<' selection"
-                            key = (init_line, msg)
-                            if key not in seen_logic:
-                                failures.append({
-                                    "file": relative_path,
-                                    "line_number": init_line,
-                                    "bug_type": "LOGIC",
-                                    "message": msg,
-                                })
-                                seen_logic.add(key)
-
-                # Case 4: selection variable assignment likely belongs inside threshold if-block
-                selector_initialized: set[str] = set()
-                for stmt in node.body:
-                    if (
-                        isinstance(stmt, ast.Assign)
-                        and len(stmt.targets) == 1
-                        and isinstance(stmt.targets[0], ast.Name)
-                        and isinstance(stmt.value, ast.Constant)
-                    ):
-                        if stmt.value.value is None or stmt.value.value == "":
-                            selector_initialized.add(stmt.targets[0].id)
+        # Case 4: selection variable assignment likely belongs inside threshold if-block
+        selector_initialized: set[str] = set()
+        for stmt in node.body:
+            if (
+                isinstance(stmt, ast.Assign)
+                and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)
+                and isinstance(stmt.value, ast.Constant)
+            ):
+                if stmt.value.value is None or stmt.value.value == "":
+                    selector_initialized.add(stmt.targets[0].id)
+
+        if selector_initialized:
+            for child in walk[ast.For]:
+                if not isinstance(child.target, ast.Name):
+                    continue
 
-                if selector_initialized:
-                    for child in ast.walk(node):
-                        if not isinstance(child, ast.For):
-                            continue
-                        if not isinstance(child.target, ast.Name):
-                            continue
+                loop_var = child.target.id
+                for idx, loop_stmt in enumerate(child.body):
+                    if not isinstance(loop_stmt, ast.If):
+                        continue
+                    if not isinstance(loop_stmt.test, ast.Compare):
+                        continue
+                    if len(loop_stmt.test.ops) != 1 or len(loop_stmt.test.comparators) != 1:
+                        continue
+                    if not isinstance(loop_stmt.test.comparators[0], ast.Name):
+                        continue
 
-                        loop_var = child.target.id
-                        for idx, loop_stmt in enumerate(child.body):
-                            if not isinstance(loop_stmt, ast.If):
-                                continue
-                            if not isinstance(loop_stmt.test, ast.Compare):
-                                continue
-                            if len(loop_stmt.test.ops) != 1 or len(loop_stmt.test.comparators) != 1:
-                                continue
-                            if not isinstance(loop_stmt.test.comparators[0], ast.Name):
-                                continue
+                    threshold_name = loop_stmt.test.comparators[0].id
+                    if threshold_name not in threshold_candidates:
+                        continue
 
-                            threshold_name = loop_stmt.test.comparators[0].id
-                            if threshold_name not in threshold_candidates:
-                                continue
+                    # Ensure if-body updates threshold variable
+                    threshold_updated = any(
+                        isinstance(s, ast.Assign)
+                        and len(s.targets) == 1
+                        and isinstance(s.targets[0], ast.Name)
+                        and s.targets[0].id == threshold_name
+                        for s in loop_stmt.body
+                    )
+                    if not threshold_updated:
+                        continue
 
-                            # Ensure if-body updates threshold variable
-                            threshold_updated = any(
-                                isinstance(s, ast.Assign)
-                                and len(s.targets) == 1
-                                and isinstance(s.targets[0], ast.Name)
-                                and s.targets[0].id == threshold_name
-                                for s in loop_stmt.body
-                            )
-                            if not threshold_updated:
+                    # Look at subsequent statements in loop body; if they assign selected var = loop_var,
+                    # it's likely intended to be inside the if-block.
+                    for trailing_stmt in child.body[idx + 1:]:
+                        if (
+                            isinstance(trailing_stmt, ast.Assign)
+                            and len(trailing_stmt.targets) == 1
+                            and isinstance(trailing_stmt.targets[0], ast.Name)
+                        ):
+                            selected_name = trailing_stmt.targets[0].id
+                            if selected_name not in selector_initialized:
                                 continue
 
-                            # Look at subsequent statements in loop body; if they assign selected var = loop_var,
-                            # it's likely intended to be inside the if-block.
-                            for trailing_stmt in child.body[idx + 1:]:
-                                if (
-                                    isinstance(trailing_stmt, ast.Assign)
-                                    and len(trailing_stmt.targets) == 1
-                                    and isinstance(trailing_stmt.targets[0], ast.Name)
-                                ):
-                                    selected_name = trailing_stmt.targets[0].id
-                                    if selected_name not in selector_initialized:
-                                        continue
-
-                                    selected_from_loop = False
-                                    if isinstance(trailing_stmt.value, ast.Name):
-                                        selected_from_loop = trailing_stmt.value.id == loop_var
-                                    elif isinstance(trailing_stmt.value, ast.Subscript):
-                                        # Supports patterns like selected = arr[i]
-                                        slice_node = trailing_stmt.value.slice
-                                        if isinstance(slice_node, ast.Name):
-                                            selected_from_loop = slice_node.id == loop_var
-                                        elif hasattr(ast, "Index") and isinstance(slice_node, ast.Index) and isinstance(slice_node.value, ast.Name):
-                                            selected_from_loop = slice_node.value.id == loop_var
-
-                                    if selected_from_loop:
-                                        msg = "selection update likely belongs inside threshold if-block"
-                                        key = (trailing_stmt.lineno, msg)
-                                        if key not in seen_logic:
-                                            failures.append({
-                                                "file": relative_path,
-                                                "line_number": trailing_stmt.lineno,
-                                                "bug_type": "LOGIC",
-                                                "message": msg,
-                                            })
-                                            seen_logic.add(key)
-
-                # Case 5: sum accumulator divided by constant (likely average divisor bug)
-                loop_iterable_name: str | None = None
-                loop_item_name: str | None = None
-                accumulator_name: str | None = None
-                accumulator_initialized = False
-
-                for stmt in node.body:
-                    numeric_value = numeric_literal_value(stmt.value) if isinstance(stmt, ast.Assign) else None
-                    if (
-                        isinstance(stmt, ast.Assign)
-                        and len(stmt.targets) == 1
-                        and isinstance(stmt.targets[0], ast.Name)
-                        and numeric_value is not None
-                    ):
-                        accumulator_name = stmt.targets[0].id
-                        accumulator_initialized = True
-
-                    if isinstance(stmt, ast.For) and isinstance(stmt.target, ast.Name) and isinstance(stmt.iter, ast.Name):
-                        loop_item_name = stmt.target.id
-                        loop_iterable_name = stmt.iter.id
-
-                        if accumulator_name:
-                            for inner in stmt.body:
-                                if (
-                                    isinstance(inner, ast.AugAssign)
-                                    and isinstance(inner.op, ast.Add)
-                                    and isinstance(inner.target, ast.Name)
-                                    and isinstance(inner.value, ast.Name)
-                                    and inner.target.id == accumulator_name
-                                    and inner.value.id == loop_item_name
-                                ):
-                                    break
-                            else:
-                                loop_iterable_name = None
-                                loop_item_name = None
-
-                if accumulator_initialized and accumulator_name and loop_iterable_name:
-                    for stmt in node.body:
-                        if not isinstance(stmt, ast.Return) or not isinstance(stmt.value, ast.BinOp):
-                            continue
-                        if not isinstance(stmt.value.op, ast.Div):
-                            continue
-                        if not isinstance(stmt.value.left, ast.Name) or stmt.value.left.id != accumulator_name:
-                            continue
-
-                        right = stmt.value.right
-                        if isinstance(right, ast.Constant) and isinstance(right.value, (int, float)):
-                            # Avoid reporting when divisor is explicitly len(iterable)
-                            msg = "average calculation divides by constant; use len(iterable)"
-                            key = (stmt.lineno, msg)
-                            if key not in seen_logic:
-                                failures.append({
-                                    "file": relative_path,
-                                    "line_number": stmt.lineno,
-                                    "bug_type": "LOGIC",
-                                    "message": msg,
-                                })
-                                seen_logic.add(key)
-
-                # Case 6: remove/decrement operation using += instead of -=
-                remove_hints = {"remove", "decrease", "decrement", "subtract", "deduct", "consume", "reduce"}
-                quantity_hints = {"qty", "quantity", "count", "amount", "num", "number", "delta"}
-                func_name_lower = node.name.lower()
-                is_remove_context = any(hint in func_name_lower for hint in remove_hints)
-                param_names = {arg.arg.lower() for arg in node.args.args}
-                has_quantity_param = any(any(h in p for h in quantity_hints) for p in param_names)
-
-                if is_remove_context and has_quantity_param:
-                    for child in ast.walk(node):
-                        if not isinstance(child, ast.AugAssign) or not isinstance(child.op, ast.Add):
-                            continue
-                        if isinstance(child.value, ast.Name):
-                            value_name_lower = child.value.id.lower()
-                            if any(h in value_name_lower for h in quantity_hints):
-                                msg = "removal operation uses '+='; expected '-='"
-                                key = (child.lineno, msg)
+                            selected_from_loop = False
+                            if isinstance(trailing_stmt.value, ast.Name):
+                                selected_from_loop = trailing_stmt.value.id == loop_var
+                            elif isinstance(trailing_stmt.value, ast.Subscript):
+                                # Supports patterns like selected = arr[i]
+                                slice_node = trailing_stmt.value.slice
+                                if isinstance(slice_node, ast.Name):
+                                    selected_from_loop = slice_node.id == loop_var
+                                elif hasattr(ast, "Index") and isinstance(slice_node, ast.Index) and isinstance(slice_node.value, ast.Name):
+                                    selected_from_loop = slice_node.value.id == loop_var
+
+                            if selected_from_loop:
+                                msg = "selection update likely belongs inside threshold if-block"
+                                key = (trailing_stmt.lineno, msg)
                                 if key not in seen_logic:
                                     failures.append({
                                         "file": relative_path,
-                                        "line_number": child.lineno,
+                                        "line_number": trailing_stmt.lineno,
                                         "bug_type": "LOGIC",
                                         "message": msg,
                                     })
                                     seen_logic.add(key)
 
-                # Case 7: deposit/add/increase operation using -= instead of +=
-                add_hints = {"add", "deposit", "increase", "credit", "topup", "top_up", "append"}
-                is_add_context = any(hint in func_name_lower for hint in add_hints)
-                if is_add_context and has_quantity_param:
-                    for child in ast.walk(node):
-                        if not isinstance(child, ast.AugAssign) or not isinstance(child.op, ast.Sub):
-                            continue
-                        if isinstance(child.value, ast.Name):
-                            value_name_lower = child.value.id.lower()
-                            if any(h in value_name_lower for h in quantity_hints):
-                                msg = "addition operation uses '-='; expected '+='"
-                                key = (child.lineno, msg)
-                                if key not in seen_logic:
-                                    failures.append({
-                                        "file": relative_path,
-                                        "line_number": child.lineno,
-                                        "bug_type": "LOGIC",
-                                        "message": msg,
-                                    })
-                                    seen_logic.add(key)
+        # Case 5: sum accumulator divided by constant (likely average divisor bug)
+        loop_iterable_name: str | None = None
+        loop_item_name: str | None = None
+        accumulator_name: str | None = None
+        accumulator_initialized = False
+
+        for stmt in node.body:
+            numeric_value = _numeric_literal_value(stmt.value) if isinstance(stmt, ast.Assign) else None
+            if (
+                isinstance(stmt, ast.Assign)
+                and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)
+                and numeric_value is not None
+            ):
+                accumulator_name = stmt.targets[0].id
+                accumulator_initialized = True
+
+            if isinstance(stmt, ast.For) and isinstance(stmt.target, ast.Name) and isinstance(stmt.iter, ast.Name):
+                loop_item_name = stmt.target.id
+                loop_iterable_name = stmt.iter.id
+
+                if accumulator_name:
+                    for inner in stmt.body:
+                        if (
+                            isinstance(inner, ast.AugAssign)
+                            and isinstance(inner.op, ast.Add)
+                            and isinstance(inner.target, ast.Name)
+                            and isinstance(inner.value, ast.Name)
+                            and inner.target.id == accumulator_name
+                            and inner.value.id == loop_item_name
+                        ):
+                            break
+                    else:
+                        loop_iterable_name = None
+                        loop_item_name = None
 
-                # Case 8: return inside accumulation loop (premature exit)
-                for child in ast.walk(node):
-                    if not isinstance(child, ast.For):
-                        continue
+        if accumulator_initialized and accumulator_name and loop_iterable_name:
+            for stmt in node.body:
+                if not isinstance(stmt, ast.Return) or not isinstance(stmt.value, ast.BinOp):
+                    continue
+                if not isinstance(stmt.value.op, ast.Div):
+                    continue
+                if not isinstance(stmt.value.left, ast.Name) or stmt.value.left.id != accumulator_name:
+                    continue
+
+                right = stmt.value.right
+                if isinstance(right, ast.Constant) and isinstance(right.value, (int, float)):
+                    # Avoid reporting when divisor is explicitly len(iterable)
+                    msg = "average calculation divides by constant; use len(iterable)"
+                    key = (stmt.lineno, msg)
+                    if key not in seen_logic:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": stmt.lineno,
+                            "bug_type": "LOGIC",
+                            "message": msg,
+                        })
+                        seen_logic.add(key)
+
+        # Case 6: remove/decrement operation using += instead of -=
+        remove_hints = {"remove", "decrease", "decrement", "subtract", "deduct", "consume", "reduce"}
+        quantity_hints = {"qty", "quantity", "count", "amount", "num", "number", "delta"}
+        func_name_lower = node.name.lower()
+        is_remove_context = any(hint in func_name_lower for hint in remove_hints)
+        param_names = {arg.arg.lower() for arg in node.args.args}
+        has_quantity_param = any(any(h in p for h in quantity_hints) for p in param_names)
+
+        if is_remove_context and has_quantity_param:
+            for child in walk[ast.AugAssign]:
+                if not isinstance(child.op, ast.Add):
+                    continue
+                if isinstance(child.value, ast.Name):
+                    value_name_lower = child.value.id.lower()
+                    if any(h in value_name_lower for h in quantity_hints):
+                        msg = "removal operation uses '+='; expected '-='"
+                        key = (child.lineno, msg)
+                        if key not in seen_logic:
+                            failures.append({
+                                "file": relative_path,
+                                "line_number": child.lineno,
+                                "bug_type": "LOGIC",
+                                "message": msg,
+                            })
+                            seen_logic.add(key)
 
-                    accumulator_names: set[str] = set()
-                    for loop_stmt in child.body:
-                        if (
-                            isinstance(loop_stmt, ast.AugAssign)
-                            and isinstance(loop_stmt.op, ast.Add)
-                            and isinstance(loop_stmt.target, ast.Name)
-                        ):
-                            accumulator_names.add(loop_stmt.target.id)
+        # Case 7: deposit/add/increase operation using -= instead of +=
+        add_hints = {"add", "deposit", "increase", "credit", "topup", "top_up", "append"}
+        is_add_context = any(hint in func_name_lower for hint in add_hints)
+        if is_add_context and has_quantity_param:
+            for child in walk[ast.AugAssign]:
+                if not isinstance(child.op, ast.Sub):
+                    continue
+                if isinstance(child.value, ast.Name):
+                    value_name_lower = child.value.id.lower()
+                    if any(h in value_name_lower for h in quantity_hints):
+                        msg = "addition operation uses '-='; expected '+='"
+                        key = (child.lineno, msg)
+                        if key not in seen_logic:
+                            failures.append({
+                                "file": relative_path,
+                                "line_number": child.lineno,
+                                "bug_type": "LOGIC",
+                                "message": msg,
+                            })
+                            seen_logic.add(key)
 
-                    if not accumulator_names:
-                        continue
+        # Case 8: return inside accumulation loop (premature exit)
+        for child in walk[ast.For]:
+            accumulator_names: set[str] = set()
+            for loop_stmt in child.body:
+                if (
+                    isinstance(loop_stmt, ast.AugAssign)
+                    and isinstance(loop_stmt.op, ast.Add)
+                    and isinstance(loop_stmt.target, ast.Name)
+                ):
+                    accumulator_names.add(loop_stmt.target.id)
+
+            if not accumulator_names:
+                continue
 
-                    for loop_stmt in child.body:
-                        if not isinstance(loop_stmt, ast.Return):
-                            continue
-                        if isinstance(loop_stmt.value, ast.Name) and loop_stmt.value.id in accumulator_names:
-                            msg = "return inside accumulation loop causes premature exit"
-                            key = (loop_stmt.lineno, msg)
-                            if key not in seen_logic:
-                                failures.append({
-                                    "file": relative_path,
-                                    "line_number": loop_stmt.lineno,
-                                    "bug_type": "LOGIC",
-                                    "message": msg,
-                                })
-                                seen_logic.add(key)
-        except SyntaxError:
-            pass
-        
-        return failures
+            for loop_stmt in child.body:
+                if not isinstance(loop_stmt, ast.Return):
+                    continue
+                if isinstance(loop_stmt.value, ast.Name) and loop_stmt.value.id in accumulator_names:
+                    msg = "return inside accumulation loop causes premature exit"
+                    key = (loop_stmt.lineno, msg)
+                    if key not in seen_logic:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": loop_stmt.lineno,
+                            "bug_type": "LOGIC",
+                            "message": msg,
+                        })
+                        seen_logic.add(key)
 
-    @staticmethod
-    def _find_type_errors(source: str, relative_path: str) -> list[dict[str, Any]]:
-        """Find potential type errors: string concatenation with non-strings, int+str."""
+class TypeErrorRule(PythonRule):
+    """Potential type errors: string concatenation with non-strings, int+str, argument mismatches."""
+
+    node_types = (ast.Assign, ast.FunctionDef, ast.Return, ast.BinOp, ast.AugAssign, ast.Call)
+
+    def start(self, ctx: FileContext) -> None:
+        # Declarations and operations are evaluated after the traversal in ast.walk order,
+        # so inferred types see exactly the assignments that precede them
+        self.declarations: list[tuple[NodeKey, ast.AST]] = []
+        self.returns: dict[ast.FunctionDef, list[tuple[NodeKey, ast.Return]]] = {}
+        self.operations: list[tuple[NodeKey, ast.AST]] = []
+
+    def visit(self, node: ast.AST, ctx: FileContext) -> None:
+        if isinstance(node, ast.Assign):
+            self.declarations.append((ctx.key, node))
+        elif isinstance(node, ast.FunctionDef):
+            self.declarations.append((ctx.key, node))
+            self.returns[node] = []
+        elif isinstance(node, ast.Return):
+            for function in ctx.function_stack:
+                self.returns[function].append((ctx.key, node))
+        elif isinstance(node, (ast.BinOp, ast.AugAssign)):
+            if isinstance(node.op, ast.Add):
+                self.operations.append((ctx.key, node))
+        elif isinstance(node.func, ast.Name):
+            self.operations.append((ctx.key, node))
+
+    def finish(self, ctx: FileContext) -> list[dict[str, Any]]:
         failures: list[dict[str, Any]] = []
-        lines = source.splitlines()
+        relative_path = ctx.relative_path
+        lines = ctx.lines
         variable_types: dict[str, str] = {}  # name -> inferred type
         function_param_types: dict[str, list[str | None]] = {}
         function_return_types: dict[str, str | None] = {}
         seen_type_errors: set[tuple[int, str]] = set()
+        returns = {function: _in_walk_order(items) for function, items in self.returns.items()}
 
         def infer_expr_type(node: ast.AST) -> str | None:
             if isinstance(node, ast.Constant):
@@ -716,181 +969,172 @@ class StaticAnalyzerService:
                     return "float"
 
             return None
-
         # AST pass for stronger type checking (works when file has valid syntax)
-        try:
-            tree = ast.parse(source)
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Assign):
-                    value_type = infer_expr_type(node.value)
-                    if value_type:
-                        for target in node.targets:
-                            if isinstance(target, ast.Name):
-                                variable_types[target.id] = value_type
-
-                    # Detect mixed list literal types (e.g., [32, "38", 28])
-                    if isinstance(node.value, ast.List):
-                        has_num = False
-                        has_str = False
-                        for elt in node.value.elts:
-                            if isinstance(elt, ast.Constant):
-                                if isinstance(elt.value, (int, float)):
-                                    has_num = True
-                                elif isinstance(elt.value, str):
-                                    has_str = True
-                        if has_num and has_str:
-                            key = (node.lineno, "mixed numeric and string values in collection")
-                            if key not in seen_type_errors:
-                                failures.append({
-                                    "file": relative_path,
-                                    "line_number": node.lineno,
-                                    "bug_type": "TYPE_ERROR",
-                                    "message": "mixed numeric and string values in collection",
-                                })
-                                seen_type_errors.add(key)
-
-                elif isinstance(node, ast.FunctionDef):
-                    param_types: list[str | None] = []
-                    for arg in node.args.args:
-                        annotation = arg.annotation
-                        expected_type: str | None = None
-                        if isinstance(annotation, ast.Name):
-                            if annotation.id in {"int", "str"}:
-                                expected_type = annotation.id
-                        param_types.append(expected_type)
-                    function_param_types[node.name] = param_types
-
-                    return_type: str | None = None
-                    if isinstance(node.returns, ast.Name) and node.returns.id in {"int", "str", "float"}:
-                        return_type = node.returns.id
-
-                    # Infer return type when annotation is absent
-                    if return_type is None:
-                        inferred_returns: set[str] = set()
-                        for child in ast.walk(node):
-                            if not isinstance(child, ast.Return) or child.value is None:
-                                continue
-                            if isinstance(child.value, ast.Constant):
-                                if isinstance(child.value.value, str):
-                                    inferred_returns.add("str")
-                                elif isinstance(child.value.value, float):
-                                    inferred_returns.add("float")
-                                elif isinstance(child.value.value, int):
-                                    inferred_returns.add("int")
-                            elif isinstance(child.value, ast.BinOp):
-                                if isinstance(child.value.op, ast.Div):
-                                    inferred_returns.add("float")
-                                elif isinstance(child.value.op, ast.Add):
-                                    expr_type = infer_expr_type(child.value)
-                                    if expr_type in {"int", "float", "str"}:
-                                        inferred_returns.add(expr_type)
-                            elif isinstance(child.value, ast.Call):
-                                if isinstance(child.value.func, ast.Name) and child.value.func.id == "str":
-                                    inferred_returns.add("str")
-
-                        if len(inferred_returns) == 1:
-                            return_type = next(iter(inferred_returns))
-                    function_return_types[node.name] = return_type
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
-                    left_type = infer_expr_type(node.left)
-                    right_type = infer_expr_type(node.right)
-                    left_is_str_lit = isinstance(node.left, ast.Constant) and isinstance(node.left.value, str)
-                    right_is_str_lit = isinstance(node.right, ast.Constant) and isinstance(node.right.value, str)
-                    numeric_attr_hints = {
-                        "balance", "total", "count", "amount", "qty", "quantity",
-                        "number", "num", "size", "length", "price", "cost", "score",
-                    }
-                    left_is_numeric_attr = isinstance(node.left, ast.Attribute) and node.left.attr.lower() in numeric_attr_hints
-                    right_is_numeric_attr = isinstance(node.right, ast.Attribute) and node.right.attr.lower() in numeric_attr_hints
-
-                    if ({left_type, right_type} == {"str", "int"}) or ({left_type, right_type} == {"str", "float"}):
-                        key = (node.lineno, "type mismatch: cannot add incompatible types")
-                        if key not in seen_type_errors:
-                            failures.append({
-                                "file": relative_path,
-                                "line_number": node.lineno,
-                                "bug_type": "TYPE_ERROR",
-                                "message": "type mismatch: cannot add incompatible types",
-                            })
-                            seen_type_errors.add(key)
-                    elif (left_is_str_lit and isinstance(node.right, ast.Call) and right_type != "str") or (
-                        right_is_str_lit and isinstance(node.left, ast.Call) and left_type != "str"
-                    ):
-                        key = (node.lineno, "type mismatch: string concatenation with non-string expression")
+        for node in _in_walk_order(self.declarations):
+            if isinstance(node, ast.Assign):
+                value_type = infer_expr_type(node.value)
+                if value_type:
+                    for target in node.targets:
+                        if isinstance(target, ast.Name):
+                            variable_types[target.id] = value_type
+
+                # Detect mixed list literal types (e.g., [32, "38", 28])
+                if isinstance(node.value, ast.List):
+                    has_num = False
+                    has_str = False
+                    for elt in node.value.elts:
+                        if isinstance(elt, ast.Constant):
+                            if isinstance(elt.value, (int, float)):
+                                has_num = True
+                            elif isinstance(elt.value, str):
+                                has_str = True
+                    if has_num and has_str:
+                        key = (node.lineno, "mixed numeric and string values in collection")
                         if key not in seen_type_errors:
                             failures.append({
                                 "file": relative_path,
                                 "line_number": node.lineno,
                                 "bug_type": "TYPE_ERROR",
-                                "message": "type mismatch: string concatenation with non-string expression",
+                                "message": "mixed numeric and string values in collection",
                             })
                             seen_type_errors.add(key)
-                    elif (left_is_str_lit and right_type in {"int", "float"}) or (right_is_str_lit and left_type in {"int", "float"}):
-                        key = (node.lineno, "type mismatch: string concatenation with non-string expression")
+
+            elif isinstance(node, ast.FunctionDef):
+                param_types: list[str | None] = []
+                for arg in node.args.args:
+                    annotation = arg.annotation
+                    expected_type: str | None = None
+                    if isinstance(annotation, ast.Name):
+                        if annotation.id in {"int", "str"}:
+                            expected_type = annotation.id
+                    param_types.append(expected_type)
+                function_param_types[node.name] = param_types
+
+                return_type: str | None = None
+                if isinstance(node.returns, ast.Name) and node.returns.id in {"int", "str", "float"}:
+                    return_type = node.returns.id
+
+                # Infer return type when annotation is absent
+                if return_type is None:
+                    inferred_returns: set[str] = set()
+                    for child in returns[node]:
+                        if child.value is None:
+                            continue
+                        if isinstance(child.value, ast.Constant):
+                            if isinstance(child.value.value, str):
+                                inferred_returns.add("str")
+                            elif isinstance(child.value.value, float):
+                                inferred_returns.add("float")
+                            elif isinstance(child.value.value, int):
+                                inferred_returns.add("int")
+                        elif isinstance(child.value, ast.BinOp):
+                            if isinstance(child.value.op, ast.Div):
+                                inferred_returns.add("float")
+                            elif isinstance(child.value.op, ast.Add):
+                                expr_type = infer_expr_type(child.value)
+                                if expr_type in {"int", "float", "str"}:
+                                    inferred_returns.add(expr_type)
+                        elif isinstance(child.value, ast.Call):
+                            if isinstance(child.value.func, ast.Name) and child.value.func.id == "str":
+                                inferred_returns.add("str")
+
+                    if len(inferred_returns) == 1:
+                        return_type = next(iter(inferred_returns))
+                function_return_types[node.name] = return_type
+        for node in _in_walk_order(self.operations):
+            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+                left_type = infer_expr_type(node.left)
+                right_type = infer_expr_type(node.right)
+                left_is_str_lit = isinstance(node.left, ast.Constant) and isinstance(node.left.value, str)
+                right_is_str_lit = isinstance(node.right, ast.Constant) and isinstance(node.right.value, str)
+                numeric_attr_hints = {
+                    "balance", "total", "count", "amount", "qty", "quantity",
+                    "number", "num", "size", "length", "price", "cost", "score",
+                }
+                left_is_numeric_attr = isinstance(node.left, ast.Attribute) and node.left.attr.lower() in numeric_attr_hints
+                right_is_numeric_attr = isinstance(node.right, ast.Attribute) and node.right.attr.lower() in numeric_attr_hints
+
+                if ({left_type, right_type} == {"str", "int"}) or ({left_type, right_type} == {"str", "float"}):
+                    key = (node.lineno, "type mismatch: cannot add incompatible types")
+                    if key not in seen_type_errors:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": node.lineno,
+                            "bug_type": "TYPE_ERROR",
+                            "message": "type mismatch: cannot add incompatible types",
+                        })
+                        seen_type_errors.add(key)
+                elif (left_is_str_lit and isinstance(node.right, ast.Call) and right_type != "str") or (
+                    right_is_str_lit and isinstance(node.left, ast.Call) and left_type != "str"
+                ):
+                    key = (node.lineno, "type mismatch: string concatenation with non-string expression")
+                    if key not in seen_type_errors:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": node.lineno,
+                            "bug_type": "TYPE_ERROR",
+                            "message": "type mismatch: string concatenation with non-string expression",
+                        })
+                        seen_type_errors.add(key)
+                elif (left_is_str_lit and right_type in {"int", "float"}) or (right_is_str_lit and left_type in {"int", "float"}):
+                    key = (node.lineno, "type mismatch: string concatenation with non-string expression")
+                    if key not in seen_type_errors:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": node.lineno,
+                            "bug_type": "TYPE_ERROR",
+                            "message": "type mismatch: string concatenation with non-string expression",
+                        })
+                        seen_type_errors.add(key)
+                elif (left_is_str_lit and right_is_numeric_attr) or (right_is_str_lit and left_is_numeric_attr):
+                    key = (node.lineno, "type mismatch: string concatenation with non-string expression")
+                    if key not in seen_type_errors:
+                        failures.append({
+                            "file": relative_path,
+                            "line_number": node.lineno,
+                            "bug_type": "TYPE_ERROR",
+                            "message": "type mismatch: string concatenation with non-string expression",
+                        })
+                        seen_type_errors.add(key)
+
+            elif isinstance(node, ast.AugAssign) and isinstance(node.op, ast.Add):
+                if isinstance(node.target, ast.Name):
+                    left_type = variable_types.get(node.target.id)
+                    right_type = infer_expr_type(node.value)
+                    if left_type == "str" and right_type != "str":
+                        key = (node.lineno, "type mismatch: cannot add incompatible types")
                         if key not in seen_type_errors:
                             failures.append({
                                 "file": relative_path,
                                 "line_number": node.lineno,
                                 "bug_type": "TYPE_ERROR",
-                                "message": "type mismatch: string concatenation with non-string expression",
+                                "message": "type mismatch: cannot add incompatible types",
                             })
                             seen_type_errors.add(key)
-                    elif (left_is_str_lit and right_is_numeric_attr) or (right_is_str_lit and left_is_numeric_attr):
-                        key = (node.lineno, "type mismatch: string concatenation with non-string expression")
+
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+                expected_params = function_param_types.get(node.func.id)
+                if not expected_params:
+                    continue
+
+                for i, arg_node in enumerate(node.args):
+                    if i >= len(expected_params):
+                        break
+                    expected_type = expected_params[i]
+                    if expected_type is None:
+                        continue
+                    actual_type = infer_expr_type(arg_node)
+                    if actual_type and actual_type != expected_type:
+                        msg = f"argument type mismatch: expected {expected_type} but got {actual_type}"
+                        key = (node.lineno, msg)
                         if key not in seen_type_errors:
                             failures.append({
                                 "file": relative_path,
                                 "line_number": node.lineno,
                                 "bug_type": "TYPE_ERROR",
-                                "message": "type mismatch: string concatenation with non-string expression",
+                                "message": msg,
                             })
                             seen_type_errors.add(key)
-
-                elif isinstance(node, ast.AugAssign) and isinstance(node.op, ast.Add):
-                    if isinstance(node.target, ast.Name):
-                        left_type = variable_types.get(node.target.id)
-                        right_type = infer_expr_type(node.value)
-                        if left_type == "str" and right_type != "str":
-                            key = (node.lineno, "type mismatch: cannot add incompatible types")
-                            if key not in seen_type_errors:
-                                failures.append({
-                                    "file": relative_path,
-                                    "line_number": node.lineno,
-                                    "bug_type": "TYPE_ERROR",
-                                    "message": "type mismatch: cannot add incompatible types",
-                                })
-                                seen_type_errors.add(key)
-
-                elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                    expected_params = function_param_types.get(node.func.id)
-                    if not expected_params:
-                        continue
-
-                    for i, arg_node in enumerate(node.args):
-                        if i >= len(expected_params):
-                            break
-                        expected_type = expected_params[i]
-                        if expected_type is None:
-                            continue
-                        actual_type = infer_expr_type(arg_node)
-                        if actual_type and actual_type != expected_type:
-                            msg = f"argument type mismatch: expected {expected_type} but got {actual_type}"
-                            key = (node.lineno, msg)
-                            if key not in seen_type_errors:
-                                failures.append({
-                                    "file": relative_path,
-                                    "line_number": node.lineno,
-                                    "bug_type": "TYPE_ERROR",
-                                    "message": msg,
-                                })
-                                seen_type_errors.add(key)
-
-        except SyntaxError:
-            pass
-        
         # First pass: collect all variable type assignments  
         for line_no, line in enumerate(lines, start=1):
             code = line.split("#", 1)[0].strip()
@@ -1015,180 +1259,4 @@ class StaticAnalyzerService:
                         "message": "type mismatch: cannot add incompatible types",
                     })
                     seen_type_errors.add(key)
-        
-        return failures
-
-    @staticmethod
-    def _find_unused_imports_in_source(source: str, relative_path: str) -> list[dict[str, Any]]:
-        """Find unused imports when AST parsing fails (syntax errors)."""
-        import_bindings: list[tuple[str, int]] = []
-        lines = source.splitlines()
-
-        for line_no, raw_line in enumerate(lines, start=1):
-            stripped = raw_line.strip()
-            if not stripped or stripped.startswith("#"):
-                continue
-            if not stripped.startswith(("import ", "from ")):
-                continue
-            if stripped.endswith("(") or stripped.endswith("\\"):
-                continue
-
-            try:
-                import_tree = ast.parse(stripped)
-            except SyntaxError:
-                continue
-
-            for node in ast.walk(import_tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        bound_name = alias.asname or alias.name.split(".")[0]
-                        if bound_name and not bound_name.startswith("_"):
-                            import_bindings.append((bound_name, line_no))
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module == "__future__":
-                        continue
-                    for alias in node.names:
-                        if alias.name == "*":
-                            continue
-                        bound_name = alias.asname or alias.name
-                        if bound_name and not bound_name.startswith("_"):
-                            import_bindings.append((bound_name, line_no))
-
-        if not import_bindings:
-            return []
-
-        source_without_comments = "\n".join(line.split("#", 1)[0] for line in lines)
-
-        failures: list[dict[str, Any]] = []
-        seen: set[tuple[str, int]] = set()
-        for name, line_no in import_bindings:
-            occurrences = len(re.findall(rf"\b{re.escape(name)}\b", source_without_comments))
-            if occurrences <= 1 and (name, line_no) not in seen:
-                failures.append({
-                    "file": relative_path,
-                    "line_number": line_no,
-                    "bug_type": "LINTING",
-                    "message": "unused import",
-                })
-                seen.add((name, line_no))
-
-        return failures
-
-    @staticmethod
-    def _find_indentation_errors(source: str, relative_path: str) -> list[dict[str, Any]]:
-        """Find indentation errors: inconsistent indentation, missing indentation after colons, mixed tabs/spaces."""
-        failures: list[dict[str, Any]] = []
-        lines = source.splitlines()
-        
-        # Track which blocks expect indentation
-        expects_indent = False
-        expect_indent_after_line = -1
-        
-        for line_no, line in enumerate(lines, start=1):
-            # Empty lines and comments don't affect indentation
-            if not line.strip() or line.strip().startswith("#"):
-                continue
-            
-            code = line.split("#", 1)[0].rstrip()  # Remove comments for analysis
-            current_indent = len(line) - len(line.lstrip())
-            current_indent_char = '\t' if line and line[0] == '\t' else ' '
-            
-            # Check for mixed tabs and spaces (bad indentation)
-            if '\t' in line[:current_indent] and ' ' in line[:current_indent]:
-                failures.append({
-                    "file": relative_path,
-                    "line_number": line_no,
-                    "bug_type": "INDENTATION",
-                    "message": "mixed tabs and spaces in indentation",
-                })
-            
-            # Check for lines that should be indented
-            if line_no > 1:
-                prev_line = lines[line_no - 2].split("#", 1)[0].rstrip()
-                prev_stripped = prev_line.strip()
-                prev_indent = len(prev_line) - len(prev_line.lstrip())
-                
-                # If previous line ends with colon, this line should be more indented
-                if prev_stripped.endswith(":"):
-                    expected_indent = prev_indent + 4
-                    
-                    # If this is not an empty line or a dedent, it should be indented
-                    # Allow dedenting (return, pass, elif, else, except, finally)
-                    is_dedent = any(
-                        code.strip().startswith(kw)
-                        for kw in ['return', 'pass', 'break', 'continue', 'elif', 'else', 'except', 'finally', 'def', 'class']
-                    )
-                    
-                    if not is_dedent and current_indent < expected_indent and code:
-                        failures.append({
-                            "file": relative_path,
-                            "line_number": line_no,
-                            "bug_type": "INDENTATION",
-                            "message": f"expected indentation of {expected_indent} spaces, got {current_indent}",
-                        })
-
-        return failures
-
-    @staticmethod
-    def _find_import_errors(source: str, relative_path: str) -> list[dict[str, Any]]:
-        """Find import-related errors: invalid imports, imports after code, circular imports."""
-        failures: list[dict[str, Any]] = []
-        lines = source.splitlines()
-        
-        import_ended = False
-        
-        for line_no, line in enumerate(lines, start=1):
-            stripped = line.strip()
-            
-            # Skip empty lines and comments
-            if not stripped or stripped.startswith("#"):
-                continue
-            
-            # Check if this is an import line
-            is_import = stripped.startswith(("import ", "from "))
-            
-            # Track if we've seen non-import code
-            if not is_import and not stripped.startswith("#"):
-                import_ended = True
-            
-            # Imports should come before other code (except docstrings and __future__)
-            if is_import and import_ended and line_no > 1:
-                prev_non_comment = None
-                for prev_line_no in range(line_no - 1, 0, -1):
-                    prev_stripped = lines[prev_line_no - 1].strip()
-                    if prev_stripped and not prev_stripped.startswith("#"):
-                        prev_non_comment = prev_stripped
-                        break
-                
-                # Only report if not following __future__ imports
-                if prev_non_comment and not prev_non_comment.startswith("from __future__"):
-                    failures.append({
-                        "file": relative_path,
-                        "line_number": line_no,
-                        "bug_type": "IMPORT",
-                        "message": "import statement should appear at the top of the file",
-                    })
-            
-            # Check for invalid import patterns
-            if is_import:
-                # Check for empty imports or syntax errors
-                if stripped == "import" or stripped == "from":
-                    failures.append({
-                        "file": relative_path,
-                        "line_number": line_no,
-                        "bug_type": "IMPORT",
-                        "message": "incomplete import statement",
-                    })
-                
-                # Check for 'from X import' with empty import list
-                if stripped.startswith("from ") and " import " in stripped:
-                    import_part = stripped.split(" import ", 1)[1].strip()
-                    if not import_part:
-                        failures.append({
-                            "file": relative_path,
-                            "line_number": line_no,
-                            "bug_type": "IMPORT",
-                            "message": "empty import list",
-                        })
-
         return failures
@@ -6,17 +6,93 @@ from pathlib import Path
 from typing import Any
 
 
+# Statements are module constants so sqlite3's per-connection statement cache reuses them
+UPSERT_RUN_SQL = """
+    INSERT INTO runs(run_id, payload, updated_at, fix_count, event_count, version)
+    VALUES(?, ?, ?, ?, ?, ?)
+    ON CONFLICT(run_id)
+    DO UPDATE SET
+        payload = excluded.payload,
+        updated_at = excluded.updated_at,
+        fix_count = excluded.fix_count,
+        event_count = excluded.event_count,
+        version = excluded.version
+"""
+SELECT_RUN_SQL = "SELECT payload, version FROM runs WHERE run_id = ?"
+SELECT_VERSION_SQL = "SELECT version FROM runs WHERE run_id = ?"
+SELECT_COUNTS_SQL = "SELECT fix_count, event_count, version FROM runs WHERE run_id = ?"
+INSERT_FIX_SQL = """
+    INSERT INTO fixes(run_id, seq, file, bug_type, line_number, commit_message, status, expected_output, version)
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+FIX_COLUMNS = "file, bug_type, line_number, commit_message, status, expected_output"
+SELECT_FIXES_SQL = f"SELECT {FIX_COLUMNS} FROM fixes WHERE run_id = ? ORDER BY seq"
+# Without INDEXED BY the planner prefers the primary key: no sort, but it reads all of the run's rows
+SELECT_FIXES_SINCE_SQL = f"""
+    SELECT {FIX_COLUMNS} FROM fixes INDEXED BY idx_fixes_run_version
+    WHERE run_id = ? AND version > ? ORDER BY seq
+"""
+INSERT_EVENT_SQL = """
+    INSERT INTO timeline_events(run_id, seq, iteration, retry_limit, status, timestamp, version)
+    VALUES(?, ?, ?, ?, ?, ?, ?)
+"""
+EVENT_COLUMNS = "iteration, retry_limit, status, timestamp"
+SELECT_EVENTS_SQL = f"SELECT {EVENT_COLUMNS} FROM timeline_events WHERE run_id = ? ORDER BY seq"
+SELECT_EVENTS_SINCE_SQL = f"""
+    SELECT {EVENT_COLUMNS} FROM timeline_events INDEXED BY idx_timeline_events_run_version
+    WHERE run_id = ? AND version > ? ORDER BY seq
+"""
+
+FIX_FIELDS = ("file", "bug_type", "line_number", "commit_message", "status", "expected_output")
+EVENT_FIELDS = ("iteration", "retry_limit", "status", "timestamp")
+
+SCHEMA_VERSION = 3
+
+
 class StorageService:
-    def __init__(self) -> None:
+    """
+    SQLite-backed run storage.
+
+    Run scalars live in `runs`; `fixes` and `timeline` entries are append-only rows in
+    `fixes` and `timeline_events`, so an update writes only the entries added since the
+    last one instead of re-serializing the whole history.
+
+    Every write bumps the run's `version`, and each row records the version that added
+    it, so readers can skip unchanged runs and fetch only rows newer than a version.
+
+    Each thread keeps one long-lived connection. The database runs in WAL mode with
+    `synchronous=NORMAL`, so readers (API polling) never wait on the runner's writes;
+    the lock only serializes writers.
+    """
+
+    def __init__(self, data_dir: Path | None = None) -> None:
         root = Path(__file__).resolve().parents[2]
-        self.data_dir = root / "data"
+        self.data_dir = data_dir or root / "data"
         self.data_dir.mkdir(exist_ok=True)
         self.db_path = self.data_dir / "runs.db"
         self.lock = threading.Lock()
+        self._local = threading.local()
         self._init_db()
 
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=128)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        conn = self._connection()
+        with self.lock, conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS runs (
@@ -26,31 +102,158 @@ class StorageService:
                 )
                 """
             )
-            conn.commit()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._migrate_to_normalized(conn)
+            if version < 2:
+                self._migrate_to_versioned(conn)
+            if version < 3:
+                self._index_versions(conn)
+            if version < 1:
+                self._split_legacy_payloads(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
-    def upsert_run(self, run_id: str, payload: dict[str, Any]) -> None:
+    @staticmethod
+    def _migrate_to_normalized(conn: sqlite3.Connection) -> None:
+        """Create the append-only `fixes` and `timeline_events` tables."""
+        conn.execute("ALTER TABLE runs ADD COLUMN fix_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute("ALTER TABLE runs ADD COLUMN event_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fixes (
+                run_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                file TEXT NOT NULL,
+                bug_type TEXT NOT NULL,
+                line_number INTEGER NOT NULL,
+                commit_message TEXT NOT NULL,
+                status TEXT NOT NULL,
+                expected_output TEXT NOT NULL,
+                PRIMARY KEY (run_id, seq)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS timeline_events (
+                run_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                iteration INTEGER NOT NULL,
+                retry_limit INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                PRIMARY KEY (run_id, seq)
+            ) WITHOUT ROWID
+            """
+        )
+
+    @staticmethod
+    def _migrate_to_versioned(conn: sqlite3.Connection) -> None:
+        """Add the per-run version counter; existing rows all belong to version 1."""
+        for table in ("runs", "fixes", "timeline_events"):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute(f"UPDATE {table} SET version = 1")
+
+    @staticmethod
+    def _index_versions(conn: sqlite3.Connection) -> None:
+        """Index rows by (run_id, version) for `since_version` reads."""
+        conn.execute("DROP INDEX IF EXISTS idx_fixes_run_status")
+        for table in ("fixes", "timeline_events"):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_run_version ON {table}(run_id, version)")
+
+    @staticmethod
+    def _split_legacy_payloads(conn: sqlite3.Connection) -> None:
+        """Move fixes and timeline out of legacy JSON payloads into the append-only tables."""
+        legacy_rows = conn.execute("SELECT run_id, payload FROM runs").fetchall()
+        for run_id, serialized in legacy_rows:
+            payload = json.loads(serialized)
+            fixes = payload.pop("fixes", None) or []
+            timeline = payload.pop("timeline", None) or []
+            StorageService._append_rows(conn, run_id, fixes, timeline, 0, 0)
+            conn.execute(
+                "UPDATE runs SET payload = ?, fix_count = ?, event_count = ? WHERE run_id = ?",
+                (json.dumps(payload), len(fixes), len(timeline), run_id),
+            )
+
+    @staticmethod
+    def _append_rows(
+        conn: sqlite3.Connection,
+        run_id: str,
+        new_fixes: list[dict[str, Any]],
+        new_events: list[dict[str, Any]],
+        fix_start: int,
+        event_start: int,
+        version: int = 1,
+    ) -> None:
+        """Insert new fix/timeline rows; sequence numbers continue from the stored counts."""
+        conn.executemany(
+            INSERT_FIX_SQL,
+            [
+                (run_id, seq, *(fix.get(field) for field in FIX_FIELDS), version)
+                for seq, fix in enumerate(new_fixes, start=fix_start)
+            ],
+        )
+        conn.executemany(
+            INSERT_EVENT_SQL,
+            [
+                (run_id, seq, *(event.get(field) for field in EVENT_FIELDS), version)
+                for seq, event in enumerate(new_events, start=event_start)
+            ],
+        )
+
+    def upsert_run(self, run_id: str, payload: dict[str, Any]) -> int:
+        """Store a run state and return its new version.
+
+        Scalars are rewritten; `fixes` and `timeline` are append-only, so only entries
+        beyond those already stored are inserted.
+        """
+        fixes = payload.get("fixes") or []
+        timeline = payload.get("timeline") or []
+        scalars = {key: value for key, value in payload.items() if key not in ("fixes", "timeline", "version")}
+        now = datetime.now(UTC).isoformat()
+        serialized = json.dumps(scalars)
+        conn = self._connection()
         with self.lock:
-            now = datetime.now(UTC).isoformat()
-            serialized = json.dumps(payload)
-            with sqlite3.connect(self.db_path) as conn:
+            with conn:
+                stored = conn.execute(SELECT_COUNTS_SQL, (run_id,)).fetchone()
+                fix_start, event_start, version = stored if stored else (0, 0, 0)
+                version += 1
+                self._append_rows(
+                    conn, run_id, fixes[fix_start:], timeline[event_start:], fix_start, event_start, version
+                )
                 conn.execute(
-                    """
-                    INSERT INTO runs(run_id, payload, updated_at)
-                    VALUES(?, ?, ?)
-                    ON CONFLICT(run_id)
-                    DO UPDATE SET payload = excluded.payload, updated_at = excluded.updated_at
-                    """,
-                    (run_id, serialized, now),
+                    UPSERT_RUN_SQL,
+                    (run_id, serialized, now, max(fix_start, len(fixes)), max(event_start, len(timeline)), version),
                 )
-                conn.commit()
+        return version
 
-    def get_run(self, run_id: str) -> dict[str, Any]:
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.execute("SELECT payload FROM runs WHERE run_id = ?", (run_id,))
-            row = cur.fetchone()
+    def get_run_version(self, run_id: str) -> int:
+        """Current version of a run without loading it."""
+        row = self._connection().execute(SELECT_VERSION_SQL, (run_id,)).fetchone()
         if row is None:
             raise KeyError(f"Run {run_id} not found")
-        return json.loads(row[0])
+        return row[0]
+
+    def get_run(self, run_id: str, since_version: int | None = None) -> dict[str, Any]:
+        """Load a run. With `since_version`, only fixes/timeline rows added after that version are included."""
+        conn = self._connection()
+        if since_version:
+            fixes_sql, events_sql, params = SELECT_FIXES_SINCE_SQL, SELECT_EVENTS_SINCE_SQL, (run_id, since_version)
+        else:
+            fixes_sql, events_sql, params = SELECT_FIXES_SQL, SELECT_EVENTS_SQL, (run_id,)
+        # One read transaction so the run row and its child rows come from the same snapshot
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute(SELECT_RUN_SQL, (run_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Run {run_id} not found")
+            run = json.loads(row[0])
+            run["version"] = row[1]
+            run["fixes"] = [dict(zip(FIX_FIELDS, fix)) for fix in conn.execute(fixes_sql, params)]
+            run["timeline"] = [dict(zip(EVENT_FIELDS, event)) for event in conn.execute(events_sql, params)]
+        finally:
+            conn.commit()
+        return run
 
     def write_results_file(self, run_id: str, payload: dict[str, Any]) -> str:
         results_path = self.data_dir / f"results_{run_id}.json"
@@ -1,9 +1,37 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from pathlib import Path
+import asyncio
+import json
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
 
+from app.services.dependency_cache import DependencyCacheService
 from app.services.docker_executor import DockerExecutor, ContainerExecResult
+from app.services.output_stream import LineCallback, run_streaming
+from app.services.repository_index import RepositoryIndex
+from app.services.sandbox_pool import PooledSandbox, SandboxPool
+from app.services.test_impact import TestImpactService
+from app.services.test_sharding import (
+    TestDurationStore,
+    listed_test_files,
+    plan_shards,
+    report_durations,
+    shard_capacity,
+    suite_key,
+)
+
+# Reports requested from pytest and Jest; kept out of commits via .git/info/exclude
+REPORT_DIR = ".test-reports"
+# Reports Maven Surefire and Gradle write by default (root project and one level of modules)
+DEFAULT_REPORT_GLOBS = (
+    "target/surefire-reports/TEST-*.xml",
+    "*/target/surefire-reports/TEST-*.xml",
+    "build/test-results/*/TEST-*.xml",
+    "*/build/test-results/*/TEST-*.xml",
+)
 
 
 @dataclass
@@ -12,6 +40,14 @@ class TestRunResult:
     return_code: int
     stdout: str
     stderr: str
+    # Machine-readable reports (JUnit XML, Jest JSON) written by this execution
+    reports: list[Path] = field(default_factory=list)
+    # Stopped by the output callback before the suite finished (fail fast)
+    stopped_early: bool = False
+    # Test files run when only tests affected by a change were selected; None for the full suite
+    selected_tests: list[str] | None = None
+    # Sandboxes (or host processes) the test files were split across
+    shards: int = 1
 
     @property
     def output(self) -> str:
@@ -19,32 +55,255 @@ class TestRunResult:
 
 
 class TestEngineService:
-    def __init__(self, use_docker: bool = True):
+    def __init__(
+        self,
+        use_docker: bool = True,
+        shard_count: int | None = None,
+        sandbox_cpus: float | None = None,
+        sandbox_memory_bytes: int | None = None,
+        durations: TestDurationStore | None = None,
+    ):
         """
         Initialize test engine.
         
         Args:
             use_docker: If True, runs tests in Docker containers (RECOMMENDED for security).
                        If False, runs tests directly on host (only for local development).
+            shard_count: Most sandboxes one test execution is split across (`TEST_SHARDS`, 1 = no sharding).
+            sandbox_cpus: CPU limit per sandbox (`SANDBOX_CPUS`, 0 = unlimited).
+            sandbox_memory_bytes: Memory limit per sandbox (`SANDBOX_MEMORY_BYTES`, 0 = unlimited).
         """
         self.use_docker = use_docker
         self.executor = DockerExecutor() if use_docker else None
+        self.sandbox_pool = SandboxPool(self.executor) if self.executor else None
+        self.dependency_cache = DependencyCacheService()
+        self.test_impact = TestImpactService()
+        self.shard_count = shard_count if shard_count is not None else int(os.getenv("TEST_SHARDS", "1"))
+        self.sandbox_cpus = sandbox_cpus if sandbox_cpus is not None else float(os.getenv("SANDBOX_CPUS", "0"))
+        self.sandbox_memory_bytes = (
+            sandbox_memory_bytes
+            if sandbox_memory_bytes is not None
+            else int(os.getenv("SANDBOX_MEMORY_BYTES", "0"))
+        )
+        # Per-test-file durations are only tracked when they are used to balance shards
+        self.durations = durations or (TestDurationStore() if self.shard_count > 1 else None)
 
-    def detect_command(self, repo_path: Path) -> list[str]:
+    def detect_command(self, repo_path: Path, index: RepositoryIndex | None = None) -> list[str]:
         """Detect the test command based on project structure."""
-        if (repo_path / "pytest.ini").exists() or (repo_path / "pyproject.toml").exists() or any(repo_path.rglob("test_*.py")):
+        index = index or RepositoryIndex.build(repo_path)
+        if index.has_root_file("pytest.ini", "pyproject.toml") or index.has_file_matching("test_*.py"):
             return ["python", "-m", "pytest", "-q"]
-        if (repo_path / "package.json").exists():
+        if index.has_root_file("package.json"):
             return ["npm", "test", "--", "--watch=false"]
-        if (repo_path / "pom.xml").exists():
+        if index.has_root_file("pom.xml"):
             return ["mvn", "-B", "test"]
-        if (repo_path / "build.gradle").exists() or (repo_path / "build.gradle.kts").exists():
+        if index.has_root_file("build.gradle", "build.gradle.kts"):
             return ["gradle", "test"]
-        if any(repo_path.glob("*.sln")) or any(repo_path.rglob("*.csproj")):
+        if index.has_file_matching("*.sln", root_only=True) or index.has_file_matching("*.csproj"):
             return ["dotnet", "test"]
         return ["python", "-m", "pytest", "-q"]
 
-    def run_tests(self, repo_path: Path, timeout_seconds: int = 240) -> TestRunResult:
+    def report_args(self, repo_path: Path, command: list[str], shard: int | None = None) -> list[str]:
+        """Arguments that make the test framework write a structured report into REPORT_DIR.
+
+        Maven and Gradle write JUnit XML without being asked; npm only gets flags when the
+        test script runs Jest, since other runners reject them. Each shard writes its own report.
+        """
+        suffix = "" if shard is None else f"-shard{shard}"
+        if "pytest" in command:
+            return [f"--junitxml={REPORT_DIR}/pytest{suffix}.xml", "-o", "junit_family=xunit1"]
+        if command[0] == "npm" and self._uses_jest(repo_path):
+            return ["--json", f"--outputFile={REPORT_DIR}/jest{suffix}.json"]
+        return []
+
+    @staticmethod
+    def _uses_jest(repo_path: Path) -> bool:
+        try:
+            package = json.loads((repo_path / "package.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        test_script = str((package.get("scripts") or {}).get("test", ""))
+        return "jest" in test_script or "react-scripts test" in test_script
+
+    @staticmethod
+    def prepare_reports(repo_path: Path) -> None:
+        """Create an empty REPORT_DIR and keep it out of `git add -A`."""
+        report_dir = repo_path / REPORT_DIR
+        report_dir.mkdir(exist_ok=True)
+        for stale in report_dir.iterdir():
+            if stale.is_file():
+                stale.unlink(missing_ok=True)
+        exclude = repo_path / ".git" / "info" / "exclude"
+        if not exclude.parent.is_dir():
+            return
+        entry = f"/{REPORT_DIR}/"
+        existing = exclude.read_text(encoding="utf-8") if exclude.exists() else ""
+        if entry not in existing.splitlines():
+            with open(exclude, "a", encoding="utf-8") as file:
+                file.write(("" if not existing or existing.endswith("\n") else "\n") + entry + "\n")
+
+    @staticmethod
+    def collect_reports(repo_path: Path, since: float) -> list[Path]:
+        """Report files written at or after `since` (epoch seconds); older ones are stale."""
+        candidates = [*(repo_path / REPORT_DIR).glob("*.xml"), *(repo_path / REPORT_DIR).glob("*.json")]
+        for pattern in DEFAULT_REPORT_GLOBS:
+            candidates.extend(repo_path.glob(pattern))
+        reports = []
+        for path in candidates:
+            try:
+                if path.stat().st_mtime >= since:
+                    reports.append(path)
+            except OSError:
+                continue
+        return sorted(reports)
+
+    def select_tests(
+        self,
+        repo_path: Path,
+        command: list[str],
+        index: RepositoryIndex,
+        changed_files: set[str],
+    ) -> tuple[list[str], list[str]] | None:
+        """(test files, selection arguments) for the tests affected by `changed_files`.
+
+        None when the full suite must run: the impact of a change can't be determined, or
+        the framework has no way to run a subset.
+        """
+        tests = self.test_impact.build(index).affected_tests(changed_files)
+        if tests is None:
+            return None
+        test_files = [item.relative_path for item in tests]
+        args = self._selection_args(repo_path, command, test_files)
+        if args is None:
+            return None
+        return test_files, args
+
+    def _selection_args(self, repo_path: Path, command: list[str], test_files: list[str]) -> list[str] | None:
+        if "pytest" in command:
+            return list(test_files)
+        if command[0] == "npm" and self._uses_jest(repo_path):
+            return ["--runTestsByPath", *test_files]
+        stems = [PurePosixPath(file).stem for file in test_files]
+        if command[0] == "mvn":
+            return ["-Dtest=" + ",".join(stems), "-Dsurefire.failIfNoSpecifiedTests=false"]
+        if command[0] == "gradle":
+            return [arg for stem in stems for arg in ("--tests", f"*{stem}")]
+        return None
+
+    def list_tests_command(self, repo_path: Path, command: list[str]) -> list[str] | None:
+        """Command that makes the framework print the test files it would run, if it can be sharded.
+
+        Only pytest and Jest are sharded: Maven and Gradle builds write into the shared
+        workspace and can't run concurrently.
+        """
+        if "pytest" in command:
+            return [*command, "--collect-only"]
+        if command[0] == "npm" and self._uses_jest(repo_path):
+            return [*command, "--listTests"]
+        return None
+
+    def shard_commands(
+        self,
+        repo_path: Path,
+        test_files: list[str],
+        index: RepositoryIndex | None = None,
+        max_failures: int = 0,
+    ) -> list[list[str]] | None:
+        """One test command per shard, or None when this execution isn't sharded.
+
+        `test_files` must come from the framework's own collection (or an explicit selection):
+        a shard runs only the files it is given. Files are balanced by their historical durations.
+        """
+        shard_count = self._shard_limit()
+        if shard_count <= 1:
+            return None
+        index = index or RepositoryIndex.build(repo_path)
+        command = self.detect_command(repo_path, index)
+        if self.list_tests_command(repo_path, command) is None:
+            return None
+        durations = self.durations.get(suite_key(repo_path)) if self.durations else {}
+        shards = plan_shards(test_files, durations, shard_count)
+        if len(shards) <= 1:
+            return None
+        return [
+            [
+                *command,
+                *self.report_args(repo_path, command, shard=position),
+                *self._failure_args(command, max_failures),
+                *self._selection_args(repo_path, command, files),
+            ]
+            for position, files in enumerate(shards, start=1)
+        ]
+
+    def _shard_limit(self) -> int:
+        return min(self.shard_count, shard_capacity(self.sandbox_cpus, self.sandbox_memory_bytes))
+
+    async def _collect_test_files(
+        self,
+        repo_path: Path,
+        index: RepositoryIndex | None,
+        timeout_seconds: int,
+        use_docker: bool,
+    ) -> list[str] | None:
+        """Test files the framework itself collects; None if it can't list them (run unsharded)."""
+        index = index or await asyncio.to_thread(RepositoryIndex.build, repo_path)
+        command = self.list_tests_command(repo_path, self.detect_command(repo_path, index))
+        if command is None:
+            return None
+        try:
+            if use_docker:
+                sandbox = await self._prepared_sandbox(repo_path, command)
+                result = await self._run_in_sandbox_async(sandbox, command, timeout_seconds)
+            else:
+                result = await self._run_tests_directly_async(repo_path, command, timeout_seconds)
+        except subprocess.TimeoutExpired:
+            return None
+        # Collection errors must surface in a full, unsharded run
+        if result.return_code != 0:
+            return None
+        return listed_test_files(result.stdout, index)
+
+    def record_durations(self, repo_path: Path, reports: list[Path], index: RepositoryIndex | None = None) -> None:
+        """Store per-test-file durations from this execution's reports for future shard plans."""
+        if self.durations is None or not reports:
+            return
+        durations = report_durations(reports, index or RepositoryIndex.build(repo_path))
+        self.durations.record(suite_key(repo_path), durations)
+
+    @staticmethod
+    def _failure_args(command: list[str], max_failures: int) -> list[str]:
+        if max_failures and "pytest" in command:
+            # pytest prints failure details only once the session ends, so live output can't stop it early
+            return [f"--maxfail={max_failures}"]
+        return []
+
+    def _command_with_reports(
+        self,
+        repo_path: Path,
+        index: RepositoryIndex | None,
+        max_failures: int = 0,
+        changed_files: set[str] | None = None,
+    ) -> tuple[list[str], list[str] | None]:
+        """The test command with report (and selection) arguments, and the selected test files."""
+        command = self.detect_command(repo_path, index)
+        selection = None
+        if changed_files is not None:
+            selection = self.select_tests(repo_path, command, index or RepositoryIndex.build(repo_path), changed_files)
+        extra = self.report_args(repo_path, command)
+        if extra:
+            self.prepare_reports(repo_path)
+        extra.extend(self._failure_args(command, max_failures))
+        if selection is None:
+            return [*command, *extra], None
+        selected_tests, selection_args = selection
+        return [*command, *extra, *selection_args], selected_tests
+
+    def run_tests(
+        self,
+        repo_path: Path,
+        timeout_seconds: int = 240,
+        index: RepositoryIndex | None = None,
+    ) -> TestRunResult:
         """
         Run tests in sandboxed Docker container (RECOMMENDED) or directly on host.
         
@@ -52,48 +311,235 @@ class TestEngineService:
         - Tests run in isolated container
         - No access to host filesystem (except /workspace mount)
         - No network access unless configured
-        - Automatic cleanup after execution
+        - Containers are pooled per workspace and discarded when the run ends
         """
-        command = self.detect_command(repo_path)
-        
+        command, _ = self._command_with_reports(repo_path, index)
+        # Whole seconds: some filesystems store coarse modification times
+        started = int(time.time())
+
         if self.use_docker and self.executor and self.executor.healthcheck():
-            return self._run_tests_in_docker(repo_path, command, timeout_seconds)
+            result = self._run_tests_in_docker(repo_path, command, timeout_seconds)
         else:
             # Fallback to direct execution if Docker unavailable
-            return self._run_tests_directly(repo_path, command, timeout_seconds)
+            result = self._run_tests_directly(repo_path, command, timeout_seconds)
+        result.reports = self.collect_reports(repo_path, started)
+        return result
+
+    async def run_tests_async(
+        self,
+        repo_path: Path,
+        timeout_seconds: int = 240,
+        index: RepositoryIndex | None = None,
+        on_line: LineCallback | None = None,
+        max_failures: int = 0,
+        changed_files: set[str] | None = None,
+    ) -> TestRunResult:
+        """Non-blocking `run_tests` for the async runner: test processes run as asyncio subprocesses.
+
+        Output lines are passed to `on_line` (stream name, line) while the tests run; when it
+        returns True the test command is stopped and the output so far is returned.
+        `max_failures` asks frameworks that support it to stop after that many failures.
+        With `changed_files` only the tests that import a changed file run, if they can be
+        determined; no test runs at all when none is affected.
+        With `shard_count` above 1 the test files the framework collects are split across
+        concurrent sandboxes.
+        """
+        command, selected_tests = await asyncio.to_thread(
+            self._command_with_reports, repo_path, index, max_failures, changed_files
+        )
+        if selected_tests == []:
+            return TestRunResult(command=[], return_code=0, stdout="", stderr="", selected_tests=[])
+        use_docker = bool(self.use_docker and self.executor and await self.executor.healthcheck_async())
+        shards = None
+        if self._shard_limit() > 1:
+            test_files = selected_tests
+            if test_files is None:
+                test_files = await self._collect_test_files(repo_path, index, timeout_seconds, use_docker)
+            if test_files:
+                shards = await asyncio.to_thread(self.shard_commands, repo_path, test_files, index, max_failures)
+        started = int(time.time())
+
+        if shards:
+            result = await self._run_shards_async(repo_path, command, shards, timeout_seconds, on_line, use_docker)
+        elif use_docker:
+            result = await self._run_tests_in_docker_async(repo_path, command, timeout_seconds, on_line)
+        else:
+            result = await self._run_tests_directly_async(repo_path, command, timeout_seconds, on_line)
+        result.reports = await asyncio.to_thread(self.collect_reports, repo_path, started)
+        result.selected_tests = selected_tests
+        if not result.stopped_early:
+            await asyncio.to_thread(self.record_durations, repo_path, result.reports, index)
+        return result
+
+    async def _run_shards_async(
+        self,
+        repo_path: Path,
+        command: list[str],
+        shards: list[list[str]],
+        timeout_seconds: int,
+        on_line: LineCallback | None,
+        use_docker: bool,
+    ) -> TestRunResult:
+        """Run shard commands concurrently and merge them into one result for the failure parser."""
+        stopped = False
+
+        def shard_callback(position: int) -> LineCallback | None:
+            if on_line is None:
+                return None
+
+            def shard_on_line(stream: str, line: str) -> bool:
+                # Streams are named per shard so line parsers keep one state per shard; once
+                # the callback asks to stop, every shard stops at its next line
+                nonlocal stopped
+                if not stopped and on_line(f"shard{position}:{stream}", line):
+                    stopped = True
+                return stopped
+
+            return shard_on_line
+
+        if use_docker:
+            # Sandboxes share dependency cache volumes, so installs run one after another
+            sandboxes: list[PooledSandbox] = []
+            try:
+                for _ in shards:
+                    sandboxes.append(await self._prepared_sandbox(repo_path, command))
+            except BaseException:
+                for sandbox in sandboxes:
+                    await asyncio.to_thread(self.sandbox_pool.release, sandbox)
+                raise
+            runs = [
+                self._run_in_sandbox_async(sandbox, shard, timeout_seconds, shard_callback(position))
+                for position, (sandbox, shard) in enumerate(zip(sandboxes, shards), start=1)
+            ]
+        else:
+            runs = [
+                self._run_tests_directly_async(repo_path, shard, timeout_seconds, shard_callback(position))
+                for position, shard in enumerate(shards, start=1)
+            ]
+        results = await asyncio.gather(*runs)
+
+        return TestRunResult(
+            command=command,
+            return_code=next((result.return_code for result in results if result.return_code != 0), 0),
+            stdout="\n".join(result.stdout for result in results if result.stdout),
+            stderr="\n".join(result.stderr for result in results if result.stderr),
+            stopped_early=any(result.stopped_early for result in results),
+            shards=len(shards),
+        )
+
+    def _sandbox_args(self, repo_path: Path) -> tuple[str, ...]:
+        # Cache volumes are keyed by lockfile hash, so an unchanged lockfile mounts a populated environment
+        args = list(self.dependency_cache.docker_args(repo_path))
+        if self.sandbox_cpus:
+            args += ["--cpus", str(self.sandbox_cpus)]
+        if self.sandbox_memory_bytes:
+            args += ["--memory", str(self.sandbox_memory_bytes)]
+        return tuple(args)
 
     def _run_tests_in_docker(self, repo_path: Path, command: list[str], timeout_seconds: int) -> TestRunResult:
-        """Execute tests in a Docker container (SANDBOXED)."""
-        container_id = None
+        """Execute tests in a pooled Docker container (SANDBOXED)."""
+        sandbox = self.sandbox_pool.acquire(repo_path, create_args=self._sandbox_args(repo_path))
+        reusable = True
         try:
-            container_id = self.executor.create_container(repo_path)
-            
-            # Install dependencies if needed
-            if "pytest" in command:
-                self.executor.execute_in_container(container_id, ["pip", "install", "-q", "pytest"])
-            elif "npm" in command:
-                self.executor.execute_in_container(container_id, ["npm", "install", "--silent"])
-            
+            self._install_dependencies(repo_path, sandbox, command)
+
             # Run tests
             result: ContainerExecResult = self.executor.execute_in_container(
-                container_id,
+                sandbox.container_id,
                 command,
                 timeout=timeout_seconds
             )
-            
+            # A timed-out command may leave processes behind; don't reuse that container
+            reusable = result.return_code != 124
+
             return TestRunResult(
                 command=command,
                 return_code=result.return_code,
                 stdout=result.stdout,
                 stderr=result.stderr,
             )
+        except Exception:
+            reusable = False
+            raise
         finally:
-            if container_id:
-                self.executor.stop_container(container_id)
+            self.sandbox_pool.release(sandbox, reusable=reusable)
+
+    def _install_dependencies(self, repo_path: Path, sandbox: PooledSandbox, command: list[str]) -> None:
+        """Install dependencies once per container; near no-ops when the cache volume is warm."""
+        if "pytest" in command:
+            step, install = "pytest", ["pip", "install", "-q", "pytest"]
+        elif "npm" in command:
+            step, install = "npm", self.dependency_cache.install_command(["npm", "install", "--silent"])
+        else:
+            return
+        if step in sandbox.prepared:
+            return
+        # Cache volumes are shared by concurrent sandboxes; one install writes to them at a time
+        with self.dependency_cache.install_lock(repo_path):
+            self.sandbox_pool.prepare(sandbox, step, install)
+
+    async def _run_tests_in_docker_async(
+        self,
+        repo_path: Path,
+        command: list[str],
+        timeout_seconds: int,
+        on_line: LineCallback | None = None,
+    ) -> TestRunResult:
+        """Async variant of `_run_tests_in_docker`; pool bookkeeping runs in a worker thread."""
+        sandbox = await self._prepared_sandbox(repo_path, command)
+        return await self._run_in_sandbox_async(sandbox, command, timeout_seconds, on_line)
+
+    async def _prepared_sandbox(self, repo_path: Path, command: list[str]) -> PooledSandbox:
+        """Acquire a sandbox with the test framework's dependencies installed."""
+        sandbox = await asyncio.to_thread(self.sandbox_pool.acquire, repo_path, None, self._sandbox_args(repo_path))
+        try:
+            await asyncio.to_thread(self._install_dependencies, repo_path, sandbox, command)
+        except BaseException:
+            await asyncio.to_thread(self.sandbox_pool.release, sandbox, False)
+            raise
+        return sandbox
+
+    async def _run_in_sandbox_async(
+        self,
+        sandbox: PooledSandbox,
+        command: list[str],
+        timeout_seconds: int,
+        on_line: LineCallback | None = None,
+    ) -> TestRunResult:
+        """Run a test command in an acquired sandbox and return the sandbox to the pool."""
+        reusable = True
+        try:
+            result = await self.executor.execute_in_container_async(
+                sandbox.container_id,
+                command,
+                timeout=timeout_seconds,
+                on_line=on_line,
+            )
+            # Killing `docker exec` doesn't stop the tests inside the container
+            reusable = result.return_code != 124 and not result.stopped_early
+
+            return TestRunResult(
+                command=command,
+                return_code=result.return_code,
+                stdout=result.stdout,
+                stderr=result.stderr,
+                stopped_early=result.stopped_early,
+            )
+        except BaseException:
+            # Includes cancellation, which can leave the test process running in the container
+            reusable = False
+            raise
+        finally:
+            await asyncio.to_thread(self.sandbox_pool.release, sandbox, reusable)
+
+    def release_workspace(self, repo_path: Path) -> None:
+        """Discard pooled sandboxes and cached imports of a workspace that is no longer used."""
+        self.test_impact.forget(repo_path)
+        if self.sandbox_pool:
+            self.sandbox_pool.release_workspace(repo_path)
 
     def _run_tests_directly(self, repo_path: Path, command: list[str], timeout_seconds: int) -> TestRunResult:
         """Execute tests directly on host (NOT SANDBOXED - use only for development)."""
-        import subprocess
         process = subprocess.run(
             command,
             cwd=repo_path,
@@ -108,3 +554,25 @@ class TestEngineService:
             stdout=process.stdout,
             stderr=process.stderr,
         )
+
+    async def _run_tests_directly_async(
+        self,
+        repo_path: Path,
+        command: list[str],
+        timeout_seconds: int,
+        on_line: LineCallback | None = None,
+    ) -> TestRunResult:
+        """Async variant of `_run_tests_directly` (NOT SANDBOXED).
+
+        Cancelling it (e.g. a speculative run that is no longer needed) kills the tests.
+        """
+        result = await run_streaming(command, timeout_seconds, on_line, cwd=repo_path)
+        if result.timed_out:
+            raise subprocess.TimeoutExpired(command, timeout_seconds)
+        return TestRunResult(
+            command=command,
+            return_code=result.return_code,
+            stdout=result.stdout,
+            stderr=result.stderr,
+            stopped_early=result.stopped_early,
+        )
@@ -0,0 +1,236 @@
+"""Maps changed files to the tests that depend on them, for affected-test selection."""
+
+from __future__ import annotations
+
+import ast
+import fnmatch
+import os
+import posixpath
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+from app.services.repository_index import IndexedFile, RepositoryIndex
+
+JAVA_PACKAGE_PATTERN = re.compile(r"^\s*package\s+([\w.]+)\s*;", re.MULTILINE)
+JAVA_IMPORT_PATTERN = re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)(\.\*)?\s*;", re.MULTILINE)
+# `import x from "..."`, `import "..."`, `export {x} from "..."`, `require("...")`, `import("...")`
+JS_IMPORT_PATTERN = re.compile(
+    r"""(?:\bimport\s*(?:[\w*{}\s,$]+\s*from\s*)?|\bexport\s*[\w*{}\s,$]*\s*from\s*"""
+    r"""|\brequire\s*\(\s*|\bimport\s*\(\s*)['"]([^'"]+)['"]"""
+)
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+# Files that affect tests without being imported by them: pytest fixtures and package
+# initializers, pytest and Jest configuration and setup files
+SUITE_FILE_PATTERNS = (
+    "conftest.py", "__init__.py", "pytest.ini", "tox.ini", "setup.cfg", "pyproject.toml",
+    "package.json", "jest.config.*", "jest.setup.*", "setupTests.*", "babel.config.*", ".babelrc",
+    "tsconfig*.json",
+)
+
+
+@dataclass
+class TestImpactIndex:
+    """
+    Reverse dependency graph of a workspace: for each file, the files that import it.
+
+    Built from Python `import` statements (AST), Java `package`/`import` declarations and
+    JS/TS `import`/`require` specifiers. Resolution over-approximates when a name is
+    ambiguous, so a selection may include extra tests but never misses a resolvable one.
+    """
+
+    index: RepositoryIndex
+    dependents: dict[str, set[str]] = field(default_factory=dict)
+
+    def affected_tests(self, changed_files: set[str]) -> list[IndexedFile] | None:
+        """Tests that import any changed file, directly or transitively.
+
+        None means the impact can't be determined and the whole suite should run: a
+        changed file is not in the index (deleted, renamed, or in an ignored directory), is a
+        manifest or non-source file, or is one of `SUITE_FILE_PATTERNS`.
+        """
+        by_path = {item.relative_path: item for item in self.index.files}
+        for changed in changed_files:
+            item = by_path.get(changed)
+            if item is None or item.language is None or item.role == "manifest":
+                return None
+            name = changed.rsplit("/", 1)[-1]
+            if any(fnmatch.fnmatchcase(name, pattern) for pattern in SUITE_FILE_PATTERNS):
+                return None
+
+        seen = set(changed_files)
+        queue = deque(changed_files)
+        while queue:
+            for dependent in self.dependents.get(queue.popleft(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    queue.append(dependent)
+        return [item for item in self.index.tests() if item.relative_path in seen]
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    """Unresolved imports of one file; cached per file and resolved on every build."""
+
+    # Python: absolute dotted names; Java: imported names (`a.b.C`, `a.b.*`); JS/TS: specifiers
+    names: tuple[str, ...] = ()
+    # Java package declaration
+    package: str = ""
+
+
+class TestImpactService:
+    """Builds `TestImpactIndex`es, re-reading only files whose size or mtime changed."""
+
+    def __init__(self) -> None:
+        # Absolute path -> (mtime_ns, size, imports)
+        self._imports: dict[str, tuple[int, int, ImportSpec]] = {}
+        self._lock = threading.Lock()
+
+    def build(self, index: RepositoryIndex) -> TestImpactIndex:
+        specs = {item.relative_path: self._spec(item) for item in index.files if item.language is not None}
+        resolver = _Resolver(index, specs)
+        impact = TestImpactIndex(index=index)
+        for item in index.files:
+            spec = specs.get(item.relative_path)
+            if spec is None:
+                continue
+            for dependency in resolver.resolve(item, spec):
+                if dependency != item.relative_path:
+                    impact.dependents.setdefault(dependency, set()).add(item.relative_path)
+        return impact
+
+    def forget(self, repo_path: os.PathLike | str) -> None:
+        """Drop cached imports of a workspace that is no longer used."""
+        prefix = os.path.join(os.fspath(repo_path), "")
+        with self._lock:
+            for key in [key for key in self._imports if key.startswith(prefix)]:
+                del self._imports[key]
+
+    def _spec(self, item: IndexedFile) -> ImportSpec:
+        key = str(item.path)
+        try:
+            stat = item.path.stat()
+        except OSError:
+            return ImportSpec()
+        with self._lock:
+            cached = self._imports.get(key)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        try:
+            source = item.path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return ImportSpec()
+        if item.language == "python":
+            spec = _python_imports(item.relative_path, source)
+        elif item.language == "java":
+            package_match = JAVA_PACKAGE_PATTERN.search(source)
+            spec = ImportSpec(
+                names=tuple(name + wildcard for name, wildcard in JAVA_IMPORT_PATTERN.findall(source)),
+                package=package_match.group(1) if package_match else "",
+            )
+        else:
+            spec = ImportSpec(names=tuple(JS_IMPORT_PATTERN.findall(source)))
+        with self._lock:
+            self._imports[key] = (stat.st_mtime_ns, stat.st_size, spec)
+        return spec
+
+
+def _python_imports(relative_path: str, source: str) -> ImportSpec:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return ImportSpec()
+    package = relative_path.split("/")[:-1]
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module_parts = node.module.split(".") if node.module else []
+            if node.level:
+                if node.level > len(package) + 1:
+                    continue
+                module_parts = [*package[: len(package) - node.level + 1], *module_parts]
+            module = ".".join(module_parts)
+            if module:
+                names.add(module)
+            # `from pkg import core` may name a submodule
+            names.update(f"{module}.{alias.name}" if module else alias.name for alias in node.names)
+    return ImportSpec(names=tuple(sorted(names)))
+
+
+class _Resolver:
+    """Resolves the imports of one workspace's files to its files."""
+
+    def __init__(self, index: RepositoryIndex, specs: dict[str, ImportSpec]) -> None:
+        self.paths = {item.relative_path for item in index.files}
+        # Dotted module name (every suffix of the path, so `src/pkg/core.py` is `pkg.core` too) -> files
+        self.python_modules: dict[str, set[str]] = {}
+        for item in index.files_for_language("python"):
+            parts = item.relative_path[: -len(".py")].split("/")
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            for start in range(len(parts)):
+                self.python_modules.setdefault(".".join(parts[start:]), set()).add(item.relative_path)
+        # Java package -> files, fully-qualified class -> files
+        self.java_packages: dict[str, set[str]] = {}
+        self.java_classes: dict[str, set[str]] = {}
+        for item in index.files_for_language("java"):
+            package = specs[item.relative_path].package
+            class_name = item.path.stem
+            self.java_packages.setdefault(package, set()).add(item.relative_path)
+            self.java_classes.setdefault(f"{package}.{class_name}" if package else class_name, set()).add(
+                item.relative_path
+            )
+
+    def resolve(self, item: IndexedFile, spec: ImportSpec) -> set[str]:
+        if item.language == "python":
+            return self.python(spec)
+        if item.language == "java":
+            return self.java(spec)
+        return self.javascript(item.relative_path, spec)
+
+    def python(self, spec: ImportSpec) -> set[str]:
+        dependencies: set[str] = set()
+        for name in spec.names:
+            # `import pkg.core` also executes `pkg/__init__.py`
+            parts = name.split(".")
+            for end in range(len(parts), 0, -1):
+                dependencies |= self.python_modules.get(".".join(parts[:end]), set())
+        return dependencies
+
+    def java(self, spec: ImportSpec) -> set[str]:
+        # Classes of the same package are visible without an import
+        dependencies = set(self.java_packages.get(spec.package, set()))
+        for name in spec.names:
+            if name.endswith(".*"):
+                dependencies |= self.java_packages.get(name[:-2], set())
+                continue
+            # `import static a.b.C.member` names a member; walk back to the class
+            parts = name.split(".")
+            for end in range(len(parts), 0, -1):
+                matches = self.java_classes.get(".".join(parts[:end]))
+                if matches:
+                    dependencies |= matches
+                    break
+        return dependencies
+
+    def javascript(self, relative_path: str, spec: ImportSpec) -> set[str]:
+        directory = posixpath.dirname(relative_path)
+        dependencies: set[str] = set()
+        for specifier in spec.names:
+            if not specifier.startswith("."):
+                continue  # package imports
+            target = posixpath.normpath(posixpath.join(directory, specifier))
+            candidates = [target, *(target + extension for extension in JS_EXTENSIONS)]
+            candidates.extend(f"{target}/index{extension}" for extension in JS_EXTENSIONS)
+            # TypeScript sources import compiled names (`./util.js` for `util.ts`)
+            stem, extension = posixpath.splitext(target)
+            if extension in JS_EXTENSIONS:
+                candidates.extend(stem + other for other in JS_EXTENSIONS)
+            for candidate in candidates:
+                if candidate in self.paths:
+                    dependencies.add(candidate)
+                    break
+        return dependencies
@@ -0,0 +1,197 @@
+"""Splits test files into shards balanced by their historical durations."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+from git import InvalidGitRepositoryError, NoSuchPathError, Repo
+
+from app.services.failure_parser import IJSON_AVAILABLE, ReportPaths
+from app.services.repository_index import RepositoryIndex
+
+# Assumed duration of a test file that has never been timed, when nothing else is known
+DEFAULT_TEST_SECONDS = 1.0
+# Weight of the latest observation in the smoothed duration
+DURATION_SMOOTHING = 0.5
+
+
+def plan_shards(test_files: list[str], durations: dict[str, float], shard_count: int) -> list[list[str]]:
+    """Assign test files to at most `shard_count` shards with similar total durations.
+
+    Longest files go first, each onto the shard with the least work so far. Files without
+    history are assumed to take the median known duration.
+    """
+    if shard_count <= 1 or len(test_files) <= 1:
+        return [list(test_files)] if test_files else []
+    known = [durations[file] for file in test_files if file in durations]
+    default = statistics.median(known) if known else DEFAULT_TEST_SECONDS
+    ordered = sorted(test_files, key=lambda file: (-durations.get(file, default), file))
+
+    shards: list[list[str]] = [[] for _ in range(min(shard_count, len(test_files)))]
+    heap = [(0.0, position) for position in range(len(shards))]
+    for file in ordered:
+        load, position = heapq.heappop(heap)
+        shards[position].append(file)
+        heapq.heappush(heap, (load + durations.get(file, default), position))
+    return shards
+
+
+def shard_capacity(cpus: float = 0, memory_bytes: int = 0) -> int:
+    """How many sandboxes with these limits fit on the host; unlimited sandboxes count as one CPU."""
+    capacity = max(1, int((os.cpu_count() or 1) // (cpus or 1)))
+    if memory_bytes:
+        try:
+            host_memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (AttributeError, ValueError, OSError):
+            return capacity
+        capacity = min(capacity, max(1, host_memory // memory_bytes))
+    return capacity
+
+
+def suite_key(repo_path: Path) -> str:
+    """Identifies a repository's test suite across runs: its remote URL (without credentials)."""
+    try:
+        url = Repo(repo_path).remotes.origin.url
+    except (InvalidGitRepositoryError, NoSuchPathError, AttributeError, ValueError):
+        return str(repo_path.resolve())
+    parts = urlsplit(url)
+    if parts.hostname:
+        return parts._replace(netloc=parts.hostname + (f":{parts.port}" if parts.port else "")).geturl()
+    return url
+
+
+def listed_test_files(output: str, index: RepositoryIndex) -> list[str]:
+    """Repository test files in `pytest --collect-only` or `jest --listTests` output, in order.
+
+    pytest prints node ids (`tests/test_a.py::test_x`, or `tests/test_a.py: 3` with `-qq`),
+    Jest absolute paths; anything that isn't a repository file (headers, summaries) is skipped.
+    """
+    paths = ReportPaths(index)
+    files: dict[str, None] = {}
+    for line in output.splitlines():
+        candidate = line.strip().split("::", 1)[0]
+        file = paths.relative(candidate) or paths.relative(candidate.rpartition(": ")[0])
+        if file:
+            files[file] = None
+    return list(files)
+
+
+def report_durations(reports: list[Path], index: RepositoryIndex | None = None) -> dict[str, float]:
+    """Seconds spent per test file according to JUnit XML and Jest JSON reports."""
+    paths = ReportPaths(index)
+    durations: dict[str, float] = {}
+    for report in reports:
+        try:
+            if report.suffix == ".json":
+                items = _jest_durations(report, paths)
+            else:
+                items = _junit_durations(report, paths)
+            for file, seconds in items:
+                durations[file] = durations.get(file, 0.0) + seconds
+        except (OSError, ValueError, ElementTree.ParseError):
+            continue
+    return durations
+
+
+def _junit_durations(report: Path, paths: ReportPaths) -> list[tuple[str, float]]:
+    items = []
+    for _, element in ElementTree.iterparse(report, events=("end",)):
+        if element.tag == "testcase":
+            # pytest records the test file; Surefire and Gradle only the class
+            file = paths.relative(element.get("file") or "")
+            if file is None and element.get("classname"):
+                class_name = element.get("classname")
+                simple_name = class_name.rpartition(".")[2]
+                file = next(
+                    (
+                        found
+                        for extension in (".java", ".kt", ".groovy")
+                        if (found := paths.for_class(class_name, simple_name + extension))
+                    ),
+                    None,
+                )
+            if file:
+                items.append((file, float(element.get("time") or 0)))
+            element.clear()
+        elif element.tag == "testsuite":
+            element.clear()
+    return items
+
+
+def _jest_durations(report: Path, paths: ReportPaths) -> list[tuple[str, float]]:
+    items = []
+    with open(report, "rb") as file:
+        if IJSON_AVAILABLE:
+            import ijson
+
+            suites = ijson.items(file, "testResults.item")
+        else:
+            suites = json.load(file).get("testResults") or []
+        for suite in suites:
+            suite_file = paths.relative(suite.get("name") or "")
+            timing = suite.get("perfStats") or suite
+            if suite_file and timing.get("endTime") and timing.get("startTime"):
+                items.append((suite_file, (float(timing["endTime"]) - float(timing["startTime"])) / 1000))
+    return items
+
+
+class TestDurationStore:
+    """Smoothed per-test-file durations, keyed by test suite, persisted in SQLite."""
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        if db_path is None:
+            data_dir = Path(__file__).resolve().parents[2] / "data"
+            data_dir.mkdir(exist_ok=True)
+            db_path = data_dir / "test_durations.db"
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS durations (
+                    suite TEXT NOT NULL,
+                    test_file TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (suite, test_file)
+                )
+                """
+            )
+            conn.commit()
+
+    def get(self, suite: str) -> dict[str, float]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("SELECT test_file, seconds FROM durations WHERE suite = ?", (suite,)).fetchall()
+        return dict(rows)
+
+    def record(self, suite: str, durations: dict[str, float]) -> None:
+        """Blend observed durations into the stored ones."""
+        if not durations:
+            return
+        now = time.time()
+        rows = [(suite, test_file, seconds, now) for test_file, seconds in durations.items()]
+        with self.lock:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    f"""
+                    INSERT INTO durations(suite, test_file, seconds, updated)
+                    VALUES(?, ?, ?, ?)
+                    ON CONFLICT(suite, test_file) DO UPDATE SET
+                        seconds = {1 - DURATION_SMOOTHING} * seconds + {DURATION_SMOOTHING} * excluded.seconds,
+                        updated = excluded.updated
+                    """,
+                    rows,
+                )
+                conn.commit()
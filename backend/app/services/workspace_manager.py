@@ -0,0 +1,188 @@
+"""Retention, disk quotas and garbage collection for run workspaces and result files."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+from app.services.repo_mirror import directory_bytes
+
+
+class WorkspaceQuotaExceededError(RuntimeError):
+    """A run's workspace grew past the per-run disk quota."""
+
+
+@dataclass
+class RunArtifacts:
+    run_id: str
+    paths: list[Path]
+    modified: float  # epoch seconds of the newest artifact
+    size: int
+
+
+class WorkspaceManager:
+    """
+    Owns `workspaces/<run_id>` and `data/results_<run_id>.json`.
+
+    A collection removes the artifacts of finished runs that are older than
+    `WORKSPACE_RETENTION_SECONDS`, then the oldest ones until at most
+    `WORKSPACE_RETENTION_COUNT` runs and `WORKSPACE_RETENTION_BYTES` bytes remain
+    (0 disables a limit). Runs reported as active are never collected. `start()` runs
+    collections every `WORKSPACE_GC_INTERVAL` seconds in a background task.
+
+    `WORKSPACE_QUOTA_BYTES` caps a single run's workspace; the runner checks it after the
+    clone and after each test execution (which installs dependencies).
+    """
+
+    def __init__(
+        self,
+        work_dir: Path,
+        results_dir: Path,
+        max_age_seconds: float | None = None,
+        max_count: int | None = None,
+        max_total_bytes: int | None = None,
+        quota_bytes: int | None = None,
+        interval_seconds: float | None = None,
+    ) -> None:
+        self.work_dir = work_dir
+        self.results_dir = results_dir
+        self.max_age_seconds = (
+            max_age_seconds
+            if max_age_seconds is not None
+            else float(os.getenv("WORKSPACE_RETENTION_SECONDS", str(7 * 24 * 3600)))
+        )
+        self.max_count = max_count if max_count is not None else int(os.getenv("WORKSPACE_RETENTION_COUNT", "50"))
+        self.max_total_bytes = (
+            max_total_bytes
+            if max_total_bytes is not None
+            else int(os.getenv("WORKSPACE_RETENTION_BYTES", str(10 * 1024**3)))
+        )
+        self.quota_bytes = quota_bytes if quota_bytes is not None else int(os.getenv("WORKSPACE_QUOTA_BYTES", "0"))
+        self.interval_seconds = interval_seconds or float(os.getenv("WORKSPACE_GC_INTERVAL", "300"))
+        self.lock = threading.Lock()
+        # Counters change from executor threads (quota checks, collections) and are read by the API
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            "collections": 0,
+            "removed_workspaces": 0,
+            "removed_results": 0,
+            "reclaimed_bytes": 0,
+            "quota_violations": 0,
+        }
+        self._task: asyncio.Task | None = None
+
+    def enforce_quota(self, workspace: Path) -> int:
+        """Size of a run's workspace; raises and deletes it if it is over the quota."""
+        size = directory_bytes(workspace)
+        if self.quota_bytes and size > self.quota_bytes:
+            self._count(quota_violations=1)
+            self._remove(workspace)
+            raise WorkspaceQuotaExceededError(
+                f"Workspace uses {size} bytes, over the per-run quota of {self.quota_bytes} bytes"
+            )
+        return size
+
+    def artifacts(self) -> list[RunArtifacts]:
+        """Workspaces and result files grouped by run, oldest first."""
+        grouped: dict[str, list[Path]] = {}
+        if self.work_dir.is_dir():
+            for entry in self.work_dir.iterdir():
+                if entry.is_dir() and not entry.name.startswith("."):
+                    grouped.setdefault(entry.name, []).append(entry)
+        if self.results_dir.is_dir():
+            for entry in self.results_dir.glob("results_*.json"):
+                grouped.setdefault(entry.stem.removeprefix("results_"), []).append(entry)
+
+        runs: list[RunArtifacts] = []
+        for run_id, paths in grouped.items():
+            try:
+                modified = max(path.stat().st_mtime for path in paths)
+            except OSError:
+                continue  # removed concurrently
+            size = sum(directory_bytes(path) if path.is_dir() else path.stat().st_size for path in paths)
+            runs.append(RunArtifacts(run_id=run_id, paths=paths, modified=modified, size=size))
+        runs.sort(key=lambda run: run.modified)
+        return runs
+
+    def collect(self, active_run_ids: Iterable[str] = ()) -> int:
+        """Apply the retention policy once; returns the bytes reclaimed."""
+        active = set(active_run_ids)
+        with self.lock:
+            runs = self.artifacts()
+            cutoff = time.time() - self.max_age_seconds
+            total_bytes = sum(run.size for run in runs)
+            remaining = len(runs)
+            reclaimed = 0
+            for run in runs:
+                expired = bool(self.max_age_seconds) and run.modified < cutoff
+                over_count = bool(self.max_count) and remaining > self.max_count
+                over_bytes = bool(self.max_total_bytes) and total_bytes > self.max_total_bytes
+                if run.run_id in active or not (expired or over_count or over_bytes):
+                    continue
+                kept = 0
+                for path in run.paths:
+                    freed = self._remove(path)
+                    reclaimed += freed
+                    total_bytes -= freed
+                    if path.exists():
+                        kept += 1  # e.g. root-owned files written by a container
+                    else:
+                        self._count(
+                            **{"removed_workspaces" if path.is_relative_to(self.work_dir) else "removed_results": 1}
+                        )
+                if not kept:
+                    remaining -= 1
+            self._count(collections=1, reclaimed_bytes=reclaimed)
+            return reclaimed
+
+    def snapshot(self) -> dict[str, int]:
+        """A consistent copy of the counters."""
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def start(self, active_run_ids: Callable[[], Iterable[str]]) -> None:
+        """Collect in the background every `interval_seconds` until `stop()`."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._collect_periodically(active_run_ids))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _collect_periodically(self, active_run_ids: Callable[[], Iterable[str]]) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.collect, list(active_run_ids()))
+            except Exception as error:
+                print(f"[Workspace GC] Collection failed: {error}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def _count(self, **increments: int) -> None:
+        with self.stats_lock:
+            for name, amount in increments.items():
+                self.stats[name] += amount
+
+    @staticmethod
+    def _remove(path: Path) -> int:
+        """Delete a workspace or results file; returns the bytes actually freed."""
+        if path.is_dir():
+            before = directory_bytes(path)
+            shutil.rmtree(path, ignore_errors=True)
+            return before - directory_bytes(path)
+        try:
+            before = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return 0
+        except OSError as error:
+            print(f"[Workspace GC] Could not remove {path}: {error}")
+            return 0
+        return before
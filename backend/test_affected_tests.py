@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Validation test for affected-test selection.
+Changed files map to the tests that import them through Python, Java and JS/TS import graphs.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from app.services.repository_index import RepositoryIndex
+from app.services.test_engine import TestEngineService
+from app.services.test_impact import TestImpactService
+
+
+def _write(root: Path, relative_path: str, content: str) -> None:
+    path = root / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def _make_repo(root: Path) -> None:
+    _write(root, "pytest.ini", "[pytest]\n")
+    _write(root, "src/shop/__init__.py", "")
+    _write(root, "src/shop/prices.py", "def total(items):\n    return sum(items)\n")
+    _write(root, "src/shop/cart.py", "from .prices import total\n\ndef checkout(items):\n    return total(items)\n")
+    _write(root, "src/shop/users.py", "def name():\n    return 'ada'\n")
+    _write(root, "tests/conftest.py", "import sys\nsys.path.insert(0, 'src')\n")
+    _write(root, "tests/test_cart.py", "from shop.cart import checkout\n\ndef test_checkout():\n    assert checkout([1, 2]) == 3\n")
+    _write(root, "tests/test_users.py", "import shop.users\n\ndef test_name():\n    assert shop.users.name() == 'ada'\n")
+
+    _write(root, "src/main/java/com/acme/Calc.java", "package com.acme;\npublic class Calc {}\n")
+    _write(root, "src/main/java/com/acme/util/Strings.java", "package com.acme.util;\npublic class Strings {}\n")
+    _write(root, "src/test/java/com/acme/CalcTest.java", "package com.acme;\nclass CalcTest {}\n")
+    _write(
+        root,
+        "src/test/java/com/other/StringsTest.java",
+        "package com.other;\nimport static com.acme.util.Strings.trim;\nclass StringsTest {}\n",
+    )
+
+    _write(root, "web/format.ts", "export const fmt = (x: number) => `${x}`;\n")
+    _write(root, "web/view.js", "const { fmt } = require('./format');\nmodule.exports = fmt;\n")
+    _write(root, "web/view.test.js", "import view from './view';\ntest('v', () => {});\n")
+    _write(root, "web/other.test.ts", "import lodash from 'lodash';\n")
+
+
+def _affected(root: Path, *changed: str):
+    tests = TestImpactService().build(RepositoryIndex.build(root)).affected_tests(set(changed))
+    return None if tests is None else [item.relative_path for item in tests]
+
+
+def test_impact_graph_across_languages():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_repo(root)
+
+        assert _affected(root, "src/shop/prices.py") == ["tests/test_cart.py"], "relative and transitive imports"
+        assert _affected(root, "src/shop/users.py") == ["tests/test_users.py"]
+        assert _affected(root, "tests/test_users.py") == ["tests/test_users.py"], "a changed test runs itself"
+        assert _affected(root, "src/main/java/com/acme/Calc.java") == ["src/test/java/com/acme/CalcTest.java"]
+        assert _affected(root, "src/main/java/com/acme/util/Strings.java") == [
+            "src/test/java/com/other/StringsTest.java"
+        ], "static imports resolve to their class"
+        assert _affected(root, "web/format.ts") == ["web/view.test.js"]
+        assert _affected(root, "pytest.ini") is None, "manifest changes need the full suite"
+        _write(root, "setup.py", "from setuptools import setup\n")
+        assert _affected(root, "setup.py") is None, "manifests written in Python too"
+    print("✓ Python, Java and JS/TS imports map changes to affected tests")
+
+
+def test_untraceable_changes_run_the_full_suite():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_repo(root)
+        _write(root, "jest.config.js", "module.exports = {};\n")
+        _write(root, "node_modules/shop/index.py", "x = 1\n")
+
+        assert _affected(root, "src/shop/removed.py") is None, "deleted or renamed files"
+        assert _affected(root, "node_modules/shop/index.py") is None, "files in ignored directories"
+        assert _affected(root, "tests/conftest.py") is None, "fixtures aren't imported by the tests using them"
+        assert _affected(root, "src/shop/__init__.py") is None
+        assert _affected(root, "jest.config.js") is None
+        assert _affected(root, "src/shop/prices.py", "tests/conftest.py") is None
+
+        engine = TestEngineService(use_docker=False)
+        result = asyncio.run(engine.run_tests_async(root, changed_files={"tests/conftest.py"}))
+        assert result.selected_tests is None and "2 passed" in result.output, result.output
+    print("✓ Changes the import graph can't trace run the full suite")
+
+
+def test_imports_are_cached_until_a_file_changes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_repo(root)
+        service = TestImpactService()
+        service.build(RepositoryIndex.build(root))
+        cached = dict(service._imports)
+
+        _write(root, "tests/test_users.py", "from shop.cart import checkout\n")
+        impact = service.build(RepositoryIndex.build(root))
+        changed = [key for key, value in service._imports.items() if cached.get(key) != value]
+        assert changed == [str(root / "tests" / "test_users.py")], changed
+        assert sorted(item.relative_path for item in impact.affected_tests({"src/shop/prices.py"})) == [
+            "tests/test_cart.py",
+            "tests/test_users.py",
+        ]
+
+        service.forget(root)
+        assert not service._imports
+    print("✓ Only modified files are re-parsed between builds")
+
+
+def test_engine_runs_only_affected_tests():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_repo(root)
+        engine = TestEngineService(use_docker=False)
+
+        result = asyncio.run(engine.run_tests_async(root, changed_files={"src/shop/prices.py"}))
+        assert result.selected_tests == ["tests/test_cart.py"]
+        assert result.command[-1] == "tests/test_cart.py" and result.return_code == 0
+        assert "1 passed" in result.output, result.output
+
+        _write(root, "web/unused.py", "x = 1\n")
+        untested = asyncio.run(engine.run_tests_async(root, changed_files={"web/unused.py"}))
+        assert untested.selected_tests == [] and untested.command == [], "nothing affected, nothing runs"
+
+        full = asyncio.run(engine.run_tests_async(root, changed_files={"pytest.ini"}))
+        assert full.selected_tests is None and "2 passed" in full.output
+    print("✓ Intermediate attempts run only the affected tests")
+
+
+if __name__ == "__main__":
+    test_impact_graph_across_languages()
+    test_untraceable_changes_run_the_full_suite()
+    test_imports_are_cached_until_a_file_changes()
+    test_engine_runs_only_affected_tests()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Validation test for the persistent analysis cache.
+Checks cache hits across runs and repositories, hit/miss counters and LRU eviction.
+"""
+
+import tempfile
+from pathlib import Path
+
+from app.services.analysis_cache import AnalysisCacheService, rule_modules
+from app.services.multi_language_analyzer import MultiLanguageAnalyzerService
+
+PYTHON_CODE = """
+import os
+
+def calculate_area(radius):
+    return 3.14 * radius * 2
+"""
+
+JAVASCRIPT_CODE = """
+const total = (numbers) => {
+    let sum = 0;
+    for (let num of numbers) {
+        sum += num
+    }
+    return sum / 100;
+}
+"""
+
+
+def _write_repo(root: Path) -> None:
+    (root / "vendor").mkdir(parents=True)
+    (root / "vendor" / "geometry.py").write_text(PYTHON_CODE)
+    (root / "total.js").write_text(JAVASCRIPT_CODE)
+
+
+def test_cache_hits_across_runs_and_repos():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        cache = AnalysisCacheService(db_path=tmp / "cache.db")
+        analyzer = MultiLanguageAnalyzerService(cache=cache)
+
+        first_repo = tmp / "first"
+        _write_repo(first_repo)
+        first_stats: dict[str, int] = {}
+        cold = analyzer.analyze(first_repo, cache_stats=first_stats)
+        assert first_stats == {"hits": 0, "misses": 2}
+
+        warm_stats: dict[str, int] = {}
+        warm = analyzer.analyze(first_repo, cache_stats=warm_stats)
+        assert warm_stats == {"hits": 2, "misses": 0}
+        assert warm == cold, "cached findings must match a fresh analysis"
+
+        # Same vendored content at a different path in another repository
+        second_repo = tmp / "second"
+        (second_repo / "third_party").mkdir(parents=True)
+        (second_repo / "third_party" / "geo.py").write_text(PYTHON_CODE)
+        shared_stats: dict[str, int] = {}
+        shared = analyzer.analyze(second_repo, cache_stats=shared_stats)
+        assert shared_stats == {"hits": 1, "misses": 0}
+        assert shared and all(item["file"] == "third_party/geo.py" for item in shared)
+
+        # A modified file misses again
+        (first_repo / "total.js").write_text(JAVASCRIPT_CODE.replace("100", "numbers.length"))
+        edited_stats: dict[str, int] = {}
+        analyzer.analyze(first_repo, cache_stats=edited_stats)
+        assert edited_stats == {"hits": 1, "misses": 1}
+
+        print(f"✓ Cache hits: {warm_stats['hits']} warm, {shared_stats['hits']} shared across repos")
+
+
+def test_cache_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = AnalysisCacheService(db_path=Path(tmpdir) / "cache.db", max_entries=2)
+        cache.put_many({"a": []})
+        cache.put_many({"b": []})
+        cache.get_many(["a"])  # "a" is now more recently used than "b"
+        cache.put_many({"c": []})
+
+        remaining = cache.get_many(["a", "b", "c"])
+        assert set(remaining) == {"a", "c"}, f"expected LRU entry 'b' evicted, got {sorted(remaining)}"
+        print("✓ LRU eviction keeps the most recently used entries")
+
+
+def test_ruleset_version_covers_rule_modules():
+    import app.services.static_analyzer  # noqa: F401
+
+    modules = rule_modules("app.services.static_analyzer")
+    assert "app.services.python_rule_engine" in modules, modules
+    assert all(name.startswith("app.") for name in modules), "library modules are not part of the rule set"
+    print("✓ Python rule-set version includes the rule engine module")
+
+
+if __name__ == "__main__":
+    test_cache_hits_across_runs_and_repos()
+    test_cache_lru_eviction()
+    test_ruleset_version_covers_rule_modules()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Validation test for the CI poll scheduler.
+Checks poll coalescing, waiter timeouts, rate-limit blocking and the header-driven token bucket.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from app.services.ci_poll_scheduler import CIPollScheduler, TokenBucket
+from app.services.github_ops import GitHubOpsService
+from tools.fake_github import create_app
+
+
+def _scheduler(transport: httpx.AsyncBaseTransport) -> CIPollScheduler:
+    service = GitHubOpsService(api_url="http://fake", transport=transport)
+    return CIPollScheduler(service, min_interval=0.02, max_interval=0.05, reserve=0)
+
+
+def test_duplicate_waiters_share_one_poll_loop():
+    async def scenario() -> None:
+        fake = create_app(complete_after=0.3)
+        scheduler = _scheduler(httpx.ASGITransport(app=fake))
+        results = await asyncio.gather(
+            *(scheduler.wait_for_completion("o", "r", "fix", timeout_seconds=5) for _ in range(3))
+        )
+        assert {status for status, _ in results} == {"PASSED"}
+        assert scheduler.stats["coalesced"] == 2
+        assert scheduler.github_ops.api_stats["requests"] == scheduler.stats["requests"]
+        assert not scheduler.polls, "finished loops must be dropped"
+
+        status, _ = await scheduler.wait_for_completion("o", "r", "slow", timeout_seconds=0.01)
+        assert status == "FAILED"
+        await asyncio.sleep(0)
+        assert not scheduler.polls, "a loop nobody waits on must be cancelled"
+        await scheduler.github_ops.aclose()
+
+    asyncio.run(scenario())
+    print("✓ Waiters on one branch share a poll loop; abandoned loops stop")
+
+
+def test_rate_limited_response_pauses_polling():
+    responses = [
+        httpx.Response(
+            403,
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 1)},
+            json={"message": "API rate limit exceeded"},
+        ),
+        httpx.Response(
+            200,
+            headers={"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": str(int(time.time()) + 3600)},
+            json={"workflow_runs": [{"status": "completed", "conclusion": "success", "html_url": "u"}]},
+        ),
+    ]
+    transport = httpx.MockTransport(lambda request: responses.pop(0))
+
+    async def scenario() -> tuple[str, float, dict]:
+        scheduler = _scheduler(transport)
+        started = time.monotonic()
+        status, _ = await scheduler.wait_for_completion("o", "r", "fix", timeout_seconds=5)
+        await scheduler.github_ops.aclose()
+        return status, time.monotonic() - started, scheduler.stats
+
+    status, elapsed, stats = asyncio.run(scenario())
+    assert status == "PASSED" and stats["rate_limited"] == 1
+    assert elapsed > 0.05, "polling must wait for the rate-limit reset instead of failing the run"
+    print("✓ Exhausted rate limit pauses polling until reset")
+
+
+def test_token_bucket_follows_rate_limit_headers():
+    bucket = TokenBucket(capacity=5, rate=100, reserve=100)
+    bucket.update_from_headers(remaining=3700, reset_epoch=time.time() + 3600)
+    assert abs(bucket.rate - 1.0) < 0.01, bucket.rate
+
+    bucket.update_from_headers(remaining=100, reset_epoch=time.time() + 60)
+    assert bucket.delay() > 30, "quota at the reserve must block until the reset"
+    print("✓ Token bucket rate tracks the remaining quota")
+
+
+if __name__ == "__main__":
+    test_duplicate_waiters_share_one_poll_loop()
+    test_rate_limited_response_pauses_polling()
+    test_token_bucket_follows_rate_limit_headers()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Validation test for webhook-driven CI completion.
+Replays signed workflow_run deliveries into the API and checks that a waiting run wakes without polling.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+import app.main as api
+from app.services.ci_poll_scheduler import CIPollScheduler
+from app.services.ci_webhooks import CIWebhookRegistry
+from app.services.github_ops import GitHubOpsService
+from tools.fake_github import create_app
+from tools.webhook_replayer import replay, workflow_run_event
+
+SECRET = "test-secret"
+
+
+def test_webhook_wakes_waiting_run():
+    async def scenario() -> None:
+        service = GitHubOpsService(
+            api_url="http://fake",
+            transport=httpx.ASGITransport(app=create_app(complete_after=3600)),
+        )
+        scheduler = CIPollScheduler(
+            service, min_interval=0.01, reserve=0, webhooks=CIWebhookRegistry(SECRET), fallback_interval=30
+        )
+        api.runner.ci_poller = scheduler
+
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            waiting = asyncio.create_task(
+                scheduler.wait_for_completion("Owner", "Repo", "fix", timeout_seconds=10, head_sha="new")
+            )
+            await asyncio.sleep(0.05)
+
+            forged = await client.post(
+                "/api/webhooks/github",
+                content=b"{}",
+                headers={"X-GitHub-Event": "workflow_run", "X-Hub-Signature-256": "sha256=00"},
+            )
+            assert forged.status_code == 401
+
+            started = time.monotonic()
+            url = "/api/webhooks/github"
+            other, stale, delivered = await replay(client, url, SECRET, [
+                ("workflow_run", workflow_run_event("owner/repo", "other-branch", "success", head_sha="new")),
+                # A late delivery for the previous push of the branch
+                ("workflow_run", workflow_run_event("owner/repo", "fix", "success", head_sha="old")),
+                ("workflow_run", workflow_run_event("owner/repo", "fix", "failure", head_sha="new")),
+            ])
+            assert other.status_code == 202 and other.json()["woken"] is False
+            assert stale.status_code == 202 and stale.json()["woken"] is False
+            assert delivered.status_code == 202 and delivered.json()["woken"] is True
+
+            status, workflow_url = await asyncio.wait_for(waiting, timeout=1)
+            assert status == "FAILED" and workflow_url.endswith("/actions/runs/1")
+            assert time.monotonic() - started < 1, "the delivery must wake the run immediately"
+
+        assert service.api_stats["requests"] == 1, "only the initial poll may hit the API"
+        assert not scheduler.polls and not scheduler.webhooks.futures
+        await service.aclose()
+
+    original_poller = api.runner.ci_poller
+    try:
+        asyncio.run(scenario())
+    finally:
+        api.runner.ci_poller = original_poller
+    print("✓ Signed workflow_run delivery wakes the waiting run after one poll")
+
+
+if __name__ == "__main__":
+    test_webhook_wakes_waiting_run()
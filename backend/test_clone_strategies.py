@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Validation test for shallow, partial and sparse workspace clones.
+Checks what each strategy downloads, that sparse checkout keeps analyzable paths only,
+and that fix branches still push from shallow history.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from git import Repo
+
+from app.services.github_ops import GitHubOpsService
+
+
+def _remote(root: Path) -> str:
+    source_dir = root / "source"
+    source = Repo.init(source_dir, initial_branch="main")
+    with source.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    for relative, content in {
+        "pytest.ini": "[pytest]\n",
+        "src/pkg/core.py": "def add(a, b):\n    return a + b\n",
+        "src/pkg/nested/util.py": "VALUE = 1\n",
+        "tests/test_core.py": "def test_add():\n    assert True\n",
+        "docs/guide.md": "# Guide\n",
+    }.items():
+        (source_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+        (source_dir / relative).write_text(content, encoding="utf-8")
+    (source_dir / "assets").mkdir()
+    (source_dir / "assets" / "model.bin").write_bytes(os.urandom(300_000))
+    source.git.add(A=True)
+    source.index.commit("initial")
+    for index in range(3):
+        (source_dir / "src" / "pkg" / "core.py").write_text(f"def add(a, b):\n    return a + b + {index}\n", encoding="utf-8")
+        source.git.add(A=True)
+        source.index.commit(f"change {index}")
+
+    remote = Repo.clone_from(str(source_dir), root / "remote.git", bare=True)
+    remote.git.config("uploadpack.allowFilter", "true")
+    # file:// forces the pack transport, so --depth and --filter apply
+    return (root / "remote.git").as_uri()
+
+
+def _commit_fix(github_ops: GitHubOpsService, workspace: Path) -> None:
+    with Repo(workspace).config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    (workspace / "src" / "pkg" / "core.py").write_text("def add(a, b):\n    return a + b\n", encoding="utf-8")
+    github_ops.commit_changes(workspace, "fix add")
+
+
+def test_shallow_clone_pushes_fix_branch():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        remote_url = _remote(root)
+        github_ops = GitHubOpsService(clone_strategy="shallow")
+
+        workspace = github_ops.clone_repository(remote_url, root / "ws")
+        github_ops.create_branch(workspace, "fix-branch")
+        assert (workspace / ".git" / "shallow").exists()
+        assert len(list(Repo(workspace).iter_commits())) == 1, "only the tip commit is fetched"
+
+        report = github_ops.take_clone_report(workspace)
+        assert report.strategy == "shallow" and report.bytes_received > 0 and report.seconds >= 0
+        assert github_ops.take_clone_report(workspace) is None, "reports are handed out once"
+
+        _commit_fix(github_ops, workspace)
+        github_ops.push_branch(workspace, "fix-branch")
+        remote = Repo(root / "remote.git")
+        assert remote.commit("fix-branch").parents[0] == remote.commit("main")
+        print("✓ Shallow clone fetches one commit and still pushes the fix branch")
+
+
+def test_shallow_push_unshallows_when_remote_lacks_history():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        remote_url = _remote(root)
+        github_ops = GitHubOpsService(clone_strategy="shallow")
+
+        workspace = github_ops.clone_repository(remote_url, root / "ws")
+        github_ops.create_branch(workspace, "fix-branch")
+        _commit_fix(github_ops, workspace)
+        # Push to an empty repository: it lacks the shallow boundary commit
+        Repo.init(root / "empty.git", bare=True)
+        Repo(workspace).remote("origin").set_url((root / "empty.git").as_uri(), push=True)
+
+        github_ops.push_branch(workspace, "fix-branch")
+        assert not (workspace / ".git" / "shallow").exists()
+        assert len(list(Repo(root / "empty.git").iter_commits("fix-branch"))) == 5
+        print("✓ Shallow push falls back to unshallowing when the remote needs history")
+
+
+def test_sparse_partial_clone_skips_assets():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        remote_url = _remote(root)
+        full = GitHubOpsService(clone_strategy="full")
+        full.clone_repository(remote_url, root / "full")
+        full_bytes = full.take_clone_report(root / "full").bytes_received
+
+        github_ops = GitHubOpsService(clone_strategy="partial", sparse_checkout=True)
+        workspace = github_ops.clone_repository(remote_url, root / "ws")
+        github_ops.create_branch(workspace, "fix-branch")
+
+        assert (workspace / "pytest.ini").exists(), "root files stay in the cone"
+        assert (workspace / "src" / "pkg" / "nested" / "util.py").exists()
+        assert (workspace / "tests" / "test_core.py").exists()
+        assert not (workspace / "assets").exists()
+        assert not (workspace / "docs").exists()
+
+        report = github_ops.take_clone_report(workspace)
+        assert report.sparse_directories == 2, report  # src/pkg and tests
+        assert report.bytes_received < full_bytes / 4, (report.bytes_received, full_bytes)
+
+        _commit_fix(github_ops, workspace)
+        changed = Repo(workspace).git.show("--name-status", "--format=", "HEAD").split()
+        assert changed == ["M", "src/pkg/core.py"], "paths outside the cone are not committed as deleted"
+        print(f"✓ Sparse partial clone received {report.bytes_received} of {full_bytes} bytes")
+
+
+if __name__ == "__main__":
+    test_shallow_clone_pushes_fix_branch()
+    test_shallow_push_unshallows_when_remote_lacks_history()
+    test_sparse_partial_clone_skips_assets()
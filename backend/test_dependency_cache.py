@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Validation test for dependency cache volumes (offline, host-directory mode).
+Checks lockfile-keyed volume names, mounts and local registry settings.
+"""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.services.dependency_cache import DependencyCacheService
+
+
+def _mount_sources(args: tuple[str, ...]) -> dict[str, str]:
+    mounts = [args[i + 1] for i, arg in enumerate(args) if arg == "-v"]
+    return {spec.split(":")[1]: spec.split(":")[0] for spec in mounts}
+
+
+def test_volumes_keyed_by_lockfile():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        repo = tmp / "repo"
+        repo.mkdir()
+        (repo / "requirements.txt").write_text("requests==2.32.3\n")
+        (repo / "package.json").write_text('{"name": "demo"}')
+
+        cache = DependencyCacheService(cache_dir=tmp / "cache", registry_dir=tmp / "registry")
+        first = _mount_sources(cache.docker_args(repo))
+        assert {"/root/.cache/pip", "/opt/deps/python", "/root/.npm", "/workspace/node_modules"} <= set(first)
+        assert "/root/.m2" not in first, "maven cache must only be mounted for maven projects"
+        assert all(Path(first[target]).is_dir() for target in first if target != "/registry")
+
+        # Unchanged lockfile -> same volumes; changed lockfile -> new pip volumes only
+        assert _mount_sources(cache.docker_args(repo)) == first
+        (repo / "requirements.txt").write_text("requests==2.32.4\n")
+        second = _mount_sources(cache.docker_args(repo))
+        assert second["/opt/deps/python"] != first["/opt/deps/python"]
+        assert second["/workspace/node_modules"] == first["/workspace/node_modules"]
+
+        # Local registry stand-in: offline pip/npm installs from the mounted directory
+        args = cache.docker_args(repo)
+        assert second["/registry"] == str(tmp / "registry")
+        assert "PIP_NO_INDEX=1" in args and "PIP_FIND_LINKS=/registry/pip" in args
+        assert "PYTHONUSERBASE=/opt/deps/python" in args
+        print("✓ Dependency caches keyed by lockfile hash with offline registry mode")
+
+
+def test_installs_into_shared_volumes_are_serialized():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        # Manifest-less Python repositories share the "default" pip volumes
+        repos = [tmp / "a", tmp / "b", tmp / "c"]
+        for repo in repos:
+            repo.mkdir()
+        (repos[2] / "requirements.txt").write_text("requests==2.32.3\n")
+        cache = DependencyCacheService(cache_dir=tmp / "cache")
+        intervals: dict[str, tuple[float, float]] = {}
+
+        def install(repo: Path) -> None:
+            with cache.install_lock(repo):
+                started = time.monotonic()
+                time.sleep(0.2)
+                intervals[repo.name] = (started, time.monotonic())
+
+        threads = [threading.Thread(target=install, args=(repo,)) for repo in repos]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        def overlap(first: str, second: str) -> bool:
+            return intervals[first][0] < intervals[second][1] and intervals[second][0] < intervals[first][1]
+
+        assert not overlap("a", "b"), "installs into the same volumes must not overlap"
+        assert overlap("a", "c") or overlap("b", "c"), "different volumes install concurrently"
+        assert list((tmp / "cache").glob("healing-pip-*-default.lock")), "host caches also take a file lock"
+        print("✓ Installs into shared cache volumes run one at a time")
+
+
+def test_offline_npm_cache_is_writable():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        repo = tmp / "repo"
+        repo.mkdir()
+        (repo / "package.json").write_text('{"name": "demo"}')
+        cache = DependencyCacheService(cache_dir=tmp / "cache", registry_dir=tmp / "registry")
+        args = cache.docker_args(repo)
+
+        npm_cache = next(arg.split("=", 1)[1] for arg in args if arg.startswith("NPM_CONFIG_CACHE="))
+        specs = [args[i + 1].split(":") for i, arg in enumerate(args) if arg == "-v"]
+        volumes = {spec[1]: spec[2:] for spec in specs}
+        assert npm_cache in volumes, "npm's cache must be one of the lockfile-keyed volumes"
+        assert "ro" not in volumes[npm_cache], "npm writes to its cache even offline"
+        assert volumes["/registry"] == ["ro"]
+        assert "NPM_CONFIG_OFFLINE=true" in args
+
+        install = cache.install_command(["npm", "install", "--silent"])
+        assert install[:2] == ["sh", "-c"] and f"/registry/npm/. {npm_cache}/" in install[2]
+        assert install[2].endswith("exec npm install --silent")
+        assert cache.install_command(["pip", "install", "pytest"]) == ["pip", "install", "pytest"]
+        assert DependencyCacheService().install_command(["npm", "install"]) == ["npm", "install"]
+    print("✓ Offline npm installs seed a writable cache from the read-only registry")
+
+
+if __name__ == "__main__":
+    test_volumes_keyed_by_lockfile()
+    test_installs_into_shared_volumes_are_serialized()
+    test_offline_npm_cache_is_writable()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Validation test for the execution layer.
+Blocking stages must not stall the event loop; async test execution must match the sync path.
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.execution import ExecutionLayer
+from app.services.test_engine import TestEngineService
+
+
+def test_blocking_work_keeps_loop_responsive():
+    async def scenario() -> float:
+        execution = ExecutionLayer(io_workers=2, cpu_workers=1)
+        try:
+            blocking = asyncio.ensure_future(execution.run_io(time.sleep, 0.5))
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            waited = time.perf_counter() - started
+            await blocking
+            return waited
+        finally:
+            execution.shutdown()
+
+    waited = asyncio.run(scenario())
+    assert waited < 0.25, f"event loop stalled for {waited:.2f}s"
+    print(f"✓ Event loop stayed responsive during blocking work ({waited * 1000:.0f} ms)")
+
+
+def test_run_tests_async_matches_sync():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        (repo / "test_sample.py").write_text("def test_fails():\n    assert 1 == 2\n")
+        engine = TestEngineService(use_docker=False)
+
+        sync_result = engine.run_tests(repo)
+        async_result = asyncio.run(engine.run_tests_async(repo))
+
+        assert async_result.command == sync_result.command
+        assert async_result.return_code == sync_result.return_code != 0
+        assert "test_sample.py" in async_result.output
+        print("✓ Async test execution matches the blocking implementation")
+
+
+if __name__ == "__main__":
+    test_blocking_work_keeps_loop_responsive()
+    test_run_tests_async_matches_sync()
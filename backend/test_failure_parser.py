@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Validation test for the streaming failure parser.
+"""
+
+import time
+
+from app.services.failure_parser import MAX_LINE_CHARS, FailureParserService
+
+PYTEST_OUTPUT = """\
+============================= FAILURES =============================
+___________________________ test_add ___________________________
+  File "src/calc.py", line 12, in add
+    return a + b
+TypeError: unsupported operand type(s) for +: 'int' and 'str'
+  File "src/app.py", line 3, in <module>
+    from calc import missing
+ImportError: cannot import name 'missing' from 'calc'
+  File "tests/test_calc.py", line 8, in test_sub
+    assert sub(3, 1) == 1
+AssertionError: assert 2 == 1
+src/utils.py:4:1: F401 'os' imported but unused
+  File "unknown", line 1
+TypeError: object of type 'NoneType' has no len()
+FAILED tests/test_calc.py::test_sub - AssertionError
+"""
+
+
+def _keys(failures):
+    return [(item["file"], item["line_number"], item["bug_type"]) for item in failures]
+
+
+def test_parses_pytest_and_linter_output():
+    failures = FailureParserService().parse(PYTEST_OUTPUT)
+    assert _keys(failures) == [
+        ("src/calc.py", 12, "TYPE_ERROR"),
+        ("src/app.py", 3, "IMPORT"),
+        ("tests/test_calc.py", 8, "LOGIC"),
+        ("src/utils.py", 4, "LINTING"),
+        ("unknown", 1, "LOGIC"),
+    ], _keys(failures)
+    assert failures[1]["message"] == "ImportError: cannot import name 'missing' from 'calc'"
+    print("✓ Traceback frames, error markers and lint lines are parsed")
+
+
+def test_error_before_first_frame_uses_following_frame():
+    output = 'SyntaxError: invalid syntax\nE   during collection\n  File "src/bad.py", line 7\n'
+    assert _keys(FailureParserService().parse(output)) == [("src/bad.py", 7, "SYNTAX")]
+
+    too_far = 'SyntaxError: invalid syntax\none\ntwo\n  File "src/bad.py", line 7\n'
+    assert FailureParserService().parse(too_far) == []
+    print("✓ Errors without a preceding frame look ahead two lines")
+
+
+def test_chunk_boundaries_do_not_matter():
+    parser = FailureParserService()
+    expected = parser.parse(PYTEST_OUTPUT)
+    for size in (1, 7, 64):
+        chunks = (PYTEST_OUTPUT[i : i + size] for i in range(0, len(PYTEST_OUTPUT), size))
+        assert parser.parse_stream(chunks) == expected, size
+    assert parser.parse_stream(PYTEST_OUTPUT.splitlines(keepends=True)) == expected
+    print("✓ Chunked and line-by-line input give the same failures")
+
+
+def test_long_lines_are_truncated():
+    stream = FailureParserService.stream()
+    stream.feed('  File "src/a.py", line 2\n' + "x" * (3 * MAX_LINE_CHARS))
+    assert stream._partial_chars == MAX_LINE_CHARS
+    stream.feed(" TypeError tail\n")
+    assert stream.close() == [], "the marker past the line limit is dropped"
+    print("✓ Overlong lines are capped instead of buffered")
+
+
+def test_linear_time_on_long_tracebacks():
+    frames = "".join(f'  File "src/deep.py", line {i}, in f\n    f()\n' for i in range(1, 50_001))
+    output = frames + "RecursionError\nTypeError: boom\n" * 2_000
+    started = time.perf_counter()
+    failures = FailureParserService().parse(output)
+    elapsed = time.perf_counter() - started
+    assert _keys(failures) == [("src/deep.py", 50_000, "TYPE_ERROR")]
+    assert elapsed < 5, f"parsing took {elapsed:.2f}s"
+    print(f"✓ Parsed {len(output) // 1024} KiB of traceback in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_parses_pytest_and_linter_output()
+    test_error_before_first_frame_uses_following_frame()
+    test_chunk_boundaries_do_not_matter()
+    test_long_lines_are_truncated()
+    test_linear_time_on_long_tracebacks()
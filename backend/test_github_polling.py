@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Validation test for GitHub Actions polling.
+Runs poll_ci_status against the local fake API and checks client reuse and conditional requests.
+"""
+
+import asyncio
+
+import httpx
+
+from app.services.github_ops import GitHubOpsService
+from tools.fake_github import create_app
+
+
+def test_polling_reuses_client_and_revalidates():
+    async def scenario() -> tuple[str, dict, dict]:
+        fake = create_app(complete_after=0.3, conclusion="failure")
+        service = GitHubOpsService(api_url="http://fake", transport=httpx.ASGITransport(app=fake))
+        client = service._api_client()
+
+        status, url = await service.poll_ci_status("o", "r", "fix", timeout_seconds=5, poll_interval=0.02)
+        assert status == "FAILED" and url.endswith("/actions/runs/1")
+        assert service._api_client() is client, "polls must share one client"
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url="http://fake") as probe:
+            stats = (await probe.get("/_stats")).json()
+        await service.aclose()
+        return status, stats, service.api_stats
+
+    status, stats, client_stats = asyncio.run(scenario())
+    assert stats["requests"] == client_stats["requests"] > 3
+    assert stats["not_modified"] == client_stats["not_modified"] > 0
+    # Only the queued -> in_progress -> completed transitions cost rate limit
+    assert stats["rate_limit_used"] == 3, stats
+    print(f"✓ {stats['requests']} polls, {stats['not_modified']} answered 304, {stats['rate_limit_used']} counted")
+
+
+if __name__ == "__main__":
+    test_polling_reuses_client_and_revalidates()
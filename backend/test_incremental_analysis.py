@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Validation test for incremental re-analysis.
+Only files reported as changed (or newly added) are re-analyzed; other findings are reused.
+"""
+
+import tempfile
+from pathlib import Path
+
+from app.services.multi_language_analyzer import MultiLanguageAnalyzerService
+
+UNUSED_IMPORT_CODE = """
+import os
+
+def area(radius):
+    return 3.14 * radius * radius
+"""
+
+CLEAN_CODE = """
+def area(radius):
+    return 3.14 * radius * radius
+"""
+
+
+class CountingAnalyzer(MultiLanguageAnalyzerService):
+    def __init__(self) -> None:
+        super().__init__()
+        self.analyzed: list[str] = []
+        original = self.python_analyzer.analyze_source
+
+        def counting_analyze_source(source, relative_path):
+            self.analyzed.append(relative_path)
+            return original(source, relative_path)
+
+        self.python_analyzer.analyze_source = counting_analyze_source
+
+
+def test_incremental_reanalysis():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        for name in ("a.py", "b.py", "c.py"):
+            (repo / name).write_text(UNUSED_IMPORT_CODE)
+
+        analyzer = CountingAnalyzer()
+        full = analyzer.analyze(repo)
+        assert sorted(analyzer.analyzed) == ["a.py", "b.py", "c.py"]
+        assert {item["file"] for item in full} == {"a.py", "b.py", "c.py"}
+
+        # Patch one file, add a new one: only those two are analyzed again
+        analyzer.analyzed.clear()
+        (repo / "b.py").write_text(CLEAN_CODE)
+        (repo / "d.py").write_text(UNUSED_IMPORT_CODE)
+        incremental = analyzer.analyze(repo, changed_files={"b.py"})
+        assert sorted(analyzer.analyzed) == ["b.py", "d.py"], analyzer.analyzed
+
+        # Merged results must match a from-scratch analysis
+        assert incremental == MultiLanguageAnalyzerService().analyze(repo)
+        assert not any(item["file"] == "b.py" for item in incremental)
+
+        # Deleted files drop out; an empty change set analyzes nothing
+        analyzer.analyzed.clear()
+        (repo / "c.py").unlink()
+        after_delete = analyzer.analyze(repo, changed_files=set())
+        assert analyzer.analyzed == []
+        assert not any(item["file"] == "c.py" for item in after_delete)
+
+        # After forget() the next call is a full analysis again
+        analyzer.forget(repo)
+        analyzer.analyze(repo, changed_files=set())
+        assert sorted(analyzer.analyzed) == ["a.py", "b.py", "d.py"]
+        print("✓ Incremental re-analysis only touches changed and new files")
+
+
+if __name__ == "__main__":
+    test_incremental_reanalysis()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Validation test for live streaming of test output into the failure parser.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.failure_parser import FailureParserService
+from app.services.output_stream import run_streaming
+from app.services.test_engine import TestEngineService
+
+SLOW_SUITE = """\
+import sys, time
+print('  File "src/calc.py", line 4, in add', flush=True)
+print("TypeError: unsupported operand", flush=True)
+print("warning: slow fixture", file=sys.stderr, flush=True)
+time.sleep(10)
+print("never reached", flush=True)
+"""
+
+
+def test_lines_arrive_while_the_process_runs():
+    async def scenario():
+        arrivals = []
+        started = time.perf_counter()
+
+        def on_line(stream, line):
+            arrivals.append((stream, line, time.perf_counter() - started))
+
+        command = [sys.executable, "-c", "import time; print('first', flush=True); time.sleep(1); print('second')"]
+        result = await run_streaming(command, timeout=10, on_line=on_line)
+        return arrivals, result
+
+    arrivals, result = asyncio.run(scenario())
+    assert [line for _, line, _ in arrivals] == ["first", "second"]
+    assert arrivals[1][2] - arrivals[0][2] > 0.5, "the first line must be seen before the process ends"
+    assert result.return_code == 0 and result.stdout == "first\nsecond" and not result.stopped_early
+    print(f"✓ First line arrived after {arrivals[0][2] * 1000:.0f} ms, before the process finished")
+
+
+def test_fail_fast_stops_slow_suite():
+    async def scenario():
+        live = FailureParserService.live(stop_after=1)
+        started = time.perf_counter()
+        result = await run_streaming([sys.executable, "-c", SLOW_SUITE], timeout=30, on_line=live.on_line)
+        return result, live.close(), time.perf_counter() - started
+
+    result, failures, elapsed = asyncio.run(scenario())
+    assert result.stopped_early and result.return_code != 0
+    assert "never reached" not in result.stdout
+    assert [(item["file"], item["line_number"], item["bug_type"]) for item in failures] == [
+        ("src/calc.py", 4, "TYPE_ERROR")
+    ]
+    assert elapsed < 5, f"suite was not stopped early ({elapsed:.1f}s)"
+    print(f"✓ Stopped the suite {elapsed:.2f}s in, after the first failure")
+
+
+def test_timeout_keeps_partial_output():
+    async def scenario():
+        return await run_streaming([sys.executable, "-c", SLOW_SUITE], timeout=1)
+
+    result = asyncio.run(scenario())
+    assert result.timed_out and "TypeError" in result.stdout
+    print("✓ Timed-out commands are killed and keep the output produced so far")
+
+
+def test_engine_streams_into_live_parser():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        (repo / "test_sample.py").write_text(
+            "import time\n\ndef test_a():\n    assert 1 == 2\n\ndef test_b():\n    time.sleep(10)\n"
+        )
+        engine = TestEngineService(use_docker=False)
+        live = FailureParserService.live(stop_after=1)
+        seen = []
+
+        def on_line(stream, line):
+            seen.append(line)
+            return live.on_line(stream, line)
+
+        started = time.perf_counter()
+        result = asyncio.run(engine.run_tests_async(repo, on_line=on_line, max_failures=1))
+        elapsed = time.perf_counter() - started
+
+        assert "--maxfail=1" in result.command
+        assert seen and result.return_code != 0
+        assert elapsed < 8, f"test_b should not have run ({elapsed:.1f}s)"
+        failures = FailureParserService().parse_result(result, live=live)
+        assert failures and failures[0]["bug_type"] == "LOGIC"
+    print("✓ Test engine hands output lines to the live parser")
+
+
+def test_interleaved_shards_keep_their_own_tracebacks():
+    live = FailureParserService.live(stop_after=2)
+    lines = [
+        ("shard1:stdout", '  File "src/a.py", line 3, in f'),
+        ("shard2:stdout", '  File "src/b.py", line 7, in g'),
+        ("shard1:stdout", "TypeError: unsupported operand"),
+    ]
+    assert not any(live.on_line(stream, line) for stream, line in lines)
+    assert live.on_line("shard2:stdout", "ImportError: cannot import name 'x'"), "counts merge across shards"
+    assert sorted((item["file"], item["line_number"], item["bug_type"]) for item in live.close()) == [
+        ("src/a.py", 3, "TYPE_ERROR"),
+        ("src/b.py", 7, "IMPORT"),
+    ]
+    print("✓ Concurrent shards' output is parsed per shard")
+
+
+if __name__ == "__main__":
+    test_lines_arrive_while_the_process_runs()
+    test_fail_fast_stops_slow_suite()
+    test_timeout_keeps_partial_output()
+    test_engine_streams_into_live_parser()
+    test_interleaved_shards_keep_their_own_tracebacks()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Validation test for parallel static analysis.
+Findings from the process pool must match in-process analysis exactly, including order.
+"""
+
+import tempfile
+from pathlib import Path
+
+from app.services.multi_language_analyzer import MultiLanguageAnalyzerService, _chunk_by_size
+
+PYTHON_CODE = """
+import os
+
+def average(numbers):
+    total = 0
+    for number in numbers:
+        total += number
+    return total / {divisor}
+"""
+
+JAVASCRIPT_CODE = """
+const total = (numbers) => {{
+    let sum = 0;
+    for (let num of numbers) {{
+        sum += num
+    }}
+    return sum / {divisor};
+}}
+"""
+
+
+def test_parallel_matches_sequential():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        for index in range(12):
+            (repo / f"module_{index}.py").write_text(PYTHON_CODE.format(divisor=index + 2) * (index + 1))
+            (repo / f"total_{index}.js").write_text(JAVASCRIPT_CODE.format(divisor=index + 2))
+
+        sequential = MultiLanguageAnalyzerService(workers=1).analyze(repo)
+
+        parallel_analyzer = MultiLanguageAnalyzerService(workers=2, parallel_min_bytes=0)
+        try:
+            parallel = parallel_analyzer.analyze(repo)
+        finally:
+            parallel_analyzer.shutdown()
+
+        assert parallel == sequential, "parallel findings must match sequential analysis"
+        print(f"✓ Parallel analysis matches sequential ({len(parallel)} findings)")
+
+
+def test_chunking_balances_bytes():
+    jobs = [("python", f"f{size}.py", "x" * size) for size in (900, 500, 400, 300, 100)]
+    chunks = _chunk_by_size(jobs, 2)
+    loads = sorted(sum(len(jobs[index][2]) for index in chunk) for chunk in chunks)
+    assert loads == [1000, 1200], loads
+    assert sorted(index for chunk in chunks for index in chunk) == list(range(len(jobs)))
+    print("✓ Chunks are balanced by source size")
+
+
+if __name__ == "__main__":
+    test_parallel_matches_sequential()
+    test_chunking_balances_bytes()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Validation test for pipelined iterations.
+Checks that speculative tests/analysis overlap the CI wait and are reused only while HEAD is unchanged.
+"""
+
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from git import Repo
+
+from app.services.runner import RunnerService
+from app.services.storage import StorageService
+from app.services.test_engine import TestRunResult
+
+
+def _workspace(root: Path) -> Path:
+    repo_dir = root / "repo"
+    repo_dir.mkdir()
+    (repo_dir / "app.py").write_text("x = 1\n", encoding="utf-8")
+    repo = Repo.init(repo_dir)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    repo.git.add(A=True)
+    repo.index.commit("initial")
+    return repo_dir
+
+
+def test_speculation_overlaps_ci_and_checks_revision():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        repo_dir = _workspace(root)
+        runner = RunnerService(storage=StorageService(data_dir=root / "data"))
+        outcome = ([], [{"file": "app.py", "line_number": 1, "bug_type": "LINTING"}])
+        stats = {"reused": 0, "discarded": 0}
+
+        async def slow_test_and_analyze(repo_dir, changed_files, cache_stats, on_analysis=None):
+            await asyncio.sleep(0.2)
+            cache_stats["misses"] += 1
+            return outcome
+
+        runner._test_and_analyze = slow_test_and_analyze
+
+        async def scenario() -> None:
+            started = time.perf_counter()
+            speculation = await runner._start_speculation(repo_dir, None)
+            await asyncio.sleep(0.2)  # CI wait
+            assert await runner._take_speculation(speculation, repo_dir, stats) == outcome
+            assert time.perf_counter() - started < 0.35, "speculative work must overlap the CI wait"
+            assert speculation.cache_stats == {"hits": 0, "misses": 1}
+
+            speculation = await runner._start_speculation(repo_dir, None)
+            (repo_dir / "app.py").write_text("x = 2\n", encoding="utf-8")
+            Repo(repo_dir).git.commit("-am", "moved on")
+            assert await runner._take_speculation(speculation, repo_dir, stats) is None
+
+            speculation = await runner._start_speculation(repo_dir, None)
+            await runner._discard_speculation(speculation, stats)
+            assert speculation.task.cancelled()
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            runner.execution.shutdown()
+        assert stats == {"reused": 1, "discarded": 2}
+        print("✓ Speculative attempts overlap CI and are reused only on the same commit")
+
+
+def test_discarded_speculation_waits_for_running_analysis():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        repo_dir = _workspace(root)
+        runner = RunnerService(storage=StorageService(data_dir=root / "data"))
+        analyzer = runner.multi_language_analyzer
+        analysis_started = threading.Event()
+
+        async def run_tests_async(repo_path, **options):
+            return TestRunResult(command=["pytest"], return_code=0, stdout="", stderr="")
+
+        def slow_analyze(repo_path, **options):
+            analysis_started.set()
+            time.sleep(0.3)
+            analyzer._snapshots[str(repo_path.resolve())] = {"app.py": []}
+            return []
+
+        runner.test_engine.run_tests_async = run_tests_async
+        analyzer.analyze = slow_analyze
+
+        async def scenario() -> None:
+            speculation = await runner._start_speculation(repo_dir, None)
+            while not analysis_started.is_set():
+                await asyncio.sleep(0.01)
+            await runner._discard_speculation(speculation, {"reused": 0, "discarded": 0})
+            analyzer.forget(repo_dir)  # as at the end of a run
+            await asyncio.sleep(0.4)
+            assert speculation.task.cancelled()
+            assert not analyzer._snapshots, "the analyzer thread wrote its snapshot after forget()"
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            runner.execution.shutdown()
+        print("✓ Discarding a speculation waits for analysis already running in its thread")
+
+
+if __name__ == "__main__":
+    test_speculation_overlaps_ci_and_checks_revision()
+    test_discarded_speculation_waits_for_running_analysis()
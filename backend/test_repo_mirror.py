@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Validation test for the repository mirror cache.
+Checks that workspaces clone from an incrementally fetched mirror and borrow its objects.
+"""
+
+import tempfile
+import threading
+from pathlib import Path
+
+from git import Repo
+
+from app.services.github_ops import GitHubOpsService
+from app.services.repo_mirror import RepositoryMirrorCache
+
+
+def _remote(root: Path) -> tuple[str, Repo]:
+    source = Repo.init(root / "source", initial_branch="main")
+    with source.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    (root / "source" / "app.py").write_text("x = 1\n", encoding="utf-8")
+    source.git.add(A=True)
+    source.index.commit("initial")
+    Repo.clone_from(str(root / "source"), root / "remote.git", bare=True)
+    source.create_remote("origin", str(root / "remote.git"))
+    return (root / "remote.git").as_uri(), source
+
+
+def test_workspaces_share_an_incrementally_fetched_mirror():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        remote_url, source = _remote(root)
+        mirrors = RepositoryMirrorCache(cache_dir=root / "mirrors")
+        github_ops = GitHubOpsService(mirrors=mirrors, clone_strategy="mirror")
+
+        first = github_ops.clone_repository(remote_url, root / "ws1")
+        github_ops.create_branch(first, "fix-1")
+        assert mirrors.stats == {"clones": 1, "fetches": 0}
+        assert (first / ".git" / "objects" / "info" / "alternates").exists(), "workspace must borrow mirror objects"
+        assert not list((first / ".git" / "objects" / "pack").iterdir())
+        assert Repo(first).remote("origin").url == remote_url, "pushes must go to the real remote"
+
+        (root / "source" / "app.py").write_text("x = 2\n", encoding="utf-8")
+        source.git.commit("-am", "upstream change")
+        source.git.push("origin", "main")
+
+        second = github_ops.clone_repository(remote_url, root / "ws2")
+        github_ops.create_branch(second, "fix-2")
+        assert mirrors.stats == {"clones": 1, "fetches": 1}
+        assert (second / "app.py").read_text() == "x = 2\n", "mirror fetch must pick up new commits"
+        print("✓ Workspaces clone from the shared mirror")
+
+
+def test_concurrent_runs_serialize_on_the_mirror():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        remote_url, _ = _remote(root)
+        mirrors = RepositoryMirrorCache(cache_dir=root / "mirrors")
+        errors: list[Exception] = []
+
+        def clone(index: int) -> None:
+            try:
+                mirrors.clone_workspace(remote_url, root / f"ws{index}")
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=clone, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors
+        assert mirrors.stats == {"clones": 1, "fetches": 3}
+        print("✓ Concurrent clones create the mirror once")
+
+
+if __name__ == "__main__":
+    test_workspaces_share_an_incrementally_fetched_mirror()
+    test_concurrent_runs_serialize_on_the_mirror()
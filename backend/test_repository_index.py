@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Validation test for the shared repository index.
+Checks language/role bucketing, ignored-directory pruning and the consumers that query it.
+"""
+
+import tempfile
+from pathlib import Path
+
+from app.agents.pipeline import TestDiscoveryAgent
+from app.services.repository_index import RepositoryIndex
+from app.services.static_analyzer import StaticAnalyzerService
+from app.services.test_engine import TestEngineService
+
+FILES = {
+    "app/main.py": "print('hi')\n",
+    "app/util.js": "const x = 1;\n",
+    "app/types.d.ts": "declare const y: number;\n",
+    "app/service.ts": "export const z = 1;\n",
+    "src/main/java/Calculator.java": "public class Calculator {}\n",
+    "src/test/java/CalculatorTest.java": "public class CalculatorTest {}\n",
+    "tests/test_main.py": "def test_ok():\n    assert True\n",
+    "web/button.test.js": "test('x', () => {});\n",
+    "requirements.txt": "pytest\n",
+    "package.json": "{}\n",
+    "node_modules/lib/test_vendored.py": "x = 1\n",
+    ".venv/lib/site.py": "x = 1\n",
+    "build/generated.java": "class Generated {}\n",
+}
+
+
+def _make_repo(root: Path) -> None:
+    for relative_path, content in FILES.items():
+        file_path = root / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+
+
+def test_repository_index_buckets():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_repo(root)
+        index = RepositoryIndex.build(root)
+
+        paths = {item.relative_path for item in index.files}
+        assert "node_modules/lib/test_vendored.py" not in paths, "node_modules should be pruned"
+        assert ".venv/lib/site.py" not in paths, ".venv should be pruned"
+        assert "build/generated.java" not in paths, "build output should be pruned"
+
+        python = [item.relative_path for item in index.files_for_language("python")]
+        assert python == ["app/main.py", "tests/test_main.py"]
+
+        typescript = [item.relative_path for item in index.files_for_language("typescript")]
+        assert typescript == ["app/service.ts"], ".d.ts files are not analyzable"
+
+        tests = {item.relative_path for item in index.tests()}
+        assert tests == {"src/test/java/CalculatorTest.java", "tests/test_main.py", "web/button.test.js"}
+
+        manifests = {item.relative_path for item in index.manifests()}
+        assert manifests == {"requirements.txt", "package.json"}
+        assert index.has_root_file("package.json")
+        assert not index.has_root_file("pom.xml")
+
+        print(f"✓ Indexed {len(index.files)} files, {len(tests)} tests, {len(manifests)} manifests")
+
+
+def test_consumers_use_index():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_repo(root)
+        index = RepositoryIndex.build(root)
+
+        discovered = TestDiscoveryAgent().discover(root, index)
+        assert root / "tests" / "test_main.py" in discovered
+        assert all("node_modules" not in path.parts for path in discovered)
+
+        command = TestEngineService(use_docker=False).detect_command(root, index)
+        assert command == ["python", "-m", "pytest", "-q"]
+
+        print("✓ Test discovery and command detection share the index")
+
+
+def test_python_manifests_are_still_analyzed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "setup.py").write_text("def build():\n    x = 1\n    return 2\n")
+        index = RepositoryIndex.build(root)
+
+        assert [item.relative_path for item in index.manifests()] == ["setup.py"]
+        assert [item.relative_path for item in index.files_for_language("python")] == ["setup.py"]
+        messages = [failure["message"] for failure in StaticAnalyzerService().analyze(root, index)]
+        assert "unused variable 'x'" in messages, messages
+        print("✓ setup.py is both a manifest and an analyzed Python file")
+
+
+if __name__ == "__main__":
+    test_repository_index_buckets()
+    test_consumers_use_index()
+    test_python_manifests_are_still_analyzed()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Validation test for live run events.
+Checks the event bus (resume, buffer overflow) and the SSE endpoint's Last-Event-ID handling.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+
+import app.main as api
+from app.services.run_events import RunEventBus
+from app.services.storage import StorageService
+
+
+def test_event_bus_resume_and_overflow():
+    async def scenario() -> None:
+        bus = RunEventBus(buffer_size=3, retention_seconds=60)
+        received: list[int] = []
+
+        async def consume(last_event_id: int) -> None:
+            async for event in bus.subscribe("r1", last_event_id):
+                received.append(event.id)
+
+        consumer = asyncio.create_task(consume(0))
+        await asyncio.sleep(0)
+        bus.publish("r1", "stage", {"stage": "tests"})
+        bus.publish("r1", "fix", {"file": "a.py"})
+        await asyncio.sleep(0.01)
+        assert received == [1, 2]
+
+        bus.publish("r1", "stage", {"stage": "push"})
+        bus.publish("r1", "run_completed", {"status": "PASSED"})
+        await asyncio.wait_for(consumer, timeout=1)
+        assert received == [1, 2, 3, 4]
+
+        assert bus.can_resume("r1", 2)
+        assert not bus.can_resume("r1", 0), "event 1 has left the 3-event buffer"
+
+    asyncio.run(scenario())
+    print("✓ Event bus delivers in order and detects resumable cursors")
+
+
+def test_sse_endpoint_resumes_from_last_event_id():
+    async def scenario(tmp: Path) -> str:
+        storage = StorageService(data_dir=tmp)
+        run = api.runner.build_initial_state("r2", api.RunRequest(
+            repository_url="https://github.com/o/r", team_name="T", team_leader_name="L"
+        ), "T_L_AI_Fix")
+        run["status"] = "PASSED"
+        storage.upsert_run("r2", run)
+        api.storage = api.runner.storage = storage
+
+        events = api.runner.events
+        events.publish("r2", "stage", {"stage": "tests"})
+        events.publish("r2", "fix", {"file": "a.py"})
+        events.publish("r2", "run_completed", run)
+
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/runs/r2/events", headers={"Last-Event-ID": "1"})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            return response.text
+
+    original_storage = api.storage
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            body = asyncio.run(scenario(Path(tmpdir)))
+    finally:
+        api.storage = api.runner.storage = original_storage
+
+    assert "event: snapshot" not in body, "a resumable cursor must not resend the snapshot"
+    assert "id: 1\n" not in body
+    assert "id: 2\nevent: fix" in body and "id: 3\nevent: run_completed" in body
+    print("✓ SSE endpoint resumes after Last-Event-ID")
+
+
+if __name__ == "__main__":
+    test_event_bus_resume_and_overflow()
+    test_sse_endpoint_resumes_from_last_event_id()
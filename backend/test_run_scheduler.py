@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Validation test for the run scheduler.
+Checks global and per-repository limits, priority/FIFO ordering and queue rejection.
+"""
+
+import asyncio
+
+from app.services.run_scheduler import QueueFullError, RunScheduler
+
+
+def test_limits_priority_and_backlog():
+    async def scenario() -> None:
+        scheduler = RunScheduler(max_concurrent=2, max_per_repo=1, max_queued=3)
+        gates: dict[str, asyncio.Event] = {}
+        started: list[str] = []
+
+        def job(run_id: str):
+            gates[run_id] = asyncio.Event()
+
+            async def run() -> None:
+                started.append(run_id)
+                await gates[run_id].wait()
+
+            return run
+
+        # a1 starts; a2 waits on the per-repo limit; b1 takes the second global slot
+        assert scheduler.submit("a1", "https://github.com/o/a", job("a1")) is None
+        assert scheduler.submit("a2", "https://github.com/o/a.git", job("a2")) == 1
+        assert scheduler.submit("b1", "https://github.com/o/b", job("b1")) is None
+        assert scheduler.submit("c1", "https://github.com/o/c", job("c1")) == 2
+        assert scheduler.submit("d1", "https://github.com/o/d", job("d1"), priority=5) == 1
+        await asyncio.sleep(0)
+        assert started == ["a1", "b1"]
+
+        # Backlog threshold: three runs waiting
+        assert not scheduler.has_capacity()
+        try:
+            scheduler.submit("e1", "https://github.com/o/e", job("e1"))
+            raise AssertionError("expected QueueFullError")
+        except QueueFullError:
+            pass
+
+        # Freeing a slot of repo b starts the highest-priority eligible run
+        gates["b1"].set()
+        await asyncio.sleep(0.01)
+        assert started == ["a1", "b1", "d1"]
+
+        # Repo a frees up: a2 goes before c1 (FIFO at equal priority)
+        gates["a1"].set()
+        await asyncio.sleep(0.01)
+        assert started[-1] == "a2"
+        assert scheduler.queue_position("c1") == 1
+
+        for gate in gates.values():
+            gate.set()
+        await asyncio.sleep(0.01)
+        assert started[-1] == "c1" and not scheduler.running
+
+    asyncio.run(scenario())
+    print("✓ Scheduler honours concurrency limits, priority order and the backlog threshold")
+
+
+def test_same_repo_burst_respects_backlog():
+    async def scenario() -> None:
+        scheduler = RunScheduler(max_concurrent=4, max_per_repo=1, max_queued=3)
+        release = asyncio.Event()
+
+        async def job() -> None:
+            await release.wait()
+
+        accepted, rejected = [], 0
+        for number in range(50):
+            try:
+                accepted.append(scheduler.submit(f"r{number}", "https://github.com/o/busy", job))
+            except QueueFullError:
+                rejected += 1
+        # One run starts, three wait; free global slots don't help runs of a busy repository
+        assert accepted == [None, 1, 2, 3] and rejected == 46, (accepted, rejected)
+        assert not scheduler.has_capacity("https://github.com/o/busy")
+        assert scheduler.has_capacity("https://github.com/o/idle"), "an idle repository can still start"
+        assert scheduler.submit("idle", "https://github.com/o/idle", job) is None
+
+        release.set()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    print("✓ A burst for one repository is rejected once the backlog is full")
+
+
+if __name__ == "__main__":
+    test_limits_priority_and_backlog()
+    test_same_repo_burst_respects_backlog()
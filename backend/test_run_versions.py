@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Validation test for versioned run reads.
+Checks the storage version counter, `since_version` deltas and ETag revalidation on GET /api/runs/{run_id}.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+
+import app.main as api
+from app.services.storage import SELECT_EVENTS_SINCE_SQL, SELECT_FIXES_SINCE_SQL, StorageService
+
+
+def _fix(index: int) -> dict:
+    return {
+        "file": f"src/module_{index}.py",
+        "bug_type": "LINTING",
+        "line_number": index + 1,
+        "commit_message": "[AI-AGENT] Remove unused import",
+        "status": "FIXED",
+        "expected_output": "remove the import",
+    }
+
+
+def test_since_version_returns_only_new_rows():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageService(data_dir=Path(tmpdir))
+        state = {"run_id": "r1", "status": "RUNNING", "fixes": [_fix(0), _fix(1)], "timeline": []}
+        assert storage.upsert_run("r1", state) == 1
+
+        state["fixes"].append(_fix(2))
+        assert storage.upsert_run("r1", state) == 2
+        state["timeline"].append(
+            {"iteration": 1, "retry_limit": 5, "status": "FAILED", "timestamp": "2026-01-01T00:00:00+00:00"}
+        )
+        assert storage.upsert_run("r1", state) == 3
+
+        delta = storage.get_run("r1", since_version=1)
+        assert delta["version"] == 3
+        assert delta["fixes"] == [_fix(2)]
+        assert [event["iteration"] for event in delta["timeline"]] == [1]
+        assert storage.get_run("r1", since_version=3)["fixes"] == []
+        assert len(storage.get_run("r1")["fixes"]) == 3
+        print("✓ since_version returns only rows added after that version")
+
+
+def test_etag_revalidation():
+    async def scenario(storage: StorageService) -> None:
+        run = api.runner.build_initial_state("r2", api.RunRequest(
+            repository_url="https://github.com/o/r", team_name="T", team_leader_name="L"
+        ), "T_L_AI_Fix")
+        run["status"] = "RUNNING"
+        storage.upsert_run("r2", run)
+
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/api/runs/r2")
+            assert first.status_code == 200
+            etag = first.headers["etag"]
+            assert first.json()["version"] == 1
+            assert first.json()["speculation"] == {"reused": 0, "discarded": 0}
+
+            unchanged = await client.get("/api/runs/r2", headers={"If-None-Match": etag})
+            assert unchanged.status_code == 304 and not unchanged.content
+            assert unchanged.headers["etag"] == etag
+
+            run["fixes"].append(_fix(0))
+            storage.upsert_run("r2", run)
+            changed = await client.get("/api/runs/r2", headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+            delta = await client.get("/api/runs/r2", params={"since_version": 1})
+            assert delta.json()["fixes"] == [_fix(0)] and delta.json()["since_version"] == 1
+
+            missing = await client.get("/api/runs/nope")
+            assert missing.status_code == 404
+
+    original_storage = api.storage
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            api.storage = api.runner.storage = StorageService(data_dir=Path(tmpdir))
+            asyncio.run(scenario(api.storage))
+    finally:
+        api.storage = api.runner.storage = original_storage
+    print("✓ Unchanged runs revalidate with 304 Not Modified")
+
+
+def test_since_version_reads_use_the_version_index():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageService(data_dir=Path(tmpdir))
+        conn = storage._connection()
+        for sql, index in (
+            (SELECT_FIXES_SINCE_SQL, "idx_fixes_run_version"),
+            (SELECT_EVENTS_SINCE_SQL, "idx_timeline_events_run_version"),
+        ):
+            plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, ("r1", 1)))
+            assert index in plan and "version>?" in plan, plan
+
+        # Databases at schema version 2 get the new indexes and lose the unused one
+        conn.execute("CREATE INDEX idx_fixes_run_status ON fixes(run_id, status)")
+        conn.execute("PRAGMA user_version = 2")
+        conn.commit()
+        storage.close()
+        conn = StorageService(data_dir=Path(tmpdir))._connection()
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_fixes_run_version", "idx_timeline_events_run_version"} <= indexes
+        assert "idx_fixes_run_status" not in indexes
+        print("✓ since_version reads search the (run_id, version) indexes")
+
+
+if __name__ == "__main__":
+    test_since_version_returns_only_new_rows()
+    test_since_version_reads_use_the_version_index()
+    test_etag_revalidation()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Validation test for the warm sandbox pool.
+Uses an in-memory executor so container lifecycle can be checked without Docker.
+"""
+
+import tempfile
+from pathlib import Path
+
+from app.services.docker_executor import ContainerExecResult
+from app.services.sandbox_pool import SandboxPool
+
+
+class RecordingExecutor:
+    image = "python:3.12-slim"
+
+    def __init__(self) -> None:
+        self.created: list[str] = []
+        self.stopped: list[str] = []
+        self.commands: list[tuple[str, list[str]]] = []
+        self.dead: set[str] = set()
+
+    def create_container(self, work_dir, name=None, image=None, extra_args=()):
+        container_id = f"c{len(self.created)}"
+        self.created.append(container_id)
+        return container_id
+
+    def execute_in_container(self, container_id, command, timeout=240):
+        self.commands.append((container_id, command))
+        return ContainerExecResult(container_id=container_id, return_code=0, stdout="", stderr="")
+
+    def is_running(self, container_id):
+        return container_id not in self.dead and container_id not in self.stopped
+
+    def stop_container(self, container_id):
+        self.stopped.append(container_id)
+
+
+def test_reuse_and_prepare_once():
+    executor = RecordingExecutor()
+    pool = SandboxPool(executor, max_size=2, idle_seconds=600)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+        for _ in range(3):
+            sandbox = pool.acquire(workspace)
+            pool.prepare(sandbox, "pytest", ["pip", "install", "-q", "pytest"])
+            pool.release(sandbox)
+
+        installs = [command for _, command in executor.commands if command[0] == "pip"]
+        assert executor.created == ["c0"], f"expected one container, got {executor.created}"
+        assert len(installs) == 1, "dependencies must be installed once per container"
+
+        pool.release_workspace(workspace)
+        assert executor.stopped == ["c0"] and not pool.sandboxes
+    print("✓ Sandbox reused across executions with a single dependency install")
+
+
+def test_health_check_and_limits():
+    executor = RecordingExecutor()
+    pool = SandboxPool(executor, max_size=1, idle_seconds=600)
+    with tempfile.TemporaryDirectory() as first_dir, tempfile.TemporaryDirectory() as second_dir:
+        first = pool.acquire(Path(first_dir))
+        pool.release(first)
+
+        # A dead container is replaced instead of reused
+        executor.dead.add(first.container_id)
+        replacement = pool.acquire(Path(first_dir))
+        assert replacement.container_id != first.container_id
+        assert first.container_id in executor.stopped
+        pool.release(replacement)
+
+        # Pool is full: the idle sandbox for another workspace is evicted
+        other = pool.acquire(Path(second_dir))
+        assert replacement.container_id in executor.stopped
+        pool.release(other, reusable=False)
+        assert not pool.sandboxes
+
+        # Idle timeout
+        pool.idle_seconds = 0.000001
+        idle = pool.acquire(Path(first_dir))
+        pool.release(idle)
+        pool.evict_idle()
+        assert idle.container_id in executor.stopped
+    print("✓ Unhealthy, over-capacity and idle sandboxes are discarded")
+
+
+if __name__ == "__main__":
+    test_reuse_and_prepare_once()
+    test_health_check_and_limits()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Validation test for sharded test execution balanced by historical durations.
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+from app.services.failure_parser import FailureParserService
+from app.services.repository_index import RepositoryIndex
+from app.services.test_engine import REPORT_DIR, TestEngineService
+from app.services.test_sharding import TestDurationStore, plan_shards, report_durations, shard_capacity
+
+TIMED_TEST = """\
+import json, time
+from pathlib import Path
+
+def test_timed():
+    started = time.time()
+    time.sleep(1)
+    Path("{name}.json").write_text(json.dumps([started, time.time()]))
+"""
+
+FAKE_JEST = """\
+#!/usr/bin/env node
+const fs = require("fs");
+const path = require("path");
+const args = process.argv.slice(2);
+if (args.includes("--listTests")) {{
+  for (const file of {files}) console.log(path.resolve(file));
+  process.exit(0);
+}}
+const files = args.slice(args.indexOf("--runTestsByPath") + 1).filter((arg) => !arg.startsWith("--"));
+fs.appendFileSync("ran.txt", files.join("\\n") + "\\n");
+"""
+
+
+def _write(root: Path, relative_path: str, content: str) -> Path:
+    path = root / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_shards_balanced_by_duration():
+    durations = {"a.py": 9.0, "b.py": 5.0, "c.py": 4.0, "d.py": 1.0, "e.py": 1.0}
+    shards = plan_shards(sorted(durations), durations, 2)
+    loads = sorted(sum(durations[file] for file in shard) for shard in shards)
+    assert loads == [10.0, 10.0], shards
+    # By file count alone a.py and b.py could share a shard (14s vs 6s)
+
+    # Files without history count as the median known duration
+    shards = plan_shards(["new.py", "slow.py", "fast.py"], {"slow.py": 8.0, "fast.py": 2.0}, 2)
+    assert shards == [["slow.py"], ["new.py", "fast.py"]], shards
+    assert plan_shards(["only.py"], {}, 4) == [["only.py"]]
+    assert shard_capacity(cpus=0.5) >= 2
+    assert shard_capacity(memory_bytes=1 << 60) == 1, "memory limits cap the shard count"
+    print("✓ Test files are split by historical duration, not file count")
+
+
+def test_durations_from_reports_are_smoothed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _write(root, "tests/test_a.py", "")
+        _write(root, "web/sum.test.js", "")
+        junit = _write(
+            root,
+            f"{REPORT_DIR}/pytest.xml",
+            '<testsuites><testsuite><testcase file="tests/test_a.py" name="x" time="1.5"/>'
+            '<testcase file="tests/test_a.py" name="y" time="0.5"/></testsuite></testsuites>',
+        )
+        jest = _write(
+            root,
+            f"{REPORT_DIR}/jest.json",
+            json.dumps({"testResults": [{"name": str(root / "web/sum.test.js"), "startTime": 1000, "endTime": 4000}]}),
+        )
+        observed = report_durations([junit, jest], RepositoryIndex.build(root))
+        assert observed == {"tests/test_a.py": 2.0, "web/sum.test.js": 3.0}, observed
+
+        store = TestDurationStore(root / "durations.db")
+        store.record("suite", observed)
+        store.record("suite", {"tests/test_a.py": 4.0})
+        assert store.get("suite") == {"tests/test_a.py": 3.0, "web/sum.test.js": 3.0}
+        assert store.get("other") == {}
+    print("✓ Per-file durations come from JUnit XML and Jest JSON reports")
+
+
+def test_engine_runs_shards_concurrently():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        # Files outside the index's test name patterns are still sharded: pytest lists them
+        _write(root, "pytest.ini", "[pytest]\npython_files = test_*.py check_*.py\n")
+        _write(root, "tests/test_one.py", TIMED_TEST.format(name="one"))
+        _write(root, "tests/check_two.py", TIMED_TEST.format(name="two"))
+        _write(root, "tests/test_fails.py", "def test_fails():\n    assert 1 == 2\n")
+        store = TestDurationStore(root / "durations.db")
+        history = {"tests/test_one.py": 1.0, "tests/check_two.py": 1.0, "tests/test_fails.py": 0.1}
+        store.record(str(root.resolve()), history)
+        # Fractional CPU limits let two shards fit on single-core hosts
+        engine = TestEngineService(use_docker=False, shard_count=2, sandbox_cpus=0.25, durations=store)
+
+        result = asyncio.run(engine.run_tests_async(root))
+        assert result.shards == 2 and result.return_code == 1
+        assert sorted(path.name for path in result.reports) == ["pytest-shard1.xml", "pytest-shard2.xml"]
+        one = json.loads((root / "one.json").read_text())
+        two = json.loads((root / "two.json").read_text())
+        assert one[0] < two[1] and two[0] < one[1], "slow files should run in different shards at once"
+
+        failures = FailureParserService().parse_result(result, RepositoryIndex.build(root))
+        assert [(item["file"], item["bug_type"]) for item in failures] == [("tests/test_fails.py", "LOGIC")]
+        recorded = store.get(str(root.resolve()))
+        assert recorded["tests/test_one.py"] >= 1.0 and set(recorded) == {
+            "tests/test_one.py",
+            "tests/check_two.py",
+            "tests/test_fails.py",
+        }, recorded
+    print("✓ Shards run concurrently and their reports merge into one failure list")
+
+
+def test_sandbox_limits_and_unsharded_frameworks():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _write(root, "pom.xml", "<project/>")
+        _write(root, "src/test/java/ATest.java", "class ATest {}")
+        _write(root, "src/test/java/BTest.java", "class BTest {}")
+        engine = TestEngineService(use_docker=False, shard_count=4, sandbox_cpus=0.25, sandbox_memory_bytes=1 << 20)
+
+        args = engine._sandbox_args(root)
+        assert args[-4:] == ("--cpus", "0.25", "--memory", str(1 << 20)), args
+        tests = ["src/test/java/ATest.java", "src/test/java/BTest.java"]
+        assert engine.shard_commands(root, tests) is None, "Maven builds share the workspace and are not sharded"
+    print("✓ Sandboxes get CPU and memory limits; Maven and Gradle run unsharded")
+
+
+def test_jest_shards_cover_every_listed_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        listed = ["a.test.js", "b.test.js", "c.spec.js", "__tests__/d.js", "e.test.tsx"]
+        for name in listed:
+            _write(root, name, "")
+        _write(root, "package.json", json.dumps({"scripts": {"test": "jest"}}))
+        # Stand-in for Jest: lists its tests, records the files each shard was asked to run
+        jest = _write(root, "node_modules/.bin/jest", FAKE_JEST.format(files=json.dumps(listed)))
+        jest.chmod(0o755)
+        engine = TestEngineService(use_docker=False, shard_count=2, sandbox_cpus=0.25)
+
+        result = asyncio.run(engine.run_tests_async(root))
+        assert result.shards == 2, result.output
+        ran = (root / "ran.txt").read_text().split()
+        assert sorted(ran) == sorted(listed), ran
+    print("✓ Every file Jest lists (spec files, __tests__, tsx) runs in some shard")
+
+
+if __name__ == "__main__":
+    test_shards_balanced_by_duration()
+    test_durations_from_reports_are_smoothed()
+    test_engine_runs_shards_concurrently()
+    test_sandbox_limits_and_unsharded_frameworks()
+    test_jest_shards_cover_every_listed_file()
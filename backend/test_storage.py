@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Validation test for run storage.
+Checks WAL mode, per-thread connection reuse and concurrent readers/writers.
+"""
+
+import tempfile
+import threading
+from pathlib import Path
+
+from app.services.storage import StorageService
+
+
+def test_wal_and_concurrent_access():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageService(data_dir=Path(tmpdir))
+        mode = storage._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal", f"expected WAL journal, got {mode}"
+        assert storage._connection() is storage._connection(), "connection must be reused per thread"
+
+        errors: list[Exception] = []
+
+        def writer(index: int) -> None:
+            try:
+                for iteration in range(50):
+                    storage.upsert_run(f"run-{index}", {"run_id": f"run-{index}", "iteration": iteration})
+            except Exception as error:
+                errors.append(error)
+
+        def reader(index: int) -> None:
+            try:
+                for _ in range(100):
+                    try:
+                        storage.get_run(f"run-{index % 4}")
+                    except KeyError:
+                        pass
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors
+        assert all(storage.get_run(f"run-{i}")["iteration"] == 49 for i in range(4))
+        assert all(storage.get_run_version(f"run-{i}") == 50 for i in range(4)), "every write bumps the version"
+        print("✓ WAL storage handles concurrent writers and readers")
+
+
+if __name__ == "__main__":
+    test_wal_and_concurrent_access()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Validation test for normalized run storage.
+Checks migration of legacy JSON rows and that updates only insert new fix/timeline rows.
+"""
+
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from app.services.storage import StorageService
+
+
+def _fix(index: int) -> dict:
+    return {
+        "file": f"src/module_{index}.py",
+        "bug_type": "LINTING",
+        "line_number": index + 1,
+        "commit_message": "[AI-AGENT] Remove unused import",
+        "status": "FIXED",
+        "expected_output": "remove the import",
+    }
+
+
+def _event(iteration: int) -> dict:
+    return {"iteration": iteration, "retry_limit": 5, "status": "FAILED", "timestamp": "2026-01-01T00:00:00+00:00"}
+
+
+def test_legacy_migration():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        legacy = {"run_id": "r1", "status": "FAILED", "fixes": [_fix(0), _fix(1)], "timeline": [_event(1)]}
+        with sqlite3.connect(Path(tmpdir) / "runs.db") as conn:
+            conn.execute("CREATE TABLE runs (run_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at TEXT NOT NULL)")
+            conn.execute("INSERT INTO runs VALUES (?, ?, ?)", ("r1", json.dumps(legacy), "2026-01-01"))
+
+        storage = StorageService(data_dir=Path(tmpdir))
+        assert storage.get_run("r1") == {**legacy, "version": 1}
+        stored_payload = storage._connection().execute("SELECT payload FROM runs").fetchone()[0]
+        assert "fixes" not in json.loads(stored_payload), "history must move out of the JSON payload"
+        print("✓ Legacy runs migrated into normalized tables")
+
+
+def test_updates_append_only_new_rows():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageService(data_dir=Path(tmpdir))
+        state = {"run_id": "r2", "status": "RUNNING", "fixes": [_fix(i) for i in range(1000)], "timeline": []}
+        storage.upsert_run("r2", state)
+
+        conn = storage._connection()
+        before = conn.total_changes
+        state["fixes"].append(_fix(1000))
+        state["timeline"].append(_event(1))
+        state["status"] = "PASSED"
+        storage.upsert_run("r2", state)
+        # One run row update + one fix + one timeline event, regardless of history size
+        assert conn.total_changes - before == 3, conn.total_changes - before
+
+        state["timeline"].append(_event(2))
+        storage.upsert_run("r2", state)
+        run = storage.get_run("r2")
+        assert run["status"] == "PASSED"
+        assert run["fixes"] == state["fixes"]
+        assert [event["iteration"] for event in run["timeline"]] == [1, 2]
+        print("✓ Updates write O(new rows)")
+
+
+if __name__ == "__main__":
+    test_legacy_migration()
+    test_updates_append_only_new_rows()
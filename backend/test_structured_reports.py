@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Validation test for structured test report ingestion (JUnit XML, Jest JSON).
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from git import Repo
+
+from app.services.failure_parser import FailureParserService
+from app.services.repository_index import RepositoryIndex
+from app.services.test_engine import REPORT_DIR, TestEngineService, TestRunResult
+
+SUREFIRE_REPORT = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="com.acme.CalcTest" tests="3" failures="1" errors="1">
+  <testcase name="adds" classname="com.acme.CalcTest" time="0.01"/>
+  <testcase name="subtracts" classname="com.acme.CalcTest" time="0.01">
+    <failure message="expected: &lt;1&gt; but was: &lt;2&gt;" type="org.opentest4j.AssertionFailedError">
+org.opentest4j.AssertionFailedError: expected: &lt;1&gt; but was: &lt;2&gt;
+	at org.junit.jupiter.api.AssertionUtils.fail(AssertionUtils.java:55)
+	at com.acme.CalcTest.subtracts(CalcTest.java:14)
+    </failure>
+    <system-out>lots of logging</system-out>
+  </testcase>
+  <testcase name="divides" classname="com.acme.CalcTest" time="0.01">
+    <error message="class java.lang.String cannot be cast" type="java.lang.ClassCastException">
+java.lang.ClassCastException: class java.lang.String cannot be cast
+	at com.acme.Calc.divide(Calc.java:9)
+	at com.acme.CalcTest.divides(CalcTest.java:20)
+    </error>
+  </testcase>
+</testsuite>
+"""
+
+JEST_REPORT = {
+    "numFailedTests": 1,
+    "testResults": [
+        {
+            "name": "/workspace/src/sum.test.js",
+            "status": "failed",
+            "message": "",
+            "assertionResults": [
+                {"status": "passed", "failureMessages": []},
+                {
+                    "status": "failed",
+                    "failureMessages": [
+                        "Error: expect(received).toBe(expected)\n"
+                        "    at Object.<anonymous> (/workspace/src/sum.test.js:5:17)\n"
+                        "    at Promise.then.completed (/workspace/node_modules/jest-circus/build/utils.js:298:28)"
+                    ],
+                },
+            ],
+        },
+        {
+            "name": "/workspace/src/broken.test.js",
+            "status": "failed",
+            "message": "SyntaxError: Unexpected token",
+            "assertionResults": [],
+        },
+    ],
+}
+
+
+def _write(root: Path, relative_path: str, content: str = "") -> Path:
+    path = root / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def _keys(failures):
+    return sorted((item["file"], item["line_number"], item["bug_type"]) for item in failures)
+
+
+def test_pytest_junit_report_fast_path():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        Repo.init(repo)
+        _write(repo, "src/calc.py", "def add(a, b):\n    return a + b\n")
+        _write(
+            repo,
+            "tests/test_calc.py",
+            "import sys; sys.path.insert(0, 'src')\nfrom calc import add\n\n"
+            "def test_add():\n    assert add(1, 1) == 3\n\n"
+            "def test_type():\n    add(1, 'x')\n",
+        )
+        index = RepositoryIndex.build(repo)
+        result = TestEngineService(use_docker=False).run_tests(repo, index=index)
+
+        assert result.reports == [repo / REPORT_DIR / "pytest.xml"], result.reports
+        failures = FailureParserService().parse_result(result, index)
+        assert _keys(failures) == [("src/calc.py", 2, "TYPE_ERROR"), ("tests/test_calc.py", 5, "LOGIC")]
+        type_error = next(item for item in failures if item["bug_type"] == "TYPE_ERROR")
+        assert type_error["message"].startswith("TypeError: unsupported operand")
+        assert REPORT_DIR not in Repo(repo).git.status("--porcelain"), "reports must not be committed"
+    print("✓ pytest failures come from the JUnit report with source locations")
+
+
+def test_surefire_and_jest_reports():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        _write(repo, "src/main/java/com/acme/Calc.java")
+        _write(repo, "src/test/java/com/acme/CalcTest.java")
+        _write(repo, "src/sum.test.js")
+        _write(repo, "src/broken.test.js")
+        surefire = _write(repo, "target/surefire-reports/TEST-com.acme.CalcTest.xml", SUREFIRE_REPORT)
+        jest = _write(repo, f"{REPORT_DIR}/jest.json", json.dumps(JEST_REPORT))
+        index = RepositoryIndex.build(repo)
+
+        failures = FailureParserService().parse_reports([surefire, jest], index)
+        assert _keys(failures) == [
+            ("src/broken.test.js", 1, "SYNTAX"),
+            ("src/main/java/com/acme/Calc.java", 9, "LOGIC"),
+            ("src/sum.test.js", 5, "LOGIC"),
+            ("src/test/java/com/acme/CalcTest.java", 14, "LOGIC"),
+        ], _keys(failures)
+        calc = next(item for item in failures if item["file"].endswith("Calc.java"))
+        assert calc["message"] == "java.lang.ClassCastException: class java.lang.String cannot be cast"
+    print("✓ Surefire XML and Jest JSON resolve to repository files")
+
+
+def test_falls_back_to_output_scraping():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        truncated = _write(repo, f"{REPORT_DIR}/pytest.xml", "<testsuites><testsuite><testcase")
+        output = '  File "src/app.py", line 3\nImportError: cannot import name "x"\n'
+        parser = FailureParserService()
+
+        assert parser.parse_reports([truncated]) is None
+        result = TestRunResult(command=[], return_code=1, stdout=output, stderr="", reports=[truncated])
+        assert _keys(parser.parse_result(result)) == [("src/app.py", 3, "IMPORT")]
+
+        empty = _write(repo, f"{REPORT_DIR}/empty.xml", "<testsuites><testsuite/></testsuites>")
+        crashed = TestRunResult(command=[], return_code=4, stdout=output, stderr="", reports=[empty])
+        assert _keys(parser.parse_result(crashed)) == [("src/app.py", 3, "IMPORT")]
+        passed = TestRunResult(command=[], return_code=0, stdout=output, stderr="", reports=[empty])
+        assert parser.parse_result(passed) == []
+    print("✓ Unreadable or empty reports of failed runs fall back to log scraping")
+
+
+def test_stale_reports_are_ignored():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir)
+        stale = _write(repo, "build/test-results/test/TEST-Old.xml", "<testsuite/>")
+        old = time.time() - 3600
+        os.utime(stale, (old, old))
+        fresh = _write(repo, "build/test-results/test/TEST-New.xml", "<testsuite/>")
+        assert TestEngineService.collect_reports(repo, int(time.time()) - 60) == [fresh]
+    print("✓ Reports older than the test execution are not ingested")
+
+
+if __name__ == "__main__":
+    test_pytest_junit_report_fast_path()
+    test_surefire_and_jest_reports()
+    test_falls_back_to_output_scraping()
+    test_stale_reports_are_ignored()
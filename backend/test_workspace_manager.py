@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Validation test for workspace retention, quotas and background garbage collection.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.services import workspace_manager
+from app.services.workspace_manager import WorkspaceManager, WorkspaceQuotaExceededError
+
+
+def _make_run(root: Path, run_id: str, size: int, age_seconds: float) -> None:
+    workspace = root / "workspaces" / run_id
+    workspace.mkdir(parents=True)
+    (workspace / "blob.bin").write_bytes(b"x" * size)
+    results = root / "data" / f"results_{run_id}.json"
+    results.parent.mkdir(exist_ok=True)
+    results.write_text("{}", encoding="utf-8")
+    stamp = time.time() - age_seconds
+    for path in (workspace, results):
+        os.utime(path, (stamp, stamp))
+
+
+def _manager(root: Path, **limits) -> WorkspaceManager:
+    options = {"max_age_seconds": 0, "max_count": 0, "max_total_bytes": 0, "quota_bytes": 0}
+    options.update(limits)
+    return WorkspaceManager(root / "workspaces", root / "data", **options)
+
+
+def test_retention_by_age_count_and_bytes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_run(root, "old", 100, age_seconds=3600)
+        _make_run(root, "a", 100, age_seconds=30)
+        _make_run(root, "b", 100, age_seconds=20)
+        _make_run(root, "c", 100, age_seconds=10)
+        (root / "data" / "results.json").write_text("{}", encoding="utf-8")
+
+        manager = _manager(root, max_age_seconds=600)
+        reclaimed = manager.collect()
+        assert reclaimed == 102 and not (root / "workspaces" / "old").exists()
+        assert not (root / "data" / "results_old.json").exists()
+
+        manager = _manager(root, max_count=2)
+        manager.collect(active_run_ids=["a"])
+        assert sorted(path.name for path in (root / "workspaces").iterdir()) == ["a", "c"], "active runs are kept"
+
+        manager = _manager(root, max_total_bytes=150)
+        manager.collect()
+        assert [path.name for path in (root / "workspaces").iterdir()] == ["c"]
+        assert (root / "data" / "results.json").exists(), "the latest results file is not a run artifact"
+        assert manager.stats["removed_workspaces"] == 1 and manager.stats["removed_results"] == 1
+        assert manager.stats["reclaimed_bytes"] == 102
+    print("✓ Finished runs are collected by age, count and total size")
+
+
+def test_quota_removes_oversized_workspace():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_run(root, "big", 500, age_seconds=0)
+        manager = _manager(root, quota_bytes=1000)
+        assert manager.enforce_quota(root / "workspaces" / "big") == 500
+
+        (root / "workspaces" / "big" / "deps.bin").write_bytes(b"x" * 600)
+        try:
+            manager.enforce_quota(root / "workspaces" / "big")
+        except WorkspaceQuotaExceededError:
+            pass
+        else:
+            raise AssertionError("quota was not enforced")
+        assert not (root / "workspaces" / "big").exists()
+        assert manager.stats["quota_violations"] == 1
+    print("✓ Workspaces over the per-run quota fail the run and are deleted")
+
+
+def test_undeletable_files_are_not_reclaimed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_run(root, "owned", 100, age_seconds=3600)
+        stuck = root / "workspaces" / "owned" / "root-owned.bin"
+        stuck.write_bytes(b"x" * 40)
+        os.utime(stuck.parent, (time.time() - 3600,) * 2)
+
+        # Stand-in for rmtree(ignore_errors=True) skipping files it may not delete
+        def rmtree(path, ignore_errors=False):
+            for entry in Path(path).iterdir():
+                if entry != stuck:
+                    entry.unlink()
+
+        original = workspace_manager.shutil.rmtree
+        workspace_manager.shutil.rmtree = rmtree
+        try:
+            manager = _manager(root, max_age_seconds=600)
+            reclaimed = manager.collect()
+        finally:
+            workspace_manager.shutil.rmtree = original
+        assert reclaimed == 102, "only the bytes that are gone count"
+        assert manager.snapshot() == {
+            "collections": 1,
+            "removed_workspaces": 0,
+            "removed_results": 1,
+            "reclaimed_bytes": 102,
+            "quota_violations": 0,
+        }, manager.snapshot()
+    print("✓ Files a delete leaves behind are not counted as reclaimed")
+
+
+def test_counters_from_concurrent_quota_checks():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        manager = _manager(root, quota_bytes=1)
+
+        def over_quota(position: int) -> None:
+            workspace = root / "workspaces" / f"run{position}"
+            workspace.mkdir(parents=True)
+            (workspace / "blob.bin").write_bytes(b"xx")
+            try:
+                manager.enforce_quota(workspace)
+            except WorkspaceQuotaExceededError:
+                pass
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(over_quota, range(200)))
+        assert manager.snapshot()["quota_violations"] == 200
+    print("✓ Counters updated from executor threads don't lose increments")
+
+
+def test_background_collection():
+    async def scenario(root: Path) -> None:
+        manager = _manager(root, max_count=1, interval_seconds=0.01)
+        manager.start(lambda: [])
+        for _ in range(100):
+            if manager.stats["collections"]:
+                break
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        assert [path.name for path in (root / "workspaces").iterdir()] == ["new"]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_run(root, "stale", 10, age_seconds=60)
+        _make_run(root, "new", 10, age_seconds=0)
+        asyncio.run(scenario(root))
+    print("✓ Background task collects on its interval and stops cleanly")
+
+
+if __name__ == "__main__":
+    test_retention_by_age_count_and_bytes()
+    test_quota_removes_oversized_workspace()
+    test_undeletable_files_are_not_reclaimed()
+    test_counters_from_concurrent_quota_checks()
+    test_background_collection()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API read latency while runs are executing.
+
+Starts N concurrent runs against synthetic repositories (git/GitHub calls are replaced
+by local stand-ins with fixed delays; tests, analysis and patching are real) and polls
+GET /api/runs/{id} throughout, reporting p50/p95/p99 latency measured from each poll's scheduled time.
+
+--inline reproduces the previous behaviour (blocking stages called on the event loop).
+
+Run from backend/:
+    python -m tools.bench_api_latency --runs 4 --files 300
+    python -m tools.bench_api_latency --runs 4 --files 300 --inline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+import app.main as api
+from app.services.ci_poll_scheduler import CIPollScheduler
+from app.services.execution import ExecutionLayer
+from app.services.github_ops import GitHubOpsService, WorkflowRunPoll
+from app.services.multi_language_analyzer import MultiLanguageAnalyzerService
+from app.services.runner import RunnerService
+from app.services.storage import StorageService
+from app.services.test_engine import TestEngineService
+from tools.bench_static_analyzer import build_repository
+
+PASSING_TEST = "def test_ok():\n    assert True\n"
+
+
+class LocalGitHubOps(GitHubOpsService):
+    """Stand-in for git/GitHub: blocking sleeps model network time, repositories are generated."""
+
+    def __init__(self, files: int, network_delay: float) -> None:
+        super().__init__()
+        self.files = files
+        self.network_delay = network_delay
+
+    def clone_repository(self, repo_url: str, target_path: Path) -> Path:
+        time.sleep(self.network_delay)
+        target_path.mkdir(parents=True, exist_ok=True)
+        build_repository(target_path, self.files)
+        (target_path / "test_ok.py").write_text(PASSING_TEST, encoding="utf-8")
+        return target_path
+
+    def create_branch(self, repo_path: Path, branch_name: str, base_branch: str = "main") -> str:
+        return branch_name
+
+    def commit_changes(self, repo_path: Path, commit_message: str) -> tuple[bool, str]:
+        return True, commit_message
+
+    def push_branch(self, repo_path: Path, branch_name: str) -> None:
+        time.sleep(self.network_delay)
+
+    def workspace_revision(self, repo_path: Path) -> str | None:
+        return None  # generated workspaces are not git repositories
+
+    async def fetch_workflow_run(self, owner: str, repo: str, branch_name: str) -> WorkflowRunPoll:
+        await asyncio.sleep(self.network_delay)
+        return WorkflowRunPoll({"status": "completed", "conclusion": "success", "html_url": None}, False)
+
+
+class InlineExecution(ExecutionLayer):
+    """Calls blocking stages directly on the event loop (previous behaviour)."""
+
+    async def run_io(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    async def run_cpu(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+def build_runner(root: Path, files: int, network_delay: float, inline: bool) -> tuple[StorageService, RunnerService]:
+    storage = StorageService(data_dir=root / "data")
+    runner = RunnerService(storage=storage)
+    runner.work_dir = root / "workspaces"
+    runner.work_dir.mkdir()
+    runner.github_ops = LocalGitHubOps(files, network_delay)
+    runner.ci_poller = CIPollScheduler(runner.github_ops)
+    runner.test_engine = TestEngineService(use_docker=False)
+    runner.multi_language_analyzer = MultiLanguageAnalyzerService(workers=1)
+    if inline:
+        runner.execution = InlineExecution(io_workers=1, cpu_workers=1)
+        engine = runner.test_engine
+
+        async def blocking_run_tests(repo_path, timeout_seconds=240, index=None, on_line=None, max_failures=0, changed_files=None):
+            return engine.run_tests(repo_path, timeout_seconds=timeout_seconds, index=index)
+
+        engine.run_tests_async = blocking_run_tests
+    return storage, runner
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def measure(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage, runner = build_runner(Path(tmpdir), args.files, args.network_delay, args.inline)
+        api.storage, api.runner = storage, runner
+
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            run_ids = []
+            for index in range(args.runs):
+                response = await client.post(
+                    "/api/runs",
+                    json={
+                        "repository_url": f"https://github.com/bench/repo-{index}",
+                        "team_name": "Bench",
+                        "team_leader_name": f"Leader {index}",
+                        "retry_limit": 2,
+                    },
+                )
+                run_ids.append(response.json()["run_id"])
+
+            # Latency is measured from when each poll was due, so time spent waiting for a
+            # blocked event loop counts (avoids coordinated omission)
+            latencies: list[float] = []
+            finished: set[str] = set()
+            started = time.perf_counter()
+
+            async def poll(run_id: str) -> None:
+                due = started
+                while time.perf_counter() - started < args.max_seconds:
+                    response = await client.get(f"/api/runs/{run_id}")
+                    latencies.append((time.perf_counter() - due) * 1000)
+                    if response.json()["status"] in {"PASSED", "FAILED"}:
+                        finished.add(run_id)
+                        return
+                    due += args.interval
+                    await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+            await asyncio.gather(*(poll(run_id) for run_id in run_ids))
+            elapsed = time.perf_counter() - started
+
+            # Let the runs finish their cleanup before the executors shut down
+            background = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            await asyncio.gather(*background, return_exceptions=True)
+
+        runner.execution.shutdown()
+
+    mode = "inline (blocking)" if args.inline else "execution layer"
+    print("=" * 70)
+    print(f"API latency benchmark: {args.runs} concurrent runs, {args.files} files each, {mode}")
+    print("=" * 70)
+    print(f"  requests:   {len(latencies)} over {elapsed:.1f}s ({len(finished)}/{args.runs} runs finished)")
+    print(f"  p50:        {statistics.median(latencies):8.1f} ms")
+    print(f"  p95:        {percentile(latencies, 95):8.1f} ms")
+    print(f"  p99:        {percentile(latencies, 99):8.1f} ms")
+    print(f"  max:        {max(latencies):8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=4)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--network-delay", type=float, default=0.5)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--max-seconds", type=float, default=120)
+    parser.add_argument("--inline", action="store_true")
+    asyncio.run(measure(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
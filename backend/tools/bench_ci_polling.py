@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GitHub Actions polling against the local fake API (tools.fake_github).
+
+Polls N branches concurrently until their workflow runs complete and reports API
+requests, rate-limit cost, client connections and per-poll latency.
+
+--legacy runs the previous client (new AsyncClient per poll, no conditional requests).
+--scheduler waits through the shared CIPollScheduler (adaptive intervals, coalescing);
+--waiters sets how many runs wait on each branch.
+
+Run from backend/:
+    python -m tools.bench_ci_polling --branches 8 --complete-after 6 --interval 0.5
+    python -m tools.bench_ci_polling --branches 8 --complete-after 6 --interval 0.5 --legacy
+    python -m tools.bench_ci_polling --branches 8 --complete-after 6 --interval 0.5 --waiters 2 --scheduler
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import uvicorn
+
+from app.services.ci_poll_scheduler import CIPollScheduler
+from app.services.github_ops import GitHubOpsService, WorkflowRunPoll
+from tools.fake_github import create_app
+
+
+class LegacyGitHubOps(GitHubOpsService):
+    """The previous polling client: a fresh AsyncClient and an unconditional GET per poll."""
+
+    async def fetch_workflow_run(self, owner: str, repo: str, branch_name: str) -> WorkflowRunPoll:
+        async with httpx.AsyncClient(timeout=20) as client:
+            response = await client.get(
+                f"{self.api_url}/repos/{owner}/{repo}/actions/runs",
+                params={"branch": branch_name, "per_page": 10},
+            )
+            response.raise_for_status()
+            payload = response.json()
+        self.api_stats["requests"] += 1
+        runs = payload.get("workflow_runs", [])
+        return WorkflowRunPoll(runs[0] if runs else None, False)
+
+
+class TimedPolls:
+    """Wraps `fetch_workflow_run` to record each call's latency."""
+
+    def __init__(self, service: GitHubOpsService) -> None:
+        self.latencies: list[float] = []
+        original = service.fetch_workflow_run
+
+        async def timed(owner: str, repo: str, branch_name: str) -> WorkflowRunPoll:
+            started = time.perf_counter()
+            try:
+                return await original(owner, repo, branch_name)
+            finally:
+                self.latencies.append(time.perf_counter() - started)
+
+        service.fetch_workflow_run = timed
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--branches", type=int, default=8)
+    parser.add_argument("--complete-after", type=float, default=6.0)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between polls")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added fake API response delay")
+    parser.add_argument("--waiters", type=int, default=1, help="runs waiting on each branch")
+    parser.add_argument("--legacy", action="store_true")
+    parser.add_argument("--scheduler", action="store_true")
+    args = parser.parse_args()
+
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(args.complete_after, latency_ms=args.latency_ms),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    api_url = f"http://127.0.0.1:{port}"
+    service = LegacyGitHubOps(api_url=api_url) if args.legacy else GitHubOpsService(api_url=api_url)
+    timer = TimedPolls(service)
+    poller = CIPollScheduler(service, min_interval=args.interval, max_interval=args.interval * 6)
+
+    async def wait(branch: str) -> tuple[str, str | None]:
+        if args.scheduler:
+            return await poller.wait_for_completion("owner", "repo", branch, timeout_seconds=120)
+        return await service.poll_ci_status("owner", "repo", branch, timeout_seconds=120, poll_interval=args.interval)
+
+    async def run() -> dict:
+        await asyncio.gather(
+            *(wait(f"branch-{index}") for index in range(args.branches) for _ in range(args.waiters))
+        )
+        await service.aclose()
+        async with httpx.AsyncClient() as client:
+            return (await client.get(f"{api_url}/_stats")).json()
+
+    started = time.perf_counter()
+    stats = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    server.should_exit = True
+    thread.join()
+
+    latencies = sorted(latency * 1000 for latency in timer.latencies)
+    mode = "legacy (client per poll, unconditional)" if args.legacy else "pooled client, If-None-Match"
+    if args.scheduler:
+        mode += ", poll scheduler"
+    print("=" * 70)
+    print(f"CI polling benchmark: {args.branches} branches x {args.waiters} waiters, {args.interval}s interval, {mode}")
+    print("=" * 70)
+    print(f"  wall time:        {elapsed:8.2f} s")
+    print(f"  API requests:     {stats['requests']:8d}")
+    print(f"  304 responses:    {stats['not_modified']:8d}")
+    print(f"  rate limit used:  {stats['rate_limit_used']:8d}")
+    print(f"  connections:      {stats['connections'] - 1:8d}")  # minus the /_stats request
+    print(
+        f"  poll latency:     p50 {statistics.median(latencies):6.2f} ms   "
+        f"p99 {latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]:6.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
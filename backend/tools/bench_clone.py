@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: workspace clone time and disk use per run, by clone strategy.
+
+Builds a local bare "remote" with --files modules and --commits commits of history,
+then clones --runs workspaces the way GitHubOpsService does (clone + create_branch)
+and reports time per run and the size of each workspace's .git directory.
+
+Run from backend/:
+    python -m tools.bench_clone --files 2000 --commits 50 --runs 5 --strategy full
+    python -m tools.bench_clone --files 2000 --commits 50 --runs 5 --strategy mirror
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from git import Repo
+
+from app.services.github_ops import GitHubOpsService
+from app.services.repo_mirror import RepositoryMirrorCache
+from tools.bench_static_analyzer import build_repository
+
+
+def build_remote(root: Path, files: int, commits: int) -> str:
+    source_dir = root / "source"
+    source_dir.mkdir()
+    source = Repo.init(source_dir, initial_branch="main")
+    with source.config_writer() as config:
+        config.set_value("user", "name", "Bench")
+        config.set_value("user", "email", "bench@example.com")
+    build_repository(source_dir, files)
+    source.git.add(A=True)
+    source.index.commit("initial")
+    for index in range(commits - 1):
+        (source_dir / "CHANGELOG.txt").write_text(f"change {index}\n" * (index + 1), encoding="utf-8")
+        source.git.add(A=True)
+        source.index.commit(f"change {index}")
+    Repo.clone_from(str(source_dir), root / "remote.git", bare=True)
+    # file:// forces the pack transport instead of hardlinking local objects
+    return (root / "remote.git").as_uri()
+
+
+def directory_bytes(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--commits", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--strategy", default="mirror", choices=["full", "mirror"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        remote_url = build_remote(root, args.files, args.commits)
+        github_ops = GitHubOpsService(
+            mirrors=RepositoryMirrorCache(cache_dir=root / "mirrors"),
+            clone_strategy=args.strategy,
+        )
+
+        timings: list[float] = []
+        git_sizes: list[int] = []
+        for run in range(args.runs):
+            workspace = root / "workspaces" / f"run-{run}"
+            started = time.perf_counter()
+            github_ops.clone_repository(remote_url, workspace)
+            github_ops.create_branch(workspace, f"fix-{run}")
+            timings.append(time.perf_counter() - started)
+            git_sizes.append(directory_bytes(workspace / ".git"))
+
+        mirror_bytes = directory_bytes(root / "mirrors") if (root / "mirrors").exists() else 0
+
+    print("=" * 70)
+    print(f"Clone benchmark: {args.files} files, {args.commits} commits, {args.runs} runs, strategy {args.strategy}")
+    print("=" * 70)
+    print(f"  first run:          {timings[0] * 1000:8.0f} ms   .git {git_sizes[0] / 1024:8.0f} KiB")
+    if len(timings) > 1:
+        print(
+            f"  later runs (mean):  {statistics.mean(timings[1:]) * 1000:8.0f} ms   "
+            f".git {statistics.mean(git_sizes[1:]) / 1024:8.0f} KiB"
+        )
+    if mirror_bytes:
+        print(f"  shared mirror:      {mirror_bytes / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
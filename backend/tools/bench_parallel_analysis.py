@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: multi-language analysis scaling with the number of worker processes.
+
+Builds the synthetic repository from bench_static_analyzer and times
+MultiLanguageAnalyzerService.analyze (no cache) for each worker count.
+
+Run from backend/:
+    python -m tools.bench_parallel_analysis --files 5000 --workers 1 2 4 8 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.multi_language_analyzer import MultiLanguageAnalyzerService
+from app.services.repository_index import RepositoryIndex
+from tools.bench_static_analyzer import build_repository
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        build_repository(root, args.files)
+        index = RepositoryIndex.build(root)
+
+        print("=" * 70)
+        print(f"Parallel analysis benchmark: {args.files} Python files")
+        print("=" * 70)
+        baseline = None
+        reference = None
+        for workers in args.workers:
+            analyzer = MultiLanguageAnalyzerService(workers=workers, parallel_min_bytes=0)
+            try:
+                if workers > 1:
+                    # Start the pool outside the timed section, as a long-lived server would
+                    analyzer._get_pool().submit(int).result()
+                started = time.perf_counter()
+                failures = analyzer.analyze(root, index=index)
+                elapsed = time.perf_counter() - started
+            finally:
+                analyzer.shutdown()
+
+            reference = reference if reference is not None else failures
+            assert failures == reference, "parallel findings differ from the sequential run"
+            baseline = baseline or elapsed
+            print(f"  workers={workers:<3} {elapsed:7.2f}s  speedup {baseline / elapsed:5.2f}x  ({len(failures)} findings)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: run wall time with and without pipelined iterations.
+
+Executes one run end to end against a synthetic git repository (with a slow test) and
+a simulated CI that takes --ci-seconds per push and fails every push, so the run
+uses all --iterations. With pipelining the next iteration's tests and analysis
+run while CI is pending.
+
+--sequential disables pipelining (PIPELINED_ITERATIONS=false behaviour).
+
+Run from backend/:
+    python -m tools.bench_pipelined_runs --iterations 3 --ci-seconds 3 --test-seconds 2
+    python -m tools.bench_pipelined_runs --iterations 3 --ci-seconds 3 --test-seconds 2 --sequential
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from git import Repo
+
+from app.models.api import RunRequest
+from app.services.ci_poll_scheduler import CIPollScheduler
+from app.services.github_ops import GitHubOpsService, WorkflowRunPoll
+from app.services.multi_language_analyzer import MultiLanguageAnalyzerService
+from app.services.runner import RunnerService
+from app.services.storage import StorageService
+from app.services.test_engine import TestEngineService
+from tools.bench_static_analyzer import build_repository
+
+SLOW_TEST = "import time\n\n\ndef test_slow():\n    time.sleep({seconds})\n    assert True\n"
+
+
+class SimulatedGitHub(GitHubOpsService):
+    """Local git repository; pushes are no-ops and CI finishes --ci-seconds after each push, failing."""
+
+    def __init__(self, files: int, test_seconds: float, ci_seconds: float) -> None:
+        super().__init__()
+        self.files = files
+        self.test_seconds = test_seconds
+        self.ci_seconds = ci_seconds
+        self.pushed_at = 0.0
+
+    def clone_repository(self, repo_url: str, target_path: Path) -> Path:
+        target_path.mkdir(parents=True, exist_ok=True)
+        build_repository(target_path, self.files)
+        (target_path / "test_slow.py").write_text(SLOW_TEST.format(seconds=self.test_seconds), encoding="utf-8")
+        (target_path / ".gitignore").write_text("__pycache__/\n.pytest_cache/\n", encoding="utf-8")
+        repo = Repo.init(target_path)
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "Bench")
+            config.set_value("user", "email", "bench@example.com")
+        repo.git.add(A=True)
+        repo.git.commit("-m", "initial")
+        return target_path
+
+    def create_branch(self, repo_path: Path, branch_name: str, base_branch: str = "main") -> str:
+        Repo(repo_path).git.checkout("-b", branch_name)
+        return branch_name
+
+    def push_branch(self, repo_path: Path, branch_name: str) -> None:
+        self.pushed_at = time.monotonic()
+
+    async def fetch_workflow_run(self, owner: str, repo: str, branch_name: str) -> WorkflowRunPoll:
+        done = time.monotonic() - self.pushed_at >= self.ci_seconds
+        run = {"status": "completed" if done else "in_progress", "conclusion": "failure" if done else None}
+        return WorkflowRunPoll({**run, "html_url": None}, False)
+
+
+async def execute(args: argparse.Namespace, root: Path) -> float:
+    runner = RunnerService(storage=StorageService(data_dir=root / "data"))
+    runner.work_dir = root / "workspaces"
+    runner.work_dir.mkdir()
+    runner.github_ops = SimulatedGitHub(args.files, args.test_seconds, args.ci_seconds)
+    runner.ci_poller = CIPollScheduler(runner.github_ops, min_interval=0.05, max_interval=0.1)
+    runner.test_engine = TestEngineService(use_docker=False)
+    runner.multi_language_analyzer = MultiLanguageAnalyzerService(workers=1)
+    runner.pipelined = not args.sequential
+
+    payload = RunRequest(
+        repository_url="https://github.com/bench/pipelined",
+        team_name="Bench",
+        team_leader_name="Leader",
+        retry_limit=args.iterations,
+    )
+    run_id = await runner.start_run(payload)
+    started = time.perf_counter()
+    await runner.execute_run(run_id=run_id, payload=payload)
+    elapsed = time.perf_counter() - started
+    runner.execution.shutdown()
+
+    run = runner.storage.get_run(run_id)
+    print(f"  status:     {run['status']} after {len(run['timeline'])} iterations")
+    print(f"  speculative attempts: {runner.speculation_stats['reused']} reused, {runner.speculation_stats['discarded']} discarded")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--test-seconds", type=float, default=2.0)
+    parser.add_argument("--ci-seconds", type=float, default=3.0)
+    parser.add_argument("--sequential", action="store_true")
+    args = parser.parse_args()
+
+    mode = "sequential" if args.sequential else "pipelined"
+    print("=" * 70)
+    print(
+        f"Run wall time: {args.iterations} iterations, {args.test_seconds}s tests, "
+        f"{args.ci_seconds}s CI, {args.files} files, {mode}"
+    )
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        elapsed = asyncio.run(execute(args, Path(tmpdir)))
+    print(f"  wall time:  {elapsed:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
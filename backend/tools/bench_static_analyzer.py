@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Python static analysis over a synthetic repository.
+
+Generates a repository of N Python modules (default 5,000) and times
+StaticAnalyzerService.analyze, counting ast.parse calls per file.
+
+Run from backend/:
+    python -m tools.bench_static_analyzer --files 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.static_analyzer import StaticAnalyzerService
+
+MODULE_TEMPLATE = '''import os
+import json
+from typing import Any
+
+
+class {class_name}:
+    def __init__(self, items: list[int]) -> None:
+        self.items = items
+        self.total = 0
+
+    def add_items(self, amount: int) -> int:
+        self.total += amount
+        return self.total
+
+    def summary(self) -> str:
+        return "total: " + str(self.total)
+
+
+def compute_{index}(values, threshold: int = {threshold}):
+    max_value = 0
+    count = 0
+    for value in values:
+        if value > max_value:
+            max_value = value
+        count += value
+    if count > threshold:
+        return count / len(values)
+    return max_value
+
+
+def average_{index}(numbers):
+    total = 0
+    for number in numbers:
+        total += number
+    return total / {divisor}
+
+
+def load_{index}(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        payload = json.load(handle)
+    result = {{key: value for key, value in payload.items() if value}}
+    return result
+'''
+
+
+def build_repository(root: Path, file_count: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    for index in range(file_count):
+        package = root / f"pkg_{index // 100:03d}"
+        package.mkdir(exist_ok=True)
+        extra = "\n".join(
+            f"def helper_{index}_{n}(a, b):\n    result = a * {n} + b\n    return result\n"
+            for n in range(rng.randint(2, 12))
+        )
+        source = MODULE_TEMPLATE.format(
+            class_name=f"Service{index}",
+            index=index,
+            threshold=rng.randint(1, 100),
+            divisor=rng.randint(2, 9),
+        )
+        (package / f"module_{index}.py").write_text(source + "\n\n" + extra, encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    parse_calls = 0
+    original_parse = ast.parse
+
+    def counting_parse(*parse_args, **parse_kwargs):
+        nonlocal parse_calls
+        parse_calls += 1
+        return original_parse(*parse_args, **parse_kwargs)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        build_repository(root, args.files)
+        analyzer = StaticAnalyzerService()
+
+        ast.parse = counting_parse
+        try:
+            timings = []
+            for _ in range(args.repeat):
+                parse_calls = 0
+                started = time.perf_counter()
+                failures = analyzer.analyze(root)
+                timings.append(time.perf_counter() - started)
+        finally:
+            ast.parse = original_parse
+
+    best = min(timings)
+    print("=" * 70)
+    print(f"Static analysis benchmark: {args.files} Python files")
+    print("=" * 70)
+    print(f"  findings:          {len(failures)}")
+    print(f"  ast.parse calls:   {parse_calls} ({parse_calls / args.files:.2f} per file)")
+    print(f"  wall time (best):  {best:.2f}s")
+    print(f"  throughput:        {args.files / best:.0f} files/s")
+
+
+if __name__ == "__main__":
+    main()
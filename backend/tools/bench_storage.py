@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: StorageService under N concurrent writers and M concurrent readers.
+
+Writers upsert run payloads (like the runner after each iteration), readers fetch
+them (like dashboard polling). Reports throughput and p50/p99 latency per operation.
+
+--legacy runs the previous implementation (connection per call, rollback journal).
+
+Run from backend/:
+    python -m tools.bench_storage --writers 4 --readers 16 --seconds 5
+    python -m tools.bench_storage --writers 4 --readers 16 --seconds 5 --legacy
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.storage import StorageService
+
+
+class LegacyStorage:
+    """The previous StorageService: a new connection per call and a global write lock."""
+
+    def __init__(self, data_dir: Path) -> None:
+        self.db_path = data_dir / "runs.db"
+        self.lock = threading.Lock()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+            conn.commit()
+
+    def upsert_run(self, run_id: str, payload: dict[str, Any]) -> None:
+        with self.lock:
+            now = datetime.now(UTC).isoformat()
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    """
+                    INSERT INTO runs(run_id, payload, updated_at) VALUES(?, ?, ?)
+                    ON CONFLICT(run_id) DO UPDATE SET payload = excluded.payload, updated_at = excluded.updated_at
+                    """,
+                    (run_id, json.dumps(payload), now),
+                )
+                conn.commit()
+
+    def get_run(self, run_id: str) -> dict[str, Any]:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT payload FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0])
+
+
+def sample_payload(run_id: str, fixes: int) -> dict[str, Any]:
+    return {
+        "run_id": run_id,
+        "status": "RUNNING",
+        "fixes": [
+            {
+                "file": f"src/module_{index}.py",
+                "bug_type": "LINTING",
+                "line_number": index,
+                "commit_message": "[AI-AGENT] Remove unused import",
+                "status": "FIXED",
+                "expected_output": f"LINTING error in src/module_{index}.py line {index} → Fix: remove the import",
+            }
+            for index in range(fixes)
+        ],
+        "timeline": [],
+    }
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fixes", type=int, default=50, help="fix rows per payload (payload size)")
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = LegacyStorage(Path(tmpdir)) if args.legacy else StorageService(data_dir=Path(tmpdir))
+        run_ids = [f"run-{index}" for index in range(args.writers)]
+        payloads = {run_id: sample_payload(run_id, args.fixes) for run_id in run_ids}
+        for run_id in run_ids:
+            storage.upsert_run(run_id, payloads[run_id])
+
+        write_latencies: list[list[float]] = [[] for _ in range(args.writers)]
+        read_latencies: list[list[float]] = [[] for _ in range(args.readers)]
+        deadline = time.perf_counter() + args.seconds
+
+        def writer(slot: int) -> None:
+            run_id = run_ids[slot]
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                storage.upsert_run(run_id, payloads[run_id])
+                write_latencies[slot].append(time.perf_counter() - started)
+
+        def reader(slot: int) -> None:
+            rng = random.Random(slot)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                storage.get_run(rng.choice(run_ids))
+                read_latencies[slot].append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=writer, args=(slot,)) for slot in range(args.writers)]
+        threads += [threading.Thread(target=reader, args=(slot,)) for slot in range(args.readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    mode = "legacy (connect per call, rollback journal)" if args.legacy else "pooled connections, WAL"
+    print("=" * 70)
+    print(f"Storage benchmark: {args.writers} writers, {args.readers} readers, {args.seconds:.0f}s, {mode}")
+    print("=" * 70)
+    for label, per_thread in (("writes", write_latencies), ("reads", read_latencies)):
+        samples = [latency * 1000 for thread_samples in per_thread for latency in thread_samples]
+        print(
+            f"  {label:<7} {len(samples) / args.seconds:9.0f} ops/s   "
+            f"p50 {percentile(samples, 50):7.2f} ms   p99 {percentile(samples, 99):7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Local fake of the GitHub Actions API for offline CI-polling tests.
+
+Serves GET /repos/{owner}/{repo}/actions/runs with GitHub's caching behaviour: responses
+carry a weak ETag, `If-None-Match` with the current ETag returns an empty 304, and only
+200 responses decrement `X-RateLimit-Remaining`. Each branch gets one workflow run that
+is `queued`, then `in_progress`, then `completed` `--complete-after` seconds after it is
+first polled.
+
+GET /_stats reports requests, 304s and distinct client connections; POST /_reset clears state.
+
+Run from backend/:
+    python -m tools.fake_github --port 9010 --complete-after 30
+    GITHUB_API_URL=http://127.0.0.1:9010 uvicorn app.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any
+
+from fastapi import FastAPI, Request, Response
+
+RATE_LIMIT = 5000
+
+
+def create_app(complete_after: float = 30.0, conclusion: str = "success", latency_ms: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake GitHub API")
+    state: dict[str, Any] = {}
+
+    def reset() -> None:
+        state.update(
+            first_seen={},
+            requests=0,
+            not_modified=0,
+            rate_remaining=RATE_LIMIT,
+            connections=set(),
+        )
+
+    reset()
+
+    def workflow_run(owner: str, repo: str, branch: str) -> dict[str, Any]:
+        first_seen = state["first_seen"].setdefault((owner, repo, branch), time.monotonic())
+        elapsed = time.monotonic() - first_seen
+        if elapsed >= complete_after:
+            status, run_conclusion = "completed", conclusion
+        elif elapsed >= complete_after / 3:
+            status, run_conclusion = "in_progress", None
+        else:
+            status, run_conclusion = "queued", None
+        return {
+            "id": abs(hash((owner, repo, branch))) % 10**9,
+            "head_branch": branch,
+            "status": status,
+            "conclusion": run_conclusion,
+            "html_url": f"https://github.com/{owner}/{repo}/actions/runs/1",
+        }
+
+    @app.get("/repos/{owner}/{repo}/actions/runs")
+    async def list_workflow_runs(owner: str, repo: str, request: Request, branch: str = "main") -> Response:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        state["requests"] += 1
+        if request.client:
+            state["connections"].add((request.client.host, request.client.port))
+
+        body = json.dumps({"total_count": 1, "workflow_runs": [workflow_run(owner, repo, branch)]})
+        etag = f'W/"{hashlib.sha1(body.encode()).hexdigest()}"'
+        headers = {
+            "ETag": etag,
+            "X-RateLimit-Limit": str(RATE_LIMIT),
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+        }
+        if request.headers.get("if-none-match") == etag:
+            # Conditional hits are free, as on GitHub
+            state["not_modified"] += 1
+            headers["X-RateLimit-Remaining"] = str(state["rate_remaining"])
+            return Response(status_code=304, headers=headers)
+
+        state["rate_remaining"] = max(0, state["rate_remaining"] - 1)
+        headers["X-RateLimit-Remaining"] = str(state["rate_remaining"])
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.get("/_stats")
+    async def stats() -> dict[str, int]:
+        return {
+            "requests": state["requests"],
+            "not_modified": state["not_modified"],
+            "rate_limit_used": RATE_LIMIT - state["rate_remaining"],
+            "connections": len(state["connections"]),
+        }
+
+    @app.post("/_reset")
+    async def reset_state() -> dict[str, str]:
+        reset()
+        return {"status": "ok"}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9010)
+    parser.add_argument("--complete-after", type=float, default=30.0, help="seconds until a workflow run completes")
+    parser.add_argument("--conclusion", default="success", choices=["success", "failure"])
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added delay per API response")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.complete_after, args.conclusion, args.latency_ms),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
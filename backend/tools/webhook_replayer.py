@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Replay signed GitHub webhook deliveries against the backend's webhook receiver.
+
+Either synthesizes a `workflow_run` event for one branch or replays recorded deliveries
+from a JSON-lines file (one {"event": "...", "payload": {...}} object per line). Bodies
+are signed with the shared secret exactly as GitHub does (X-Hub-Signature-256).
+
+Run from backend/:
+    python -m tools.webhook_replayer --secret s3cret --repo owner/repo --branch TEAM_LEAD_AI_Fix --conclusion failure
+    python -m tools.webhook_replayer --secret s3cret --file deliveries.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from app.services.ci_webhooks import sign_payload
+
+DEFAULT_URL = "http://127.0.0.1:8000/api/webhooks/github"
+
+
+def workflow_run_event(
+    full_name: str,
+    branch_name: str,
+    conclusion: str = "success",
+    action: str = "completed",
+    head_sha: str | None = None,
+) -> dict[str, Any]:
+    """A minimal `workflow_run` delivery with the fields the receiver reads."""
+    owner = full_name.split("/", 1)[0]
+    return {
+        "action": action,
+        "workflow_run": {
+            "id": 1,
+            "head_branch": branch_name,
+            "head_sha": head_sha,
+            "status": "completed" if action == "completed" else "in_progress",
+            "conclusion": conclusion if action == "completed" else None,
+            "html_url": f"https://github.com/{full_name}/actions/runs/1",
+        },
+        "repository": {"full_name": full_name, "owner": {"login": owner}},
+    }
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    url: str,
+    secret: str,
+    deliveries: list[tuple[str, dict[str, Any]]],
+) -> list[httpx.Response]:
+    """POST each (event, payload) delivery with GitHub's headers and signature."""
+    responses = []
+    for event, payload in deliveries:
+        body = json.dumps(payload).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "X-GitHub-Event": event,
+            "X-GitHub-Delivery": str(uuid.uuid4()),
+            "X-Hub-Signature-256": sign_payload(secret, body),
+        }
+        responses.append(await client.post(url, content=body, headers=headers))
+    return responses
+
+
+def load_deliveries(path: Path) -> list[tuple[str, dict[str, Any]]]:
+    deliveries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            record = json.loads(line)
+            deliveries.append((record["event"], record["payload"]))
+    return deliveries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--secret", required=True, help="GITHUB_WEBHOOK_SECRET of the receiving backend")
+    parser.add_argument("--file", type=Path, help="JSON-lines file of recorded deliveries")
+    parser.add_argument("--repo", help="owner/repo for a synthesized workflow_run event")
+    parser.add_argument("--branch", help="branch for a synthesized workflow_run event")
+    parser.add_argument("--conclusion", default="success", choices=["success", "failure", "cancelled"])
+    parser.add_argument("--sha", help="head commit of a synthesized workflow_run event")
+    args = parser.parse_args()
+
+    if args.file:
+        deliveries = load_deliveries(args.file)
+    elif args.repo and args.branch:
+        deliveries = [("workflow_run", workflow_run_event(args.repo, args.branch, args.conclusion, head_sha=args.sha))]
+    else:
+        parser.error("pass --file or both --repo and --branch")
+
+    async def run() -> list[httpx.Response]:
+        async with httpx.AsyncClient(timeout=10) as client:
+            return await replay(client, args.url, args.secret, deliveries)
+
+    for (event, _), response in zip(deliveries, asyncio.run(run())):
+        print(f"{event:<14} {response.status_code} {response.text}")
+
+
+if __name__ == "__main__":
+    main()
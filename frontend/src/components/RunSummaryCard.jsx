@@ -19,6 +19,9 @@ export default function RunSummaryCard({ run }) {
         <p><strong>Total Fixes Applied:</strong> {run.total_fixes_applied}</p>
         <p><strong>Total Time Taken:</strong> {run.duration_seconds ? `${run.duration_seconds.toFixed(2)}s` : "-"}</p>
         <p><strong>Final CI/CD Status:</strong> <span className={statusClass}>{run.status}</span></p>
+        {run.status === "QUEUED" && run.queue_position ? (
+          <p><strong>Queue Position:</strong> #{run.queue_position}</p>
+        ) : null}
       </div>
     </section>
   );
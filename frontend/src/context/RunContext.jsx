@@ -1,8 +1,61 @@
 import { createContext, useCallback, useContext, useMemo, useState } from "react";
-import { getRun, startRun } from "../utils/api";
+import { getRun, runEventsUrl, startRun } from "../utils/api";
 
 const RunContext = createContext(null);
 
+const isFinished = (run) => run.status === "PASSED" || run.status === "FAILED";
+
+async function pollRun(runId, onUpdate) {
+  let finished = false;
+  while (!finished) {
+    const details = await getRun(runId);
+    onUpdate(details);
+    finished = isFinished(details);
+    if (!finished) {
+      await new Promise((resolve) => setTimeout(resolve, 2500));
+    }
+  }
+}
+
+// Applies live deltas from GET /api/runs/{id}/events; resolves false if streaming is unavailable.
+function streamRun(runId, setRunData) {
+  return new Promise((resolve) => {
+    if (typeof EventSource === "undefined") {
+      resolve(false);
+      return;
+    }
+    const source = new EventSource(runEventsUrl(runId));
+    let receivedAny = false;
+
+    const handle = (type, apply) =>
+      source.addEventListener(type, (event) => {
+        receivedAny = true;
+        apply(JSON.parse(event.data));
+      });
+
+    handle("snapshot", (run) => setRunData(run));
+    handle("run_updated", (fields) => setRunData((run) => (run ? { ...run, ...fields } : run)));
+    handle("fix", (fix) => setRunData((run) => (run ? { ...run, fixes: [...run.fixes, fix] } : run)));
+    handle("timeline", (entry) =>
+      setRunData((run) => (run ? { ...run, timeline: [...run.timeline, entry] } : run))
+    );
+    handle("run_completed", (run) => {
+      setRunData(run);
+      source.close();
+      resolve(true);
+    });
+
+    // EventSource reconnects on its own (resuming via Last-Event-ID); fall back to polling
+    // if the stream never delivered anything or the browser gave up reconnecting.
+    source.onerror = () => {
+      if (!receivedAny || source.readyState === EventSource.CLOSED) {
+        source.close();
+        resolve(false);
+      }
+    };
+  });
+}
+
 export function RunProvider({ children }) {
   const [runData, setRunData] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
@@ -13,14 +66,9 @@ export function RunProvider({ children }) {
     setIsLoading(true);
     try {
       const started = await startRun(payload);
-      let finished = false;
-      while (!finished) {
-        const details = await getRun(started.run_id);
-        setRunData(details);
-        finished = details.status === "PASSED" || details.status === "FAILED";
-        if (!finished) {
-          await new Promise((resolve) => setTimeout(resolve, 2500));
-        }
+      const streamed = await streamRun(started.run_id, setRunData);
+      if (!streamed) {
+        await pollRun(started.run_id, setRunData);
       }
     } catch (err) {
       setError(err.message || "Unexpected error while running agent.");
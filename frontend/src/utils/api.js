@@ -7,6 +7,9 @@ export async function startRun(payload) {
     body: JSON.stringify(payload)
   });
 
+  if (response.status === 429) {
+    throw new Error("The run queue is full. Please try again shortly.");
+  }
   if (!response.ok) {
     throw new Error("Failed to start run.");
   }
@@ -21,3 +24,7 @@ export async function getRun(runId) {
   }
   return response.json();
 }
+
+export function runEventsUrl(runId) {
+  return `${API_BASE}/api/runs/${runId}/events`;
+}